@@ -1 +1,16 @@
 from danker.danker import init, danker_smallmem, danker_bigmem, InputNotSortedException
+from danker.danker import danker_adaptive
+from danker.danker import NodeTable, init_table
+from danker.danker import CSRGraph, to_csr, init_csr, danker_csr, danker_bigmem_csr
+from danker.danker import danker_gauss_seidel
+from danker.danker import CompressedGraph, compress_graph, danker_compressed
+from danker.danker import compile_graph, write_graph, load_graph, is_graph_file, sort_links
+from danker.danker import compile_right_sorted, danker_blocks, load_ranks, apply_delta
+from danker.danker import danker_personalized, teleport_matrix, load_seeds
+from danker.danker import init_multi_source, load_source_groups
+from danker.danker import StringTable, string_table, intern_links, load_index
+from danker.danker import write_ranks, load_rank_file, is_rank_file
+from danker.danker import RankIndex, read_rank_output, write_rank_index, load_rank_index
+from danker.danker import add_hook, remove_hook, print_progress, json_lines_hook
+from danker.danker import Checkpoint, graph_hash
+from danker.danker import InvalidGraphFileException
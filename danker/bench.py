@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+
+#    danker - PageRank on Wikipedia/Wikidata
+#    Copyright (C) 2020  Andreas Thalhammer
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Benchmark of the danker engines on synthetic scale-free graphs::
+
+    python -m danker.bench -E 100000 1000000 -o results.json
+    python -m danker.bench -E 100000 1000000 -c results.json  # after a change
+
+For every number of edges a sorted link file with integer node names is
+generated (see :func:`generate_links`); every engine then runs in a fresh
+process that reports the seconds for reading the links (``init``), per
+iteration and for writing the ranks (``output``) as well as its peak
+resident set size in bytes. The results are written as JSON and can be
+compared with the results of an earlier commit (``--compare``).
+"""
+
+import os
+import io
+import sys
+import json
+import queue
+import time
+import argparse
+import platform
+import contextlib
+import subprocess
+import multiprocessing
+
+import danker
+from danker.danker import np, _require_numpy, _peak_rss
+
+# smallmem runs the node table like the command line for integer graphs,
+# smallmem-dict the dictionary of danker_smallmem
+ENGINES = ['bigmem', 'smallmem', 'smallmem-dict', 'csr', 'compressed']
+METRICS = ['init', 'iteration', 'output']
+# part of the names of the generated link files: a new version is not mixed
+# up with files of an older generator
+GENERATOR_VERSION = 2
+# the links are generated in chunks of about this many links
+CHUNK_LINKS = 1 << 20
+
+def generate_links(file_name, edges, nodes=None, exponent=2.1, seed=0):
+    """
+    Write a link file of a synthetic scale-free graph: the in- and
+    out-degrees follow a power law, the nodes are integers from 1 to
+    ``nodes``. The file is sorted like the output of ``create_links.sh``
+    (numerically by the left and then by the right column) and contains
+    neither duplicates nor self-links, hence slightly fewer than ``edges``
+    links.
+
+    :param file_name: Name of the link file.
+    :param edges: Number of drawn links.
+    :param nodes: Number of nodes; default is a tenth of ``edges``.
+    :param exponent: Exponent of the degree distribution (>1).
+    :param seed: Seed of the random number generator.
+    :returns: The number of written links.
+    """
+    _require_numpy()
+    nodes = nodes or max(edges // 10, 2)
+    random = np.random.RandomState(seed)
+    weights = np.arange(1, nodes + 1, dtype=np.float64) ** (-1 / (exponent - 1))
+    out_degree = random.multinomial(edges, random.permutation(weights) / weights.sum())
+    np.minimum(out_degree, nodes - 1, out=out_degree)
+    in_weights = np.cumsum(random.permutation(weights))
+    bounds = np.searchsorted(np.cumsum(out_degree), np.arange(CHUNK_LINKS, edges, CHUNK_LINKS))
+    written = 0
+    with open(file_name, 'w', encoding="utf-8") as link_file:
+        for first, last in zip([0] + bounds.tolist(), bounds.tolist() + [nodes]):
+            sources = np.repeat(np.arange(first, last), out_degree[first:last])
+            targets = np.searchsorted(in_weights, random.random_sample(len(sources)) *
+                                      in_weights[-1], side='right')
+            np.minimum(targets, nodes - 1, out=targets)
+            keys = np.unique(sources * nodes + targets)
+            sources, targets = keys // nodes, keys % nodes
+            keep = sources != targets
+            sources, targets = (sources[keep] + 1).tolist(), (targets[keep] + 1).tolist()
+            link_file.write("".join("{0}\t{1}\n".format(i, j)
+                                    for i, j in zip(sources, targets)))
+            written += len(sources)
+    return written
+
+def _run(engine, left_sorted, right_sorted, args, results):
+    """
+    Helper function to run one engine (in a fresh process) and to put its
+    timings into the ``results`` queue.
+    """
+    stats = {}
+    start = time.time()
+    with contextlib.redirect_stderr(io.StringIO()):
+        if engine == 'csr':
+            graph = danker.init_csr(left_sorted)
+            init = time.time()
+            ranks = danker.danker_csr(graph, args.iterations, args.damping, args.start_value,
+                                      stats=stats)
+            iterations = time.time()
+            nodes, scores = graph.nodes, ranks[stats['location']]
+        elif engine == 'compressed':
+            graph = danker.compress_graph(danker.init_csr(left_sorted))
+            init = time.time()
+            ranks = danker.danker_compressed(graph, args.iterations, args.damping,
+                                             args.start_value, stats=stats)
+            iterations = time.time()
+            nodes, scores = graph.nodes, ranks[stats['location']]
+        elif engine == 'smallmem':
+            table = danker.init_table(left_sorted, args.start_value)
+            init = time.time()
+            danker.danker_smallmem(table, right_sorted, args.iterations, args.damping,
+                                   args.start_value, stats=stats)
+            iterations = time.time()
+            nodes, scores = table.nodes, table.scores(stats['location'])
+        else:
+            dictionary = danker.init(left_sorted, args.start_value, engine == 'smallmem-dict')
+            init = time.time()
+            if engine == 'smallmem-dict':
+                danker.danker_smallmem(dictionary, right_sorted, args.iterations,
+                                       args.damping, args.start_value, stats=stats)
+            else:
+                danker.danker_bigmem(dictionary, args.iterations, args.damping, stats=stats)
+            iterations = time.time()
+            nodes = list(dictionary)
+            scores = [k[stats['location']] for k in dictionary.values()]
+        with open(os.devnull, 'w') as out_file:
+            danker.write_ranks(nodes, scores, out_file)
+    end = time.time()
+    results.put({'init': init - start, 'iteration': (iterations - init) / stats['iterations'],
+                 'output': end - iterations, 'total': end - start, 'nodes': len(scores),
+                 'peak_rss': _peak_rss()})
+
+def _result(process, results, poll=1.0):
+    """
+    Helper function to wait for the result of an engine process.
+
+    :returns: The result or None if the process ended without one.
+    """
+    while True:
+        try:
+            return results.get(timeout=poll)
+        except queue.Empty:
+            if not process.is_alive():
+                break
+    # the result may have been put right before the process ended
+    try:
+        return results.get(timeout=poll)
+    except queue.Empty:
+        return None
+
+def _commit():
+    """
+    Helper function to return the current git commit of the package (None
+    if not available).
+    """
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def benchmark(args):
+    """
+    Generate the link files and run all engines.
+
+    :param args: Parsed command line arguments (see :func:`main`).
+    :returns: Dictionary with the environment and one result per number of
+              edges and engine.
+    """
+    context = multiprocessing.get_context('spawn')
+    report = {'commit': _commit(), 'python': platform.python_version(),
+              'numpy': np.__version__, 'platform': platform.platform(),
+              'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'parameters': {'exponent': args.exponent, 'seed': args.seed,
+                             'iterations': args.iterations, 'damping': args.damping,
+                             'start_value': args.start_value},
+              'results': []}
+    os.makedirs(args.directory, exist_ok=True)
+    for edges in args.edges:
+        left_sorted = os.path.join(args.directory, 'bench-{0}-{1}-{2}-v{3}.links'.format(
+            edges, args.exponent, args.seed, GENERATOR_VERSION))
+        if not os.path.exists(left_sorted):
+            generate_links(left_sorted, edges, None, args.exponent, args.seed)
+        right_sorted = left_sorted + '.right'
+        if any(k.startswith('smallmem') for k in args.engines) and \
+                not os.path.exists(right_sorted):
+            danker.sort_links(left_sorted, right_sorted, 1)
+        with open(left_sorted, 'rb') as link_file:
+            links = sum(k.count(b'\n') for k in iter(lambda: link_file.read(1 << 20), b''))
+        for engine in args.engines:
+            results = context.Queue()
+            process = context.Process(target=_run, args=(engine, left_sorted, right_sorted,
+                                                         args, results))
+            process.start()
+            result = _result(process, results)
+            process.join()
+            if result is None:
+                # e.g., killed for lack of memory or an exception in the engine
+                result = dict.fromkeys(METRICS + ['total', 'nodes', 'peak_rss'])
+                result['error'] = 'exit code {0}'.format(process.exitcode)
+            result.update({'edges': edges, 'links': links, 'engine': engine})
+            report['results'].append(result)
+            if 'error' in result:
+                print('{0}\t{1}\t{2}\tfailed ({3})'.format(edges, links, engine,
+                                                           result['error']), file=sys.stderr)
+                continue
+            print('{0}\t{1}\t{2}\t{3:.3f}\t{4:.3f}\t{5:.3f}\t{6}'.format(
+                edges, links, engine, result['init'], result['iteration'], result['output'],
+                result['peak_rss']), file=sys.stderr)
+    return report
+
+def compare(report, baseline, threshold):
+    """
+    Print the ratio of every timing and of the peak memory to the same
+    measurement (same number of edges and engine) of an earlier run.
+
+    :param report: Results of this run (see :func:`benchmark`).
+    :param baseline: Results of the earlier run.
+    :param threshold: Ratio above which a measurement counts as regression.
+    :returns: Number of regressions.
+    """
+    earlier = {(k['edges'], k['engine']): k for k in baseline['results']}
+    regressions = 0
+    print('edges\tengine\t' + '\t'.join(METRICS + ['peak_rss']))
+    for result in report['results']:
+        old = earlier.get((result['edges'], result['engine']))
+        if old is None:
+            continue
+        ratios = []
+        for metric in METRICS + ['peak_rss']:
+            if not result[metric] or not old[metric]:
+                ratios.append('-')
+                continue
+            ratio = result[metric] / old[metric]
+            regressions += ratio > threshold
+            ratios.append('{0:.2f}{1}'.format(ratio, '!' if ratio > threshold else ''))
+        print('{0}\t{1}\t{2}'.format(result['edges'], result['engine'], '\t'.join(ratios)))
+    return regressions
+
+def main(argv=None):
+    """
+    Execute the benchmark.
+    """
+    parser = argparse.ArgumentParser(prog='python -m danker.bench', description='Benchmark ' +
+                                     'the danker engines on synthetic scale-free graphs.',
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-E', '--edges', type=int, nargs='+', default=[100000],
+                        help='Numbers of edges of the generated graphs (e.g., 1e5 to 1e8).')
+    parser.add_argument('-e', '--engines', type=str, nargs='+', choices=ENGINES,
+                        default=['bigmem', 'smallmem'], help='Engines to benchmark.')
+    parser.add_argument('-x', '--exponent', type=float, default=2.1,
+                        help='Exponent of the power-law degree distribution.')
+    parser.add_argument('-r', '--seed', type=int, default=0,
+                        help='Seed of the graph generator.')
+    parser.add_argument('-i', '--iterations', type=int, default=10,
+                        help='Number of PageRank iterations.')
+    parser.add_argument('-d', '--damping', type=float, default=0.85,
+                        help='PageRank damping factor.')
+    parser.add_argument('-s', '--start-value', type=float, default=0.1,
+                        help='PageRank starting value.')
+    parser.add_argument('-D', '--directory', type=str, default='.',
+                        help='Directory of the generated link files (reused by later runs).')
+    parser.add_argument('-o', '--output', type=str,
+                        help='Name of the JSON result file (default: standard output).')
+    parser.add_argument('-c', '--compare', type=str,
+                        help='JSON result file of an earlier run to compare with; exits ' +
+                        'with status 1 if a measurement exceeds the threshold.')
+    parser.add_argument('-t', '--threshold', type=float, default=1.2,
+                        help='Ratio to the earlier run that counts as regression.')
+    args = parser.parse_args(argv)
+    _require_numpy()
+    if args.exponent <= 1 or min(args.edges) < 1:
+        parser.error('the exponent must be >1 and the numbers of edges >0')
+    report = benchmark(args)
+    if args.output:
+        with open(args.output, 'w', encoding="utf-8") as out_file:
+            json.dump(report, out_file, indent=2)
+    elif not args.compare:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as in_file:
+            baseline = json.load(in_file)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -27,7 +27,9 @@ hardware resources. The input format are edge lists of the following format::
 
 The nodes can be denoted as strings or integers. However, depending on the
 size of the graph and the amount of available memory you may have to index
-string node as integers and map back after computation::
+string node as integers and map back after computation (``python -m danker
+intern`` and ``--index``, see :func:`intern_links`; :func:`init_csr` interns
+string nodes itself)::
 
     # link file
     1   2
@@ -52,6 +54,11 @@ right column::
    # Sort by right column
    sort --key=2 -o output-right link-file
 
+Alternatively, :func:`init` sorts (or, for :func:`danker_smallmem`, only
+counts) an unsorted link file itself with ``unsorted=True`` and
+:func:`sort_links` creates the right sorted file with an external merge
+sort (``python -m danker sort -c right link-file output-right``).
+
 The :func:`init` function is used to initialize the PageRank computation.
 The following code shows a minimal example for computing PageRank with the
 :func:`danker_bigmem` option (right-sorted file not needed)::
@@ -64,6 +71,129 @@ The following code shows a minimal example for computing PageRank with the
     for i in pr_out:
         print(i, pr_out[i][result_loc], sep='\\t')
 
+All engines accept an optional ``tolerance`` to stop as soon as the ranks
+change less than this value between two iterations. In this case the
+``stats`` dictionary tells where to find the result::
+
+    stats = {}
+    pr_out = danker.danker_bigmem(pr_dict, 100, damping, tolerance=1e-9, stats=stats)
+    result_loc = stats['location']  # stats['iterations'] were computed
+
+If numpy is installed, :func:`danker_bigmem_csr` can be used as a drop-in
+replacement for :func:`danker_bigmem`. It converts the dictionary into a
+:class:`CSRGraph` and computes the same scores with vectorized operations
+(see also :func:`to_csr` and :func:`danker_csr`). :func:`init_csr` reads a
+link file directly into a :class:`CSRGraph`; with numpy, link files with
+integer node names are tokenized in bulk by both :func:`init` and
+:func:`init_csr`.
+
+For repeated runs on the same graph, the link file can be compiled once into
+a binary graph file (``python -m danker compile output-left output-graph``
+or :func:`compile_graph`). :func:`load_graph` memory-maps such a file
+without copying and :func:`danker_csr` computes PageRank on it; only the
+rank vectors are held in memory, the graph itself is paged in from the
+operating system's page cache::
+
+    import danker
+    start_value, iterations, damping = 0.1, 40, 0.85
+    graph = danker.load_graph("output-graph")
+    ranks = danker.danker_csr(graph, iterations, damping, start_value)
+    for i, rank in zip(graph.nodes, ranks[iterations % 2]):
+        print(i, rank, sep='\\t')
+
+To fit larger graphs into memory, :func:`compress_graph` stores the in-links
+of a :class:`CSRGraph` as delta and varint encoded bytes (mostly one or two
+bytes per link instead of four) that :func:`danker_compressed` decodes chunk
+by chunk in every iteration (``--engine compressed``)::
+
+    graph = danker.compress_graph(danker.load_graph("output-graph"))
+    ranks = danker.danker_compressed(graph, iterations, damping, start_value)
+
+On machines where the graph does not fit into memory, the right sorted link
+file can be converted with bounded memory (``python -m danker compile -r
+output-right output-graph`` or :func:`compile_right_sorted`) and
+:func:`danker_blocks` streams the in-links block by block in every
+iteration instead of parsing the text file again.
+
+Graphs that do not fit into the memory of one machine can be computed by
+workers on several machines, each with one shard of the nodes (``python -m
+danker.distributed``, see :mod:`danker.distributed`).
+
+:func:`danker_personalized` computes several topic-specific rankings (e.g.,
+one per category) in one pass over the links; the random surfer of every
+ranking only jumps to the nodes of its seed set (``--seeds`` on the command
+line)::
+
+    graph = danker.to_csr(danker.init("output-left", start_value, False))
+    teleport = danker.teleport_matrix(graph.nodes, [["A", "B"], ["C"]])
+    ranks = danker.danker_personalized(graph, teleport, iterations, damping, start_value)
+    # ranks[iterations % 2][:, k] are the scores of ranking k
+
+:func:`init_multi_source` (``--multi-source``) reads the source column of a
+link file (e.g., the wiki of every link in the output of ``create_links.sh``)
+and builds one graph of the global graph and the graph of every source, such
+that a single run computes all rankings::
+
+    graph, sources, names = danker.init_multi_source("output-left")
+    ranks = danker.danker_csr(graph, iterations, damping, start_value)
+    # ranks[iterations % 2][sources == k] are the scores of graph.nodes[sources == k]
+    # in the graph of names[k]; source 0 is the global graph
+
+When the links change only slightly (e.g., between two Wikipedia dumps),
+:func:`apply_delta` (``python -m danker update output-graph delta
+output-graph``) updates a graph in place of a full re-compilation and
+:func:`load_ranks` (``--previous``) uses the scores of the last run as
+starting vector, which, together with a ``tolerance``, needs much fewer
+iterations::
+
+    graph, added, removed = danker.apply_delta(danker.load_graph("output-graph"), "delta")
+    start = danker.load_ranks("previous.rank", graph.nodes, start_value)
+    ranks = danker.danker_csr(graph, 100, damping, start, tolerance=1e-9, stats=stats)
+
+:func:`danker_adaptive` (``--solver adaptive``) updates only the nodes whose
+scores still change by more than a threshold and pushes every update to their
+out-links; it stops as soon as the scores are within ``tolerance`` of the exact
+ones::
+
+    pr_out = danker.danker_adaptive(danker.init("output-left", start_value, False),
+                                    100, damping, 1e-6)
+
+Progress is reported to hooks (see :func:`add_hook`): by default the number
+of every iteration is printed to stderr, :func:`json_lines_hook` (``--telemetry``)
+writes elapsed time, edges per second, peak memory and residual of every
+phase (parsing, indexing, every iteration and output) as JSON lines::
+
+    danker.add_hook(danker.json_lines_hook(open("telemetry.jsonl", "w")))
+
+Long runs can write periodic checkpoints of the ranks (``--checkpoint`` or
+a :class:`Checkpoint` passed to the engines) and continue after an
+interruption (``--resume``) with the same result as an uninterrupted run::
+
+    checkpoint = danker.Checkpoint("run.checkpoint", danker.graph_hash(["output-left",
+                                   "output-right"]), every=5, resume=True)
+    pr_out = danker.danker_smallmem(pr_dict, "output-right", iterations, damping,
+                                    start_value, checkpoint=checkpoint)
+
+:func:`write_ranks` writes the result in large batches, optionally only the
+``top`` nodes or all nodes ordered by descending score (``--top`` and
+``--sorted``), or as binary rank file (``--format binary``) that
+:func:`load_rank_file` maps into memory without parsing::
+
+    danker.write_ranks(graph.nodes, ranks[iterations % 2], top=1000)
+    with open("output.rank", "wb") as out_file:
+        danker.write_ranks(graph.nodes, ranks[iterations % 2], out_file, binary=True)
+    nodes, scores = danker.load_rank_file("output.rank")
+
+:func:`write_rank_index` turns the output into a rank index (nodes sorted
+for binary search and ordered by score) that :func:`load_rank_index` maps
+into memory for point, top-k and percentile queries; ``python -m danker serve``
+answers them over HTTP (see :mod:`danker.server`)::
+
+    danker.write_rank_index("output.rank", "output.rank.idx", prefix="Q")
+    index = danker.load_rank_index("output.rank.idx")
+    node, score, rank, percentile = index.entry(index.find([42])[0])
+    first, last = index.percentile_ranks(99, 100)  # the top percent
+    top_percent = index.top(last - first, first)
 
 The following code shows a minimal example for computing PageRank with the
 :func:`danker_smallmem` option::
@@ -77,11 +207,76 @@ The following code shows a minimal example for computing PageRank with the
         print(i, pr_out[i][result_loc], sep='\\t')
 
 """
+import os
 import sys
+import mmap
 import time
+import struct
+import heapq
+import math
+import bisect
+import hashlib
+import json
+import queue
 import argparse
+import contextlib
+import zlib
+import threading
+import multiprocessing
+from array import array
+from collections import namedtuple
 #import memory_profiler
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# binary graph format: magic, version, flags, nodes, links, string table size
+_GRAPH_MAGIC = b'DANKERG\0'
+_GRAPH_VERSION = 1
+_GRAPH_HEADER = struct.Struct('<8sIIQQQ')
+_GRAPH_HEADER_SIZE = 64
+_FLAG_STRING_NODES = 1
+_FLAG_WIDE_INDICES = 2
+_FLAG_RANK_INDEX = 4
+
+# binary rank file: same header layout with links = 0, scores instead of the adjacency;
+# a rank index (_FLAG_RANK_INDEX) has sorted nodes and two more int64 arrays: the
+# nodes by descending score and the position of every node in this order
+_RANK_MAGIC = b'DANKERR\0'
+_RANK_VERSION = 1
+
+# checkpoint: magic, version, nodes, finished iterations, key, CRC-32 of the ranks
+_CHECKPOINT_MAGIC = b'DANKERC\0'
+_CHECKPOINT_VERSION = 1
+_CHECKPOINT_HEADER = struct.Struct('<8sIQQ32sI')
+_CHECKPOINT_HEADER_SIZE = 64
+
+# number of array elements processed at once by the vectorized engines
+_CHUNK_SIZE = 1 << 18
+# number of bytes of a link file read at once
+_LINE_CHUNK_SIZE = _CHUNK_SIZE * 32
+
+CSRGraph = namedtuple('CSRGraph', ['nodes', 'out_degree', 'indptr', 'indices'])
+CSRGraph.__doc__ = """
+Compressed sparse row (CSR) representation of a link graph. Row ``i``
+holds the in-links of ``nodes[i]``; the positions of the linking nodes are
+``indices[indptr[i]:indptr[i + 1]]`` (in the order of the input file).
+
+:param nodes: Sequence of node names; the position of a node in this
+              sequence is its index in all other arrays.
+:param out_degree: int64 array with the number of outgoing links per node.
+:param indptr: int64 array of length ``len(nodes) + 1`` with row offsets.
+:param indices: int32 (or int64 for very large graphs) array with the
+                positions of the linking nodes.
+"""
+
 class InputNotSortedException(Exception):
     """
     Custom exception thrown in case the input file is not correctly sorted.
@@ -96,6 +291,20 @@ class InputNotSortedException(Exception):
         message = self._MESSAGE.format(file_name, line1, line2)
         Exception.__init__(self, message)
 
+class InvalidGraphFileException(Exception):
+    """
+    Custom exception thrown in case a file is not a compiled danker graph
+    (see :func:`compile_graph`) or was written by an incompatible version.
+
+    :param file_name: The name of the file that can not be loaded.
+    :param reason: Short description of the problem.
+    """
+    _MESSAGE = 'File "{0}" is not a valid danker graph: {1}'
+
+    def __init__(self, file_name, reason):
+        message = self._MESSAGE.format(file_name, reason)
+        Exception.__init__(self, message)
+
 def _conv_int(string):
     """
     Helper function to optimize memory usage.
@@ -112,7 +321,13 @@ def _get_std_list(smallmem, start_value):
         return [0, start_value, start_value, False]
     return [0, start_value, start_value, []]
 
-def init(left_sorted, start_value, smallmem):
+def _left_key(line):
+    """
+    Helper function to return the (converted) left node of a line.
+    """
+    return _conv_int(line.split("\t")[0].strip())
+
+def init(left_sorted, start_value, smallmem, unsorted=False):
     """
     This function creates the data structure for PageRank computation by
     indexing every node. Main indexing steps include setting the starting
@@ -125,6 +340,11 @@ def init(left_sorted, start_value, smallmem):
                      whether the indexing should be done for
                      :func:`danker_smallmem` (file iteration) or
                      :func:`danker_bigmem` (in-memory). Default is "False".
+    :param unsorted: If true, the link file may be in any order. The links
+                     are sorted by the left column in memory (integer node
+                     names are radix sorted in arrays if numpy is
+                     available); with smallmem only the links per node are
+                     counted. Default is "False".
     :returns: Dictionary with each key referencing a node. The value is a
               list with the following contents - depending on the smallmem
               parameter and the intended use:
@@ -135,11 +355,33 @@ def init(left_sorted, start_value, smallmem):
               * :func:`danker_smallmem` [link_cout:int, start_value:float,
                 start_value:float, touched_in_1st_iteration:boolean]
     """
+    start = time.time()
+    dictionary = _init_dictionary(left_sorted, start_value, smallmem, unsorted)
+    _emit('init', start, sum(k[0] for k in dictionary.values()) if _observed() else None,
+          nodes=len(dictionary))
+    return dictionary
+
+def _init_dictionary(left_sorted, start_value, smallmem, unsorted):
+    """
+    Helper function to create the dictionary of :func:`init`.
+    """
+    if np is not None:
+        # bulk parser for files with integer node names (falls back to the loop below)
+        dictionary = _init_int_links(left_sorted, start_value, smallmem, unsorted)
+        if dictionary is not None:
+            return dictionary
+    if unsorted and smallmem:
+        counts = {}
+        with open(left_sorted, encoding="utf-8") as ls_file:
+            for line in ls_file:
+                current = _left_key(line)
+                counts[current] = counts.get(current, 0) + 1
+        return {k: [counts[k], start_value, start_value, False] for k in sorted(counts)}
     dictionary = {}
     previous = None
     current_count = 1
     with open(left_sorted, encoding="utf-8") as ls_file:
-        for line in ls_file:
+        for line in sorted(ls_file, key=_left_key) if unsorted else ls_file:
             current = _conv_int(line.split("\t")[0].strip())
             receiver = _conv_int(line.split("\t")[1].strip())
 
@@ -169,26 +411,298 @@ def init(left_sorted, start_value, smallmem):
             dictionary[previous] = [current_count] + prev[1:]
     return dictionary
 
+def _residual(differences, norm):
+    """
+    Helper function to aggregate absolute rank differences to the L1 norm
+    ("l1") or the maximum norm ("linf").
+    """
+    if norm == 'linf':
+        return max(differences, default=0.0)
+    return sum(differences)
+
+def print_progress(event):
+    """
+    Default hook (see :func:`add_hook`): print the number of every finished
+    iteration followed by a dot to stderr.
+    """
+    if event['phase'] == 'iteration':
+        print(str(event['iteration']) + ".", end="", flush=True, file=sys.stderr)
+    elif event['phase'] == 'pagerank':
+        print("", file=sys.stderr)
+
+_HOOKS = [print_progress]
+
+def add_hook(hook):
+    """
+    Register a function that is called with a dictionary for every finished
+    phase of a computation. Every event has the keys
+
+    * ``phase``: "parse" (bulk parser), "init" (indexing and counting of
+      the out-degrees, including "parse"), "iteration", "pagerank" (all
+      iterations) or "output" (see :func:`write_ranks`),
+    * ``time``: end of the phase (seconds since the epoch),
+    * ``elapsed``: duration of the phase in seconds,
+    * ``edges`` and ``edges_per_second``: number of processed links (None
+      if not known) and throughput,
+    * ``peak_rss``: peak resident set size of the process in bytes,
+
+    "iteration" events add the ``iteration`` number, the ``residual``
+    between the two rank vectors and its ``norm``; "init" and "output"
+    events add the number of ``nodes``.
+
+    Without hooks the events are not even created. The residual is only
+    computed for hooks other than :func:`print_progress` (or if requested
+    with ``tolerance`` or ``stats`` anyway).
+
+    :param hook: Function with one argument, e.g., :func:`json_lines_hook`.
+    """
+    _HOOKS.append(hook)
+
+def remove_hook(hook):
+    """
+    Unregister a hook registered with :func:`add_hook` (also
+    :func:`print_progress` to suppress the progress dots).
+    """
+    _HOOKS.remove(hook)
+
+def json_lines_hook(out_file):
+    """
+    Create a hook (see :func:`add_hook`) that writes every event as one line
+    of JSON to a text file (flushed, e.g., for a job scheduler to follow).
+
+    :param out_file: File object opened for writing text.
+    :returns: The hook function.
+    """
+    def hook(event):
+        out_file.write(json.dumps(event, sort_keys=True) + "\n")
+        out_file.flush()
+    return hook
+
+def _observed():
+    """
+    Helper function to check if a hook other than the progress dots is
+    registered (then costly event details are worth computing).
+    """
+    return any(k is not print_progress for k in _HOOKS)
+
+def _peak_rss():
+    """
+    Helper function to return the peak resident set size of this process in
+    bytes (None if not available).
+    """
+    # ru_maxrss survives exec, i.e., it includes the peak of the parent process
+    try:
+        with open('/proc/self/status', encoding="utf-8") as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def _emit(phase, start, edges=None, **fields):
+    """
+    Helper function to pass the event of a finished phase to all hooks (see
+    :func:`add_hook`).
+    """
+    if not _HOOKS:
+        return
+    now = time.time()
+    elapsed = now - start
+    event = {'phase': phase, 'time': now, 'elapsed': elapsed, 'edges': edges,
+             'edges_per_second': edges / elapsed if edges and elapsed > 0 else None,
+             'peak_rss': _peak_rss() if _observed() else None}
+    event.update(fields)
+    for hook in list(_HOOKS):
+        hook(event)
+
+Checkpoint = namedtuple('Checkpoint', ['file_name', 'key', 'every', 'seconds', 'resume'])
+Checkpoint.__new__.__defaults__ = (b'', None, None, False)
+Checkpoint.__doc__ = """
+Periodic checkpoints of an engine: after every ``every`` iterations or
+``seconds`` seconds the current rank vector and the number of finished
+iterations are written atomically to ``file_name`` (binary, with a CRC-32
+of the ranks). With ``resume`` an engine continues from a valid checkpoint
+of the same graph, engine and damping factor; the result is the same as
+the one of an uninterrupted run.
+
+:param file_name: Name of the checkpoint file.
+:param key: Bytes that identify the input graph, see :func:`graph_hash`.
+:param every: Write a checkpoint every ``every`` iterations.
+:param seconds: Write a checkpoint if the last one is at least ``seconds``
+                seconds old.
+:param resume: Continue from the checkpoint file if it is valid.
+"""
+
+def graph_hash(file_names):
+    """
+    Compute the SHA-256 digest of the content of the input files (e.g., the
+    left and right sorted link files) as ``key`` of a :class:`Checkpoint`.
+
+    :param file_names: Sequence of file names.
+    :returns: Digest (32 bytes).
+    """
+    digest = hashlib.sha256()
+    for file_name in file_names:
+        with open(file_name, 'rb') as in_file:
+            for data in iter(lambda: in_file.read(_CHUNK_SIZE * 32), b''):
+                digest.update(data)
+    return digest.digest()
+
+def _checkpoint_key(checkpoint, engine, damping):
+    """
+    Helper function to derive the key stored in a checkpoint from the graph
+    key, the engine and the damping factor.
+    """
+    digest = hashlib.sha256(checkpoint.key)
+    digest.update(engine.encode('utf-8'))
+    digest.update(struct.pack('<d', damping))
+    return digest.digest()
+
+def _float_bytes(values):
+    """
+    Helper function to convert a sequence of floats to little endian float64
+    bytes (without numpy for the dictionary engines).
+    """
+    if np is not None and isinstance(values, np.ndarray):
+        return values.astype('<f8').tobytes()
+    values = array('d', values)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tobytes()
+
+def _resume(checkpoint, engine, damping, size):
+    """
+    Helper function to read the checkpoint of an engine.
+
+    :returns: Tuple (finished iterations, ranks as :class:`array.array` or
+              None, key): (0, None, key) without a valid checkpoint or
+              without ``resume``.
+    """
+    if checkpoint is None:
+        return 0, None, None
+    key = _checkpoint_key(checkpoint, engine, damping)
+    if not checkpoint.resume or not os.path.exists(checkpoint.file_name):
+        return 0, None, key
+    with open(checkpoint.file_name, 'rb') as checkpoint_file:
+        data = checkpoint_file.read()
+    header = data[:_CHECKPOINT_HEADER.size]
+    if len(header) == _CHECKPOINT_HEADER.size:
+        magic, version, nodes, iterations, stored, crc = _CHECKPOINT_HEADER.unpack(header)
+        ranks = data[_CHECKPOINT_HEADER_SIZE:]
+        if magic == _CHECKPOINT_MAGIC and version == _CHECKPOINT_VERSION and \
+                nodes == size and stored == key and len(ranks) == 8 * size and \
+                zlib.crc32(ranks) == crc:
+            values = array('d')
+            values.frombytes(ranks)
+            if sys.byteorder == 'big':
+                values.byteswap()
+            return iterations, values, key
+    print("Ignoring checkpoint '{0}' (invalid or of another graph, engine or damping "
+          "factor).".format(checkpoint.file_name), file=sys.stderr)
+    return 0, None, key
+
+def _save_checkpoint(checkpoint, key, iteration, saved, ranks):
+    """
+    Helper function to write a checkpoint after ``iteration`` if it is due.
+
+    :param saved: Time of the last checkpoint (or of the start).
+    :param ranks: Function that returns the current rank vector.
+    :returns: Time of the last checkpoint.
+    """
+    if checkpoint is None:
+        return saved
+    if not (checkpoint.every and (iteration + 1) % checkpoint.every == 0) and \
+            (checkpoint.seconds is None or time.time() - saved < checkpoint.seconds):
+        return saved
+    data = _float_bytes(ranks())
+    header = _CHECKPOINT_HEADER.pack(_CHECKPOINT_MAGIC, _CHECKPOINT_VERSION, len(data) // 8,
+                                     iteration + 1, key, zlib.crc32(data))
+    # write to a temporary file first, a crash must not destroy the last checkpoint
+    with open(checkpoint.file_name + '.tmp', 'wb') as checkpoint_file:
+        checkpoint_file.write(header + bytes(_CHECKPOINT_HEADER_SIZE - len(header)))
+        checkpoint_file.write(data)
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+    os.replace(checkpoint.file_name + '.tmp', checkpoint.file_name)
+    return time.time()
+
+def _converged(iteration, residual, tolerance, norm, stats, location, began, links):
+    """
+    Helper function to record run information in ``stats``, to report the
+    iteration (started at ``began``, ``links`` processed) to the hooks and to
+    check the termination criterion. ``residual`` is None if it was not
+    computed.
+
+    :returns: True if the residual dropped below the tolerance.
+    """
+    if stats is not None:
+        stats['iterations'] = iteration + 1
+        stats['location'] = location
+        stats['residual'] = residual
+        stats['norm'] = norm
+    _emit('iteration', began, links, iteration=iteration + 1, residual=residual, norm=norm)
+    return tolerance is not None and residual < tolerance
+
 #@profile
-def danker_smallmem(dictionary, right_sorted, iterations, damping, start_value):
+def danker_smallmem(dictionary, right_sorted, iterations, damping, start_value,
+                    tolerance=None, norm='l1', stats=None, checkpoint=None):
     """
     Compute PageRank with right sorted file.
 
     :param dictionary: Python dictionary created with :func:`init`
-                       (smallmem set to True).
+                       (smallmem set to True) or :class:`NodeTable`
+                       created with :func:`init_table`.
     :param right_sorted: The same tab-separated link file that was used for
                          :func:`init` sorted by the right column.
     :param iterations: The number of PageRank iterations.
     :param damping: The PageRank damping factor.
     :param start_value: The PageRank starting value (same as was used for
                         :func:`init`).
+    :param tolerance: Optional convergence threshold. Computation stops
+                      early once the change between two iterations (see
+                      ``norm``) is below this value; ``iterations`` is then
+                      the maximum number of iterations.
+    :param norm: Norm of the change between two iterations, "l1" (sum of
+                 absolute differences) or "linf" (maximum absolute
+                 difference). Default is "l1".
+    :param stats: Optional dictionary that is filled with run information:
+                  ``iterations`` (number of iterations run), ``location``
+                  (position of the output score in the lists),
+                  ``residual`` (change in the last iteration) and ``norm``.
+    :param checkpoint: Optional :class:`Checkpoint` to write the ranks
+                       periodically and to resume from.
     :return: The same dictionary that was created by :func:`init`. The keys
              are the nodes of the graph. The output score is located at
              the ``(iterations % 2) + 1`` position of the respecive list
-             (that is the value of the key).
+             (that is the value of the key); with ``tolerance`` use
+             ``stats['location']``. A :class:`NodeTable` is returned
+             with the nodes without out-links added (see
+             :meth:`NodeTable.scores`).
     """
-    for iteration in range(0, iterations):
-        print(str(iteration + 1) + ".", end="", flush=True, file=sys.stderr)
+    if isinstance(dictionary, NodeTable):
+        return _danker_smallmem_table(dictionary, right_sorted, iterations, damping,
+                                      start_value, tolerance, norm, stats, checkpoint)
+    if checkpoint is not None and checkpoint.resume and os.path.exists(checkpoint.file_name):
+        # add the nodes without out-links like the first iteration does
+        with open(right_sorted, encoding="utf-8") as rs_file:
+            for line in rs_file:
+                dictionary.setdefault(_conv_int(line.split("\t")[1].strip()),
+                                      _get_std_list(True, start_value))
+    first, resumed, key = _resume(checkpoint, 'smallmem', damping, len(dictionary))
+    if resumed is not None:
+        for data, rank in zip(dictionary.values(), resumed):
+            data[1] = data[2] = rank
+    if stats is not None:
+        stats.update(iterations=first, location=(first % 2) + 1, residual=float('nan'),
+                     norm=norm)
+    start, links = time.time(), sum(k[0] for k in dictionary.values()) if _observed() else None
+    saved = start
+    for iteration in range(first, iterations):
+        began = time.time()
         previous = None
 
         # positions for i and i+1 result values (alternating with iterations).
@@ -223,11 +737,21 @@ def danker_smallmem(dictionary, right_sorted, iterations, damping, start_value):
                     if not dictionary[k][3]:
                         dictionary[k][i_plus_1_location] = 1 - damping
                         dictionary[k][i_location] = 1 - damping
-    print("", file=sys.stderr)
+
+        saved = _save_checkpoint(checkpoint, key, iteration, saved,
+                                 lambda: [v[i_plus_1_location] for v in dictionary.values()])
+        residual = None
+        if tolerance is not None or stats is not None or _observed():
+            residual = _residual((abs(v[1] - v[2]) for v in dictionary.values()), norm)
+        if _converged(iteration, residual, tolerance, norm, stats, i_plus_1_location, began,
+                      links):
+            break
+    _emit('pagerank', start)
     return dictionary
 
 #@profile
-def danker_bigmem(dictionary, iterations, damping):
+def danker_bigmem(dictionary, iterations, damping, tolerance=None, norm='l1', stats=None,
+                  checkpoint=None):
     """
     Compute PageRank with big memory option.
 
@@ -235,18 +759,35 @@ def danker_bigmem(dictionary, iterations, damping):
                        (smallmem set to False).
     :param iterations: The number of PageRank iterations.
     :param damping: The PageRank damping factor.
+    :param tolerance: Optional convergence threshold (see
+                      :func:`danker_smallmem`).
+    :param norm: Norm of the change between two iterations ("l1" or "linf").
+    :param stats: Optional dictionary that is filled with run information
+                  (see :func:`danker_smallmem`).
+    :param checkpoint: Optional :class:`Checkpoint` (see
+                       :func:`danker_smallmem`).
     :return: The same dictionary that was created by :func:`init`. The keys
              are the nodes of the graph. The output score is located at
              the ``(iterations % 2) + 1`` position of the respecive list
-             (that is the value of the key).
+             (that is the value of the key); with ``tolerance`` use
+             ``stats['location']``.
     """
-    for iteration in range(0, iterations):
+    first, resumed, key = _resume(checkpoint, 'bigmem', damping, len(dictionary))
+    if resumed is not None:
+        for data, rank in zip(dictionary.values(), resumed):
+            data[1] = data[2] = rank
+    if stats is not None:
+        stats.update(iterations=first, location=(first % 2) + 1, residual=float('nan'),
+                     norm=norm)
+    start, links = time.time(), sum(k[0] for k in dictionary.values()) if _observed() else None
+    saved = start
+    for iteration in range(first, iterations):
 
         # positions for i and i+1 result values (alternating with iterations).
         i_location = (iteration % 2) + 1
         i_plus_1_location = ((iteration + 1) % 2) + 1
 
-        print(str(iteration + 1) + ".", end="", flush=True, file=sys.stderr)
+        began = time.time()
         for j in dictionary:
             current = dictionary.get(j)
             dank = 1 - damping
@@ -254,49 +795,2901 @@ def danker_bigmem(dictionary, iterations, damping):
                 in_dank = dictionary.get(k)
                 dank = dank + (damping * in_dank[i_location] / in_dank[0])
             dictionary[j][i_plus_1_location] = dank
-    print("", file=sys.stderr)
+
+        saved = _save_checkpoint(checkpoint, key, iteration, saved,
+                                 lambda: [v[i_plus_1_location] for v in dictionary.values()])
+        residual = None
+        if tolerance is not None or stats is not None or _observed():
+            residual = _residual((abs(v[1] - v[2]) for v in dictionary.values()), norm)
+        if _converged(iteration, residual, tolerance, norm, stats, i_plus_1_location, began,
+                      links):
+            break
+    _emit('pagerank', start)
     return dictionary
 
-#@profile
-def _main():
+def danker_adaptive(dictionary, iterations, damping, tolerance, norm='l1', stats=None):
     """
-    Execute main program.
+    Compute PageRank with big memory option and an adaptive active set
+    (residual push): after one full sweep, only nodes whose pending change
+    (residual) is above a threshold are updated, and every update is pushed
+    to the out-links of the node. Nodes that have converged are no longer
+    visited, hence late iterations cost a fraction of a full sweep. The
+    result approximates the fixed point of :func:`danker_bigmem` within
+    ``tolerance``: the sum of the absolute residuals divided by
+    ``1 - damping`` bounds the L1 (and maximum) distance to the exact
+    scores, and the iteration stops once this bound is below
+    ``tolerance``.
+
+    :param dictionary: Python dictionary created with :func:`init`
+                       (smallmem set to False).
+    :param iterations: The maximum number of iterations (rounds over the
+                       active nodes, the first one is a full sweep).
+    :param damping: The PageRank damping factor.
+    :param tolerance: Bound of the distance to the exact scores.
+    :param norm: Norm of the reported residual ("l1" or "linf"); the bound
+                 above holds for both.
+    :param stats: Optional dictionary that is filled with run information
+                  (see :func:`danker_smallmem`); ``residual`` is the bound
+                  of the distance to the exact scores and ``updates`` the
+                  number of node updates.
+    :return: The same dictionary that was created by :func:`init` with the
+             scores at both positions 1 and 2 of the lists.
     """
-    parser = argparse.ArgumentParser(prog='python -m danker', description='danker' +
-                                     ' - Compute PageRank on large graphs with ' +
-                                     'off-the-shelf hardware.')
-    parser.add_argument('left_sorted', type=str, help='A two-column, ' +
-                        'tab-separated file sorted by the left column.')
-    parser.add_argument('right_sorted', nargs='?', type=str, help='The same ' +
-                        'file as left_sorted but sorted by the right column.')
-    parser.add_argument('damping', type=float, help='PageRank damping factor' +
-                        '(between 0 and 1).')
-    parser.add_argument('iterations', type=int, help='Number of PageRank ' +
-                        'iterations (>0).')
-    parser.add_argument('start_value', type=float, help='PageRank starting value'
-                        '(>0).')
-    args = parser.parse_args()
-    if args.iterations <= 0 or args.damping > 1 or args.damping < 0 or args.start_value <= 0:
-        print("ERROR: Provided PageRank parameters\n\t[iterations ({0}), damping ({1}), "
-              "start value({2})]\n\tout of allowed range.\n\n".
-              format(args.iterations, args.damping, args.start_value), file=sys.stderr)
-        parser.print_help(sys.stderr)
-        sys.exit(1)
     start = time.time()
-    dictionary = init(args.left_sorted, args.start_value, args.right_sorted)
-    result_position = (args.iterations % 2) + 1
+    nodes = list(dictionary)
+    position = {node: i for i, node in enumerate(nodes)}
+    values = list(dictionary.values())
+    rank = [k[1] for k in values]
+    # reverse (out-link) index on the in-links of init
+    out_links = [[] for _ in nodes]
+    for i, data in enumerate(values):
+        for in_link in data[3]:
+            out_links[position[in_link]].append(i)
+    weight = [damping / k[0] if k[0] else 0.0 for k in values]
+    threshold = (1 - damping) * tolerance / max(len(nodes), 1)
+    if stats is not None:
+        stats.update(iterations=0, location=1, residual=float('nan'), norm=norm, updates=0)
 
-    if args.right_sorted:
-        danker_smallmem(dictionary, args.right_sorted, args.iterations,
-                        args.damping, args.start_value)
+    # first iteration: full sweep, the residual of every node is its change
+    began = time.time()
+    residual = [1 - damping - rank[i] + sum(rank[position[k]] * weight[position[k]]
+                                            for k in data[3])
+                for i, data in enumerate(values)]
+    total = sum(abs(k) for k in residual)
+    active = [i for i, k in enumerate(residual) if abs(k) > threshold]
+    queued = bytearray(len(nodes))
+    for i in active:
+        queued[i] = 1
+    updates = len(nodes)
+    links = sum(len(k) for k in out_links)
+    for iteration in range(0, iterations):
+        if iteration:
+            began, links = time.time(), 0
+        frontier, active = active, []
+        for i in frontier:
+            queued[i] = 0
+            change = residual[i]
+            residual[i] = 0.0
+            total -= abs(change)
+            rank[i] += change
+            push = change * weight[i]
+            links += len(out_links[i])
+            for j in out_links[i]:
+                old = residual[j]
+                new = residual[j] = old + push
+                total += abs(new) - abs(old)
+                if not queued[j] and abs(new) > threshold:
+                    queued[j] = 1
+                    active.append(j)
+        updates += len(frontier)
+        if not active or total < (1 - damping) * tolerance:
+            # exact sum instead of the running one (rounding)
+            total = sum(abs(k) for k in residual)
+        bound = total / (1 - damping) if damping < 1 else float('inf')
+        if stats is not None:
+            stats['updates'] = updates
+        if _converged(iteration, bound, tolerance, norm, stats, 1, began, links) or \
+                not active:
+            break
+    for data, value in zip(values, rank):
+        data[1] = data[2] = value
+    _emit('pagerank', start)
+    return dictionary
+
+def _require_numpy():
+    """
+    Helper function to fail early if the optional numpy dependency is missing.
+    """
+    if np is None:
+        raise ImportError('The CSR engine of danker requires numpy ' +
+                          '(pip install numpy).')
+
+def _index_dtype(size):
+    """
+    Helper function to return the smallest index type for ``size`` nodes.
+    """
+    if size < 2**31:
+        return np.int32
+    return np.int64
+
+def to_csr(dictionary):
+    """
+    Convert the output of :func:`init` (smallmem set to False) to a
+    :class:`CSRGraph`. The nodes keep the order of the dictionary and the
+    in-links of every node keep the order of the input file.
+
+    :param dictionary: Python dictionary created with :func:`init`
+                       (smallmem set to False).
+    :returns: :class:`CSRGraph` of the same graph.
+    """
+    _require_numpy()
+    nodes = list(dictionary)
+    size = len(nodes)
+    position = {node: i for i, node in enumerate(nodes)}
+    out_degree = np.fromiter((dictionary[k][0] for k in nodes), dtype=np.int64,
+                             count=size)
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.fromiter((len(dictionary[k][3]) for k in nodes), dtype=np.int64,
+                          count=size), out=indptr[1:])
+    indices = np.fromiter((position[i] for k in nodes for i in dictionary[k][3]),
+                          dtype=_index_dtype(size), count=int(indptr[-1]))
+    return CSRGraph(nodes, out_degree, indptr, indices)
+
+def _parse_chunk(data):
+    """
+    Helper function to parse complete lines (bytes) of a link file with
+    integer node names into two int64 arrays without a Python loop per line.
+    The first two tab-separated columns need to be plain decimal numbers,
+    further columns (e.g., the wiki of a link) are ignored.
+
+    :returns: Tuple (left, right) or None if the chunk does not have this
+              format (use :func:`_parse_lines` in that case).
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(buf == 10)
+    tabs = np.flatnonzero(buf == 9)
+    if len(tabs) != len(ends):
+        # keep only the first two columns of every line
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        tabs = np.append(tabs, len(buf))
+        first_tab = tabs[np.searchsorted(tabs, starts)]
+        if (first_tab > ends).any():
+            return None
+        second_end = np.minimum(tabs[np.searchsorted(tabs, first_tab + 1)], ends)
+        keep = np.zeros(len(buf) + 1, dtype=np.int8)
+        keep[starts] = 1
+        keep[second_end] -= 1
+        keep = np.cumsum(keep[:-1], dtype=np.int8).astype(bool)
+        keep[ends] = True
+        data = buf[keep].tobytes()
+        buf = np.frombuffer(data, dtype=np.uint8)
+    # only digits, one tab and one newline per line
+    separators = np.flatnonzero((buf < 48) | (buf > 57))
+    kinds = buf[separators]
+    if len(separators) != 2 * len(ends) or (kinds[0::2] != 9).any() or \
+            (kinds[1::2] != 10).any():
+        return None
+    # no empty fields and at most 18 digits per field (no int64 overflow)
+    lengths = np.diff(separators)
+    if separators[0] == 0 or separators[0] > 18 or lengths.min(initial=2) < 2 or \
+            lengths.max(initial=2) > 19:
+        return None
+    values = np.fromstring(data, dtype=np.int64, sep=' ').reshape(-1, 2)
+    return values[:, 0], values[:, 1]
+
+def _parse_lines(data):
+    """
+    Helper function to parse complete lines (bytes) of a link file line by
+    line (like :func:`init`).
+
+    :returns: Tuple (left, right) of int64 arrays or None if a node name is
+              not an integer.
+    """
+    lines = data.decode('utf-8').split('\n')
+    if not lines[-1]:
+        lines.pop()
+    pairs = [(_conv_int(line.split("\t")[0].strip()), _conv_int(line.split("\t")[1].strip()))
+             for line in lines]
+    if not all(isinstance(i, int) and isinstance(k, int) for i, k in pairs):
+        return None
+    try:
+        pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    except OverflowError:
+        return None
+    return pairs[:, 0], pairs[:, 1]
+
+def _line_chunks(file_name, chunk_size=None):
+    """
+    Helper function to read a file in large binary chunks of complete lines
+    (a missing newline at the end of the file is added).
+    """
+    with open(file_name, 'rb') as in_file:
+        rest = b''
+        while True:
+            data = in_file.read(chunk_size or _LINE_CHUNK_SIZE)
+            if not data:
+                break
+            data = rest + data
+            cut = data.rfind(b'\n') + 1
+            rest = data[cut:]
+            if cut:
+                yield data[:cut]
+        if rest.strip():
+            yield rest + b'\n'
+
+def _int_link_chunks(file_name):
+    """
+    Helper function to read a link file with integer node names in large
+    binary chunks of complete lines.
+
+    :returns: Generator of (left, right) int64 arrays per chunk; None for a
+              chunk that contains non-integer node names.
+    """
+    for data in _line_chunks(file_name):
+        chunk = _parse_chunk(data)
+        yield chunk if chunk is not None else _parse_lines(data)
+
+def _check_sorted(file_name, column, previous):
+    """
+    Helper function to check the order of a column chunk (and the previous
+    value of the column).
+
+    :raises InputNotSortedException: If the column is not sorted.
+    """
+    if previous is not None and len(column) and column[0] < previous:
+        raise InputNotSortedException(file_name, int(column[0]), int(previous))
+    unsorted = np.flatnonzero(column[1:] < column[:-1])
+    if len(unsorted):
+        raise InputNotSortedException(file_name, int(column[unsorted[0] + 1]),
+                                      int(column[unsorted[0]]))
+
+def _stable_argsort(values):
+    """
+    Helper function for a stable argsort of an int64 array. Non-negative
+    values (node IDs) are sorted with a least significant digit radix sort
+    with 16-bit digits (numpy sorts 16-bit integers with a counting sort),
+    i.e., in linear time.
+    """
+    if not len(values) or values.min() < 0:
+        return np.argsort(values, kind='stable')
+    order = np.arange(len(values))
+    high, shift = int(values.max()), 0
+    while shift == 0 or high >> shift:
+        digits = ((values[order] >> shift) & 0xffff).astype(np.uint16)
+        order = order[np.argsort(digits, kind='stable')]
+        shift += 16
+    return order
+
+def _read_int_links(left_sorted, unsorted=False):
+    """
+    Helper function to read a left sorted link file with integer node names
+    into two int64 arrays.
+
+    :param unsorted: If true, the links may be in any order and are sorted
+                     by the left column in memory (stable).
+    :returns: Tuple (left, right) or None if a node name is not an integer.
+    """
+    start, lefts, rights, previous = time.time(), [], [], None
+    for chunk in _int_link_chunks(left_sorted):
+        if chunk is None:
+            return None
+        if not unsorted:
+            _check_sorted(left_sorted, chunk[0], previous)
+        if len(chunk[0]):
+            previous = chunk[0][-1]
+        lefts.append(chunk[0])
+        rights.append(chunk[1])
+    if not lefts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    left, right = np.concatenate(lefts), np.concatenate(rights)
+    if unsorted:
+        order = _stable_argsort(left)
+        left, right = left[order], right[order]
+    _emit('parse', start, len(left))
+    return left, right
+
+def _csr_from_arrays(left, right):
+    """
+    Helper function to build a :class:`CSRGraph` from the columns of a left
+    sorted link file with a single sort of the link targets. The nodes are
+    in the same order as in the dictionary of :func:`init`: a link target is
+    added when its line is read, a link source after the first line of the
+    next source.
+    """
+    links = len(left)
+    source_starts = np.flatnonzero(np.diff(left, prepend=-1) != 0) if links else left[:0]
+    source_counts = np.diff(np.append(source_starts, links))
+    # group the links by target (stable, i.e., in the order of the file)
+    by_target = _stable_argsort(right)
+    targets = right[by_target]
+    target_starts = np.flatnonzero(np.diff(targets, prepend=-1) != 0) if links else left[:0]
+    target_counts = np.diff(np.append(target_starts, links))
+
+    # order of the dictionary: earliest event per node (targets: 2 * line,
+    # sources: 2 * first line of the next source + 1)
+    ids = np.concatenate((targets[target_starts], left[source_starts]))
+    keys = np.concatenate((2 * by_target[target_starts],
+                           2 * (source_starts + source_counts) + 1))
+    first = np.lexsort((keys, ids))
+    ids, keys = ids[first], keys[first]
+    unique = np.flatnonzero(np.diff(ids, prepend=-1) != 0) if len(ids) else ids[:0]
+    order = np.argsort(keys[unique], kind='stable')
+    nodes = ids[unique][order]
+    size = len(nodes)
+    position = np.empty(size, dtype=np.int64)
+    position[order] = np.arange(size)
+    source_positions = position[np.searchsorted(ids[unique], left[source_starts])]
+    target_positions = position[np.searchsorted(ids[unique], targets[target_starts])]
+
+    out_degree = np.zeros(size, dtype=np.int64)
+    out_degree[source_positions] = source_counts
+    in_degree = np.zeros(size, dtype=np.int64)
+    in_degree[target_positions] = target_counts
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(in_degree, out=indptr[1:])
+    # move every group of in-links to the row of its target
+    offset = np.repeat(indptr[target_positions] - target_starts, target_counts)
+    indices = np.empty(links, dtype=_index_dtype(size))
+    indices[offset + np.arange(links)] = np.repeat(source_positions, source_counts)[by_target]
+    return CSRGraph(nodes, out_degree, indptr, indices)
+
+def _init_int_links(left_sorted, start_value, smallmem, unsorted=False):
+    """
+    Helper function for :func:`init` on link files with integer node names.
+    The file is tokenized in bulk (see :func:`_parse_chunk`), only the
+    dictionary itself is built node by node.
+
+    :returns: The dictionary of :func:`init` or None if a node name is not
+              an integer.
+    """
+    if smallmem:
+        # only the out-degree is needed: count chunk by chunk
+        dictionary, previous = {}, None
+        for chunk in _int_link_chunks(left_sorted):
+            if chunk is None:
+                return None
+            left = chunk[0]
+            if not unsorted:
+                _check_sorted(left_sorted, left, previous)
+            if not len(left):
+                continue
+            previous = left[-1]
+            nodes, counts = np.unique(left, return_counts=True)
+            for node, count in zip(nodes.tolist(), counts.tolist()):
+                data = dictionary.setdefault(node, [0, start_value, start_value, False])
+                data[0] += count
+        return {k: dictionary[k] for k in sorted(dictionary)} if unsorted else dictionary
+    columns = _read_int_links(left_sorted, unsorted)
+    if columns is None:
+        return None
+    graph = _csr_from_arrays(*columns)
+    in_links = graph.nodes[graph.indices].tolist()
+    indptr = graph.indptr.tolist()
+    return {node: [degree, start_value, start_value, in_links[indptr[i]:indptr[i + 1]]]
+            for i, (node, degree) in enumerate(zip(graph.nodes.tolist(),
+                                                   graph.out_degree.tolist()))}
+
+class NodeTable(object):
+    """
+    Node table of :func:`danker_smallmem` for integer node names (see
+    :func:`init_table`): typed arrays instead of a dictionary of lists
+    (about 30 instead of well over 100 bytes per node).
+
+    :param nodes: Sorted int64 array of the nodes; if they are contiguous,
+                  positions are computed directly from the IDs, otherwise
+                  by binary search.
+    :param out_degree: int32 array with the number of out-links per node.
+    :param ranks: Array of shape (2, nodes) with the scores of the last
+                  two iterations (see :meth:`scores`).
+    :param touched: Bitset (uint8 array) of the nodes with in-links, set in
+                    the first iteration.
+    """
+
+    def __init__(self, nodes, out_degree, ranks, touched):
+        self.nodes = nodes
+        self.out_degree = out_degree
+        self.ranks = ranks
+        self.touched = touched
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def scores(self, location):
+        """
+        Return the scores at a location (``stats['location']``, 1 or 2, like
+        the positions in the lists of the dictionary of :func:`init`).
+        """
+        return self.ranks[location - 1]
+
+def init_table(left_sorted, start_value, unsorted=False, dtype='<f8'):
+    """
+    Create the node table of :func:`danker_smallmem` for a link file with
+    integer node names (needs numpy).
+
+    :param left_sorted: A tab-separated link file that is sorted by the
+                        left column.
+    :param start_value: The PageRank starting value.
+    :param unsorted: If true, the link file may be in any order (only the
+                     links per node are counted). Default is "False".
+    :param dtype: Type of the scores (e.g., float32 halves their memory at
+                  the cost of precision). Default is float64.
+    :returns: :class:`NodeTable` or None if a node name is not an integer.
+    :raises InputNotSortedException: If the file is not sorted.
+    """
+    _require_numpy()
+    start = time.time()
+    nodes, counts, previous = [], [], None
+    for chunk in _int_link_chunks(left_sorted):
+        if chunk is None:
+            return None
+        left = chunk[0]
+        if not unsorted:
+            _check_sorted(left_sorted, left, previous)
+        if len(left):
+            previous = left[-1]
+            chunk_nodes, chunk_counts = np.unique(left, return_counts=True)
+            nodes.append(chunk_nodes)
+            counts.append(chunk_counts)
+    nodes = np.concatenate(nodes) if nodes else np.zeros(0, dtype=np.int64)
+    counts = np.concatenate(counts) if counts else np.zeros(0, dtype=np.int64)
+    # nodes split between chunks (or scattered in unsorted files) are merged
+    nodes, inverse = np.unique(nodes, return_inverse=True)
+    out_degree = np.bincount(inverse, weights=counts, minlength=len(nodes)).astype(np.int32)
+    table = NodeTable(nodes, out_degree, np.full((2, len(nodes)), start_value, dtype=dtype),
+                      np.zeros((len(nodes) + 7) // 8, dtype=np.uint8))
+    _emit('init', start, int(out_degree.sum()), nodes=len(nodes))
+    return table
+
+def _table_positions(nodes, ids):
+    """
+    Helper function to find node IDs in the sorted nodes of a
+    :class:`NodeTable`.
+
+    :returns: Tuple (positions, mask of the IDs that are nodes).
+    """
+    if not len(nodes):
+        return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+    if nodes[-1] - nodes[0] == len(nodes) - 1:
+        positions = ids - nodes[0]
+        found = (positions >= 0) & (positions < len(nodes))
+        return np.where(found, positions, 0), found
+    positions = np.minimum(np.searchsorted(nodes, ids), len(nodes) - 1)
+    return positions, nodes[positions] == ids
+
+def _table_add(table, ids, start_value, values=None, location=1):
+    """
+    Helper function to add nodes without out-links (they only occur in the
+    right column) to a :class:`NodeTable`; they have in-links, hence they
+    are touched.
+
+    :param values: Optional scores of the new nodes at ``location`` (summed
+                   up for duplicate IDs).
+    """
+    ids, inverse = np.unique(ids, return_inverse=True)
+    touched = np.unpackbits(table.touched)[:len(table)].astype(bool)
+    at = np.searchsorted(table.nodes, ids)
+    table.nodes = np.insert(table.nodes, at, ids)
+    table.out_degree = np.insert(table.out_degree, at, 0)
+    ranks = np.insert(table.ranks, at, start_value, axis=1)
+    if values is not None:
+        ranks[location - 1, at + np.arange(len(at))] = np.bincount(inverse, weights=values)
+    table.ranks = ranks
+    table.touched = np.packbits(np.insert(touched, at, True))
+
+def _right_int_chunks(right_sorted):
+    """
+    Helper function to read a right sorted link file of a
+    :class:`NodeTable` chunk by chunk (see :func:`_int_link_chunks`).
+
+    :raises InputNotSortedException: If the file is not sorted.
+    :raises ValueError: If a node name is not an integer.
+    """
+    previous = None
+    for chunk in _int_link_chunks(right_sorted):
+        if chunk is None:
+            raise ValueError('File "{0}" contains non-integer node names.'.format(
+                right_sorted))
+        _check_sorted(right_sorted, chunk[1], previous)
+        if len(chunk[1]):
+            previous = chunk[1][-1]
+            yield chunk
+
+def _danker_smallmem_table(table, right_sorted, iterations, damping, start_value, tolerance,
+                           norm, stats, checkpoint):
+    """
+    Helper function for :func:`danker_smallmem` with a :class:`NodeTable`:
+    the right sorted file is read in large chunks and every chunk updates
+    the arrays at once.
+    """
+    if checkpoint is not None and checkpoint.resume and os.path.exists(checkpoint.file_name):
+        # add the nodes without out-links like the first iteration does
+        for _, right in _right_int_chunks(right_sorted):
+            found = _table_positions(table.nodes, right)[1]
+            if not found.all():
+                _table_add(table, right[~found], start_value)
+    first, resumed, key = _resume(checkpoint, 'table', damping, len(table))
+    if resumed is not None:
+        table.ranks[:] = np.frombuffer(resumed, dtype=np.float64)
+    if stats is not None:
+        stats.update(iterations=first, location=(first % 2) + 1, residual=float('nan'),
+                     norm=norm)
+    start, links = time.time(), int(table.out_degree.sum())
+    saved = start
+    for iteration in range(first, iterations):
+        began = time.time()
+        i_location = (iteration % 2) + 1
+        i_plus_1_location = ((iteration + 1) % 2) + 1
+        old, new = table.scores(i_location), table.scores(i_plus_1_location)
+        new.fill(1 - damping)
+        added = []
+        for left, right in _right_int_chunks(right_sorted):
+            sources, found = _table_positions(table.nodes, left)
+            if not found.all():
+                raise ValueError('Node {0} of "{1}" has no out-links in the left link '
+                                 'file.'.format(int(left[~found][0]), right_sorted))
+            targets, starts = np.unique(right, return_index=True)
+            positions, found = _table_positions(table.nodes, targets)
+            # every sum starts with 1 - damping or with the partial sum of a target
+            # whose in-links started in the previous chunk
+            base = np.where(found, new[positions], 1 - damping)
+            if added and len(added[-1][0]) and not found[0] and \
+                    added[-1][0][-1] == targets[0]:
+                base[0] = added[-1][1][-1]
+                added[-1] = (added[-1][0][:-1], added[-1][1][:-1])
+            # in-links in the order of the file, like the dictionary
+            indptr = np.append(starts, len(right))
+            sums = np.empty(len(targets), dtype=new.dtype)
+            _sum_in_links(indptr, sources, _buckets(indptr), old, base, sums, damping,
+                          table.out_degree)
+            new[positions[found]] = sums[found]
+            if iteration == 0:
+                positions = positions[found]
+                np.bitwise_or.at(table.touched, positions >> 3,
+                                 (128 >> (positions & 7)).astype(np.uint8))
+                if not found.all():
+                    added.append((targets[~found], sums[~found]))
+        if iteration == 0:
+            # fix 'untouched' nodes (they do not have incoming links)
+            old[np.unpackbits(table.touched)[:len(table)] == 0] = 1 - damping
+            if added:
+                _table_add(table, np.concatenate([k[0] for k in added]), start_value,
+                           np.concatenate([k[1] for k in added]), i_plus_1_location)
+                old, new = table.scores(i_location), table.scores(i_plus_1_location)
+
+        saved = _save_checkpoint(checkpoint, key, iteration, saved, lambda: new)
+        residual = None
+        if tolerance is not None or stats is not None or _observed():
+            residual = _change(new, old, norm)
+        if _converged(iteration, residual, tolerance, norm, stats, i_plus_1_location, began,
+                      links):
+            break
+    _emit('pagerank', start)
+    return table
+
+def _name_key(name):
+    """
+    Helper function to compare node names like :func:`init` (integers
+    numerically, strings after integers).
+    """
+    value = _conv_int(name)
+    return (isinstance(value, str), value)
+
+def _read_str_links(left_sorted, unsorted=False):
+    """
+    Helper function to read a left sorted link file with string node names.
+    The names are interned: every name is stored once and the links are
+    kept as two int64 arrays of dense IDs (no Python object per link).
+
+    :param unsorted: If true, the links may be in any order and are sorted
+                     by the left column (stable).
+    :returns: Tuple (left, right, names) with the IDs and the list of names
+              (the ID is the position in this list).
+    """
+    start, vocabulary, lefts, rights, previous = time.time(), {}, [], [], None
+    for data in _line_chunks(left_sorted):
+        sources, targets = [], []
+        for line in data.decode('utf-8').split('\n')[:-1]:
+            columns = line.split("\t")
+            current = columns[0].strip()
+            if current != previous:
+                if previous is not None and not unsorted and \
+                        _conv_int(current) < _conv_int(previous):
+                    raise InputNotSortedException(left_sorted, _conv_int(current),
+                                                  _conv_int(previous))
+                previous = current
+            sources.append(vocabulary.setdefault(current, len(vocabulary)))
+            targets.append(vocabulary.setdefault(columns[1].strip(), len(vocabulary)))
+        lefts.append(np.array(sources, dtype=np.int64))
+        rights.append(np.array(targets, dtype=np.int64))
+    names = list(vocabulary)
+    del vocabulary
+    left = np.concatenate(lefts) if lefts else np.zeros(0, dtype=np.int64)
+    right = np.concatenate(rights) if rights else np.zeros(0, dtype=np.int64)
+    if unsorted:
+        rank = np.empty(len(names), dtype=np.int64)
+        rank[sorted(range(len(names)), key=lambda i: _name_key(names[i]))] = \
+            np.arange(len(names))
+        order = _stable_argsort(rank[left])
+        left, right = left[order], right[order]
+    _emit('parse', start, len(left))
+    return left, right, names
+
+def init_csr(left_sorted, unsorted=False):
+    """
+    Read a link file directly into a :class:`CSRGraph` (requires numpy),
+    i.e., the same as ``to_csr(init(left_sorted, start_value, False))``
+    but without the intermediate dictionary. Files with integer node names
+    are read in large binary chunks and tokenized in bulk, which is much
+    faster than the line by line parser. String node names are interned,
+    i.e., the computation runs on dense integer IDs and the names are kept
+    once in a compact :class:`StringTable` (instead of one string object per
+    link in the dictionary of :func:`init`).
+
+    :param left_sorted: A tab-separated link file that is sorted by the
+                        left column.
+    :param unsorted: The link file may be in any order (see :func:`init`).
+    :returns: :class:`CSRGraph` of the link file (with an int64 array of
+              nodes for integer node names or a :class:`StringTable`).
+    :raises InputNotSortedException: If the input is not sorted correctly.
+    """
+    _require_numpy()
+    start = time.time()
+    columns = _read_int_links(left_sorted, unsorted)
+    if columns is not None:
+        graph = _csr_from_arrays(*columns)
     else:
-        danker_bigmem(dictionary, args.iterations, args.damping)
+        left, right, names = _read_str_links(left_sorted, unsorted)
+        graph = _csr_from_arrays(left, right)
+        graph = graph._replace(nodes=string_table([names[i] for i in graph.nodes.tolist()]))
+    _emit('init', start, len(graph.indices), nodes=len(graph.nodes))
+    return graph
 
-    print("Computation of PageRank on '{0}' with {1} took {2:.2f} seconds.".format(
-        args.left_sorted, 'danker', time.time() - start), file=sys.stderr)
+def _buckets(indptr, rows=None, width=1):
+    """
+    Helper function to group the rows of a CSR graph by their in-degree. The
+    in-links of all rows of a group form a regular 2-D array that is summed
+    up with ``np.add.accumulate``, i.e., in the original order and with
+    exactly the same floating point results as :func:`danker_bigmem`. The
+    adjacency itself is not copied (it may be memory-mapped) and groups are
+    split such that the temporary arrays stay small.
+
+    :param indptr: The ``indptr`` array of a :class:`CSRGraph`.
+    :param rows: Optional array with a subset of the rows (default: all).
+    :param width: Number of values per in-link (columns of a rank matrix).
+    :returns: Tuple (row_order, groups) to be used with :func:`_sum_in_links`.
+    """
+    if rows is None:
+        in_degree = np.diff(indptr)
+        row_order = np.argsort(in_degree, kind='stable')
+        sorted_degree = in_degree[row_order]
+    else:
+        in_degree = indptr[rows + 1] - indptr[rows]
+        order = np.argsort(in_degree, kind='stable')
+        row_order, sorted_degree = rows[order], in_degree[order]
+    bounds = [0] + (np.flatnonzero(np.diff(sorted_degree)) + 1).tolist() + [len(row_order)]
+    groups = []
+    for low, high in zip(bounds[:-1], bounds[1:]):
+        if low == high:
+            continue
+        degree = int(sorted_degree[low])
+        step = max(1, _CHUNK_SIZE // max(degree * width, 1))
+        for first in range(low, high, step):
+            groups.append((degree, first, min(high, first + step)))
+    return row_order, groups
+
+def _sum_in_links(indptr, indices, buckets, contrib, base, out, damping=None, divisor=None):
+    """
+    Helper function to compute ``base`` plus the sum of the contributions of
+    all in-links for every row of a CSR graph.
+
+    :param indptr: The ``indptr`` array of a :class:`CSRGraph` (or a slice
+                   ``indptr[low:high + 1]`` for the rows low to high).
+    :param indices: The ``indices`` array of the :class:`CSRGraph`.
+    :param buckets: Tuple created with :func:`_buckets` (same ``indptr``).
+    :param contrib: Contribution of every node to each of its out-links (an
+                    array with one value or one row of values per node).
+    :param base: Starting value of every sum (float or an array with one
+                 value or one row of values per row).
+    :param out: Array for the results (one value or row of values per row).
+    :param damping: If given (together with ``divisor``), ``contrib`` holds
+                    the ranks and the contribution of every in-link is
+                    computed on the fly as ``damping * rank / divisor``.
+    :param divisor: Out-degree of every node (see ``damping``).
+    """
+    row_order, groups = buckets
+    for degree, low, high in groups:
+        rows = row_order[low:high]
+        row_base = base[rows] if isinstance(base, np.ndarray) else base
+        if degree == 0:
+            out[rows] = row_base
+            continue
+        sources = indices[indptr[rows][:, None] + np.arange(degree)]
+        in_links = contrib[sources]
+        if divisor is not None:
+            in_links = damping * in_links / divisor[sources]
+        in_links[:, 0] += row_base
+        out[rows] = np.add.accumulate(in_links, axis=1)[:, -1]
+
+def _change(new, old, norm):
+    """
+    Helper function to compute the change between two rank vectors (the
+    largest change of any column for rank matrices).
+    """
+    difference = np.abs(new - old)
+    if norm == 'linf':
+        return float(difference.max(initial=0.0))
+    if difference.ndim > 1:
+        return float(difference.sum(axis=0).max(initial=0.0))
+    return float(difference.sum())
+
+def _shared_array(shape, dtype='<f8'):
+    """
+    Helper function to allocate a zero-initialized array in anonymous shared
+    memory that is inherited by forked worker processes.
+    """
+    count = int(np.prod(shape))
+    buffer = mmap.mmap(-1, max(count, 1) * np.dtype(dtype).itemsize)
+    return np.frombuffer(buffer, dtype=dtype, count=count).reshape(shape)
+
+def _shards(indptr, workers):
+    """
+    Helper function to split the rows of a CSR graph into contiguous shards
+    with roughly the same amount of work (rows plus in-links).
+
+    :returns: List of (low, high) row ranges.
+    """
+    size = len(indptr) - 1
+    work = indptr + np.arange(size + 1)
+    bounds = np.searchsorted(work, np.linspace(0, work[-1], workers + 1), side='left')
+    bounds[0], bounds[-1] = 0, size
+    return [(int(low), int(high)) for low, high in zip(bounds[:-1], bounds[1:])]
+
+def _csr_worker(graph, shard, number, ranks, contrib, divisor, damping, norm, control,
+                partial, barrier):
+    """
+    Helper function executed by every worker process of the parallel CSR
+    engine. Each iteration consists of three phases separated by barriers:
+    (1) update the contributions of the shard, (2) update the ranks of the
+    shard, (3) publish the change of the shard. The main process sets
+    ``control[0]`` to the next iteration (or -1 to stop) before phase 1.
+    """
+    low, high = shard
+    indptr = graph.indptr[low:high + 1]
+    buckets = _buckets(indptr)
+    try:
+        while True:
+            barrier.wait()
+            iteration = int(control[0])
+            if iteration < 0:
+                return
+            i_location = iteration % 2
+            i_plus_1_location = (iteration + 1) % 2
+            contrib[low:high] = damping * ranks[i_location][low:high] / divisor[low:high]
+            barrier.wait()
+            _sum_in_links(indptr, graph.indices, buckets, contrib, 1 - damping,
+                          ranks[i_plus_1_location][low:high])
+            partial[number] = _change(ranks[i_plus_1_location][low:high],
+                                      ranks[i_location][low:high], norm)
+            barrier.wait()
+    except BaseException:
+        barrier.abort()
+        raise
+
+def _danker_csr_parallel(graph, ranks, divisor, iterations, damping, tolerance, norm, stats,
+                         workers, first, checkpoint, key):
+    """
+    Helper function to run the iterations of :func:`danker_csr` with a pool
+    of forked worker processes. Rank vectors and contributions live in shared
+    memory, the adjacency is shared copy-on-write (or through the page cache
+    if it is memory-mapped). Every row is computed exactly as in the serial
+    engine, hence the results are bit-identical.
+    """
+    context = multiprocessing.get_context('fork')
+    shared_ranks = _shared_array(ranks.shape)
+    shared_ranks[:] = ranks
+    contrib = _shared_array(ranks.shape[1:])
+    partial = _shared_array((workers,))
+    control = _shared_array((1,), '<i8')
+    barrier = context.Barrier(workers + 1)
+    processes = [context.Process(target=_csr_worker,
+                                 args=(graph, shard, number, shared_ranks, contrib, divisor,
+                                       damping, norm, control, partial, barrier))
+                 for number, shard in enumerate(_shards(graph.indptr, workers))]
+    for process in processes:
+        process.start()
+    links, saved = len(graph.indices), time.time()
+    try:
+        for iteration in range(first, iterations):
+            began = time.time()
+            control[0] = iteration
+            barrier.wait()
+            barrier.wait()
+            barrier.wait()
+            saved = _save_checkpoint(checkpoint, key, iteration, saved,
+                                     lambda: shared_ranks[(iteration + 1) % 2])
+            residual = None
+            if tolerance is not None or stats is not None or _observed():
+                residual = float(partial.max() if norm == 'linf' else partial.sum())
+            if _converged(iteration, residual, tolerance, norm, stats, (iteration + 1) % 2,
+                          began, links):
+                break
+        control[0] = -1
+        barrier.wait()
+    except BaseException:
+        # only on errors: aborting after the last wait races with waking workers
+        barrier.abort()
+        raise
+    finally:
+        for process in processes:
+            process.join()
+    return shared_ranks
+
+#@profile
+def danker_csr(graph, iterations, damping, start_value, tolerance=None, norm='l1',
+               stats=None, workers=1, checkpoint=None):
+    """
+    Compute PageRank on a :class:`CSRGraph` with vectorized sparse
+    matrix-vector products (requires numpy).
+
+    :param graph: :class:`CSRGraph`, e.g., created with :func:`to_csr`.
+    :param iterations: The number of PageRank iterations.
+    :param damping: The PageRank damping factor.
+    :param start_value: The PageRank starting value (a float or an array with
+                        one value per node).
+    :param tolerance: Optional convergence threshold (see
+                      :func:`danker_smallmem`).
+    :param norm: Norm of the change between two iterations ("l1" or "linf").
+    :param stats: Optional dictionary that is filled with run information
+                  (see :func:`danker_smallmem`); ``location`` is the row of
+                  the output score.
+    :param workers: Number of worker processes. With more than one worker
+                    the nodes are split into contiguous shards that are
+                    updated in parallel (requires the "fork" start method
+                    of :mod:`multiprocessing`, i.e., a Unix system). The
+                    results are the same as with one worker.
+    :param checkpoint: Optional :class:`Checkpoint` (see
+                       :func:`danker_smallmem`).
+    :return: float64 array of shape ``(2, len(graph.nodes))`` with the two
+             alternating rank vectors. The output score is located at row
+             ``iterations % 2`` (with ``tolerance`` use ``stats['location']``).
+    """
+    _require_numpy()
+    size = len(graph.nodes)
+    ranks = np.empty((2, size), dtype=np.float64)
+    first, resumed, key = _resume(checkpoint, 'csr', damping, size)
+    ranks[:] = start_value if resumed is None else np.asarray(resumed)
+
+    # nodes without out-links never contribute (avoid division by zero)
+    divisor = np.where(graph.out_degree > 0, graph.out_degree, 1).astype(np.float64)
+    if stats is not None:
+        stats.update(iterations=first, location=first % 2, residual=float('nan'), norm=norm)
+    start, links = time.time(), len(graph.indices)
+    if workers > 1:
+        ranks = _danker_csr_parallel(graph, ranks, divisor, iterations, damping, tolerance,
+                                     norm, stats, workers, first, checkpoint, key)
+        _emit('pagerank', start)
+        return ranks
+
+    buckets = _buckets(graph.indptr)
+    saved = start
+    for iteration in range(first, iterations):
+        began = time.time()
+
+        # rows for i and i+1 result values (alternating with iterations).
+        i_location = iteration % 2
+        i_plus_1_location = (iteration + 1) % 2
+
+        # contribution of every node to each of its out-links
+        contrib = damping * ranks[i_location] / divisor
+        _sum_in_links(graph.indptr, graph.indices, buckets, contrib, 1 - damping,
+                      ranks[i_plus_1_location])
+
+        saved = _save_checkpoint(checkpoint, key, iteration, saved,
+                                 lambda: ranks[i_plus_1_location])
+        residual = None
+        if tolerance is not None or stats is not None or _observed():
+            residual = _change(ranks[i_plus_1_location], ranks[i_location], norm)
+        if _converged(iteration, residual, tolerance, norm, stats, i_plus_1_location, began,
+                      links):
+            break
+    _emit('pagerank', start)
+    return ranks
+
+def _node_order(graph, order):
+    """
+    Helper function to return the update order of :func:`danker_gauss_seidel`.
+    """
+    if isinstance(order, str):
+        if order == 'natural':
+            return np.arange(len(graph.nodes))
+        if order == 'reverse':
+            return np.arange(len(graph.nodes))[::-1].copy()
+        if order == 'in-degree':
+            return np.argsort(-np.diff(graph.indptr), kind='stable')
+        if order == 'out-degree':
+            return np.argsort(-np.asarray(graph.out_degree), kind='stable')
+        raise ValueError('Unknown node order "{0}".'.format(order))
+    order = np.asarray(order, dtype=np.int64)
+    if len(order) != len(graph.nodes):
+        raise ValueError('The node order needs one position per node.')
+    return order
+
+#@profile
+def danker_gauss_seidel(graph, iterations, damping, start_value, tolerance=None, norm='l1',
+                        stats=None, order='natural', block_size=None, checkpoint=None):
+    """
+    Compute PageRank on a :class:`CSRGraph` with Gauss-Seidel iteration
+    (requires numpy): a single rank vector is updated in place, i.e., every
+    update already uses the new scores of the nodes updated before it. This
+    usually needs considerably fewer iterations than the Jacobi iteration of
+    the other engines (see ``script/gauss_seidel.py``) and only one rank
+    vector. The results agree with the other engines up to the tolerance
+    (not bit for bit).
+
+    :param graph: :class:`CSRGraph`, e.g., created with :func:`to_csr`.
+    :param iterations: The (maximum) number of PageRank iterations.
+    :param damping: The PageRank damping factor.
+    :param start_value: The PageRank starting value (a float or an array with
+                        one value per node).
+    :param tolerance: Optional convergence threshold (see
+                      :func:`danker_smallmem`).
+    :param norm: Norm of the change between two iterations ("l1" or "linf").
+    :param stats: Optional dictionary that is filled with run information
+                  (see :func:`danker_smallmem`).
+    :param order: Update order of the nodes: "natural" (order of the graph),
+                  "reverse", "in-degree" or "out-degree" (descending), or
+                  an array with a permutation of the node positions.
+    :param block_size: Number of nodes that are updated together with one
+                       vectorized operation (1 is classic Gauss-Seidel).
+                       Default is 1/256 of the nodes (at most 65536).
+    :param checkpoint: Optional :class:`Checkpoint` (see
+                       :func:`danker_smallmem`).
+    :return: float64 array of shape ``(1, len(graph.nodes))`` with the
+             ranks (``stats['location']`` is always 0).
+    """
+    _require_numpy()
+    size = len(graph.nodes)
+    ranks = np.empty((1, size), dtype=np.float64)
+    rank = ranks[0]
+    rows = _node_order(graph, order)
+    if block_size is None:
+        block_size = min(max(size // 256, 1), 65536)
+    blocks = [_buckets(graph.indptr, rows[low:low + block_size])
+              for low in range(0, size, block_size)]
+    # the result depends on the update order
+    first, resumed, key = _resume(checkpoint, 'gauss-seidel {0} {1}'.format(
+        order if isinstance(order, str) else 'custom', block_size), damping, size)
+    ranks[:] = start_value if resumed is None else np.asarray(resumed)
+    if stats is not None:
+        stats.update(iterations=first, location=0, residual=float('nan'), norm=norm)
+    start, links = time.time(), len(graph.indices)
+    saved = start
+    for iteration in range(first, iterations):
+        began = time.time()
+        changes = []
+        for buckets in blocks:
+            previous = rank[buckets[0]]
+            _sum_in_links(graph.indptr, graph.indices, buckets, rank, 1 - damping, rank,
+                          damping, graph.out_degree)
+            changes.append(_change(rank[buckets[0]], previous, norm))
+
+        saved = _save_checkpoint(checkpoint, key, iteration, saved, lambda: rank)
+        residual = None
+        if tolerance is not None or stats is not None or _observed():
+            residual = _residual(changes, norm)
+        if _converged(iteration, residual, tolerance, norm, stats, 0, began, links):
+            break
+    _emit('pagerank', start)
+    return ranks
+
+def danker_bigmem_csr(dictionary, iterations, damping, tolerance=None, norm='l1',
+                      stats=None, workers=1):
+    """
+    Compute PageRank with big memory option using the vectorized CSR engine
+    (requires numpy). Produces the same results as :func:`danker_bigmem`.
+
+    :param dictionary: Python dictionary created with :func:`init`
+                       (smallmem set to False).
+    :param iterations: The number of PageRank iterations.
+    :param damping: The PageRank damping factor.
+    :param tolerance: Optional convergence threshold (see
+                      :func:`danker_smallmem`).
+    :param norm: Norm of the change between two iterations ("l1" or "linf").
+    :param stats: Optional dictionary that is filled with run information
+                  (see :func:`danker_smallmem`).
+    :param workers: Number of worker processes (see :func:`danker_csr`).
+    :return: The same dictionary that was created by :func:`init`. The keys
+             are the nodes of the graph. The output score is located at
+             the ``(iterations % 2) + 1`` position of the respecive list
+             (that is the value of the key); with ``tolerance`` use
+             ``stats['location']``.
+    """
+    graph = to_csr(dictionary)
+    start = np.fromiter((dictionary[k][1] for k in graph.nodes), dtype=np.float64,
+                        count=len(graph.nodes))
+    ranks = danker_csr(graph, iterations, damping, start, tolerance, norm, stats, workers)
+    if stats is not None:
+        stats['location'] += 1
+    for k, rank_1, rank_2 in zip(graph.nodes, ranks[0].tolist(), ranks[1].tolist()):
+        dictionary[k][1] = rank_1
+        dictionary[k][2] = rank_2
+    return dictionary
+
+def danker_personalized(graph, teleport, iterations, damping, start_value, tolerance=None,
+                        norm='l1', stats=None):
+    """
+    Compute several personalized (topic-specific) PageRank rankings on a
+    :class:`CSRGraph` in one pass (requires numpy). Instead of jumping to
+    every node with the same probability, the random surfer of ranking ``k``
+    jumps to the nodes of column ``k`` of ``teleport`` (e.g., all pages of a
+    category or of one language edition). The ranks of all rankings are kept
+    in one matrix with one row per node, such that every traversal of the
+    in-links updates all rankings together. The scores are scaled like the
+    ones of :func:`danker_csr`: with a uniform teleport vector both are the
+    same.
+
+    :param graph: :class:`CSRGraph`, e.g., created with :func:`to_csr`.
+    :param teleport: float64 array of shape ``(len(graph.nodes), K)`` with
+                     one teleport distribution (column sum 1) per ranking,
+                     see :func:`teleport_matrix` and :func:`load_seeds`.
+    :param iterations: The number of PageRank iterations.
+    :param damping: The PageRank damping factor.
+    :param start_value: The PageRank starting value (a float or an array that
+                        can be broadcast to the shape of ``teleport``).
+    :param tolerance: Optional convergence threshold (see
+                      :func:`danker_smallmem`); the largest change of all
+                      rankings is compared.
+    :param norm: Norm of the change between two iterations ("l1" or "linf").
+    :param stats: Optional dictionary that is filled with run information
+                  (see :func:`danker_csr`).
+    :return: float64 array of shape ``(2, len(graph.nodes), K)`` with the
+             two alternating rank matrices. The output scores are located at
+             ``iterations % 2`` (with ``tolerance`` use ``stats['location']``).
+    """
+    _require_numpy()
+    size = len(graph.nodes)
+    teleport = np.asarray(teleport, dtype=np.float64)
+    if teleport.ndim != 2 or teleport.shape[0] != size:
+        raise ValueError('The teleport matrix needs one row per node.')
+    ranks = np.empty((2,) + teleport.shape, dtype=np.float64)
+    ranks[:] = start_value
+    base = (1 - damping) * size * teleport
+
+    divisor = np.where(graph.out_degree > 0, graph.out_degree, 1).astype(np.float64)
+    divisor = divisor[:, None]
+    if stats is not None:
+        stats.update(iterations=0, location=0, residual=float('nan'), norm=norm)
+    buckets = _buckets(graph.indptr, width=teleport.shape[1])
+    start, links = time.time(), len(graph.indices)
+    for iteration in range(0, iterations):
+        began = time.time()
+
+        # matrices for i and i+1 result values (alternating with iterations).
+        i_location = iteration % 2
+        i_plus_1_location = (iteration + 1) % 2
+
+        contrib = damping * ranks[i_location] / divisor
+        _sum_in_links(graph.indptr, graph.indices, buckets, contrib, base,
+                      ranks[i_plus_1_location])
+
+        residual = None
+        if tolerance is not None or stats is not None or _observed():
+            residual = _change(ranks[i_plus_1_location], ranks[i_location], norm)
+        if _converged(iteration, residual, tolerance, norm, stats, i_plus_1_location, began,
+                      links):
+            break
+    _emit('pagerank', start)
+    return ranks
+
+def _parse_sources(data):
+    """
+    Helper function to read the third column of complete lines (bytes) of a
+    link file (e.g., the wiki of a link) and to dictionary-encode it without
+    a Python loop per line. Lines without a third column have the source "".
+
+    :returns: Tuple (names, codes): list with the distinct source names and
+              int64 array with the position of the name of every line.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(buf == 10)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    tabs = np.append(np.flatnonzero(buf == 9), len(buf))
+    first = np.searchsorted(tabs, starts)
+    low = np.minimum(tabs[np.minimum(first + 1, len(tabs) - 1)] + 1, ends)
+    high = np.minimum(tabs[np.minimum(first + 2, len(tabs) - 1)], ends)
+    high -= (high > low) & (buf[np.maximum(high - 1, 0)] == 13)
+    lengths = high - low
+    width = int(lengths.max(initial=0))
+    if not width:
+        return [''], np.zeros(len(ends), dtype=np.int64)
+    # one fixed-width byte string per line (column by column, small temporaries)
+    matrix = np.zeros((len(ends), width), dtype=np.uint8)
+    for column in range(width):
+        inside = lengths > column
+        matrix[inside, column] = buf[low[inside] + column]
+    values, codes = np.unique(matrix.view('S{0}'.format(width)).ravel(), return_inverse=True)
+    return [k.decode('utf-8') for k in values.tolist()], codes.ravel()
+
+def load_source_groups(group_file):
+    """
+    Read a source group file: source name and group name (tab-separated)
+    per line, e.g., to combine the dumps of one wiki or several wikis of one
+    language family (see :func:`init_multi_source`).
+
+    :returns: Dictionary source name -> group name.
+    """
+    groups = {}
+    with open(group_file, encoding="utf-8") as in_file:
+        for line in in_file:
+            columns = line.rstrip("\r\n").split("\t")
+            if len(columns) >= 2 and columns[0]:
+                groups[columns[0]] = columns[1]
+    return groups
+
+def init_multi_source(link_file, groups=None):
+    """
+    Read a link file with a third column naming the source of every link
+    (e.g., "enwiki-20200501" in the output of ``create_links.sh``, integer
+    node names needed) into one :class:`CSRGraph` that is the disjoint union
+    of the global graph (all links, as read by :func:`init_csr`) and of one
+    graph per source (or group of sources). Every engine of a
+    :class:`CSRGraph` (e.g., :func:`danker_csr`) then computes the global
+    ranks and the ranks of every source in a single traversal of the links;
+    the scores are the same as the ones of separate runs. The links may be
+    in any order.
+
+    :param link_file: A tab-separated link file with a source column.
+    :param groups: Optional dictionary source name -> group name (see
+                   :func:`load_source_groups`); sources in the same group
+                   share one graph, sources mapped to "" only count for
+                   the global graph.
+    :returns: Tuple (graph, sources, names): the :class:`CSRGraph` (its
+              ``nodes`` are the node IDs, every node once per source it
+              occurs in), an int64 array with the source of every node (0
+              is the global graph) and the list of source names (the first
+              one is "").
+    :raises ValueError: If a node name is not an integer.
+    """
+    _require_numpy()
+    start = time.time()
+    names, lefts, rights, codes = {'': 0}, [], [], []
+    for data in _line_chunks(link_file):
+        chunk = _parse_chunk(data)
+        if chunk is None:
+            chunk = _parse_lines(data)
+        if chunk is None:
+            raise ValueError('File "{0}" contains non-integer node names.'.format(link_file))
+        chunk_names, chunk_codes = _parse_sources(data)
+        chunk_names = [groups.get(k, k) for k in chunk_names] if groups else chunk_names
+        lookup = np.array([names.setdefault(k, len(names)) for k in chunk_names],
+                          dtype=np.int64)
+        lefts.append(chunk[0])
+        rights.append(chunk[1])
+        codes.append(lookup[chunk_codes])
+    left = np.concatenate(lefts) if lefts else np.zeros(0, dtype=np.int64)
+    right = np.concatenate(rights) if rights else np.zeros(0, dtype=np.int64)
+    codes = np.concatenate(codes) if codes else np.zeros(0, dtype=np.int64)
+    _emit('parse', start, len(left))
+
+    nodes = np.unique(np.concatenate((left, right)))
+    size = max(len(nodes), 1)
+    left, right = np.searchsorted(nodes, left), np.searchsorted(nodes, right)
+    # the row key of a node in the graph of a source is source * size + node
+    own = codes > 0
+    left = np.concatenate((left, codes[own] * size + left[own]))
+    right = np.concatenate((right, codes[own] * size + right[own]))
+    order = _stable_argsort(left)
+    graph = _csr_from_arrays(left[order], right[order])
+    sources = graph.nodes // size
+    graph = graph._replace(nodes=nodes[graph.nodes % size])
+    _emit('init', start, len(graph.indices), nodes=len(graph.nodes))
+    return graph, sources, sorted(names, key=names.get)
+
+def _source_order(scores, sources, top=None, ordered=False):
+    """
+    Helper function to select the nodes to write per source (see
+    :func:`_rank_order`), grouped by source.
+
+    :returns: Positions of the selected nodes.
+    """
+    sources = np.asarray(sources)
+    by_source = np.argsort(sources, kind='stable')
+    bounds = np.flatnonzero(np.diff(sources[by_source])) + 1
+    parts = [by_source[:0]]
+    for rows in np.split(by_source, bounds):
+        order = _rank_order(scores[rows], top, ordered)
+        parts.append(rows if order is None else rows[order])
+    return np.concatenate(parts)
+
+def _encode_varints(values):
+    """
+    Helper function to encode non-negative int64 values as variable-length
+    integers (7 bits per byte, least significant group first, the high bit
+    marks that more bytes follow).
+
+    :returns: Tuple (uint8 array with the encoded values, int64 array with
+              the number of bytes of every value).
+    """
+    lengths = np.ones(len(values), dtype=np.int64)
+    for shift in range(7, 64, 7):
+        lengths += values >= (1 << shift)
+    positions = np.cumsum(lengths) - lengths
+    data = np.empty(int(lengths.sum()), dtype=np.uint8)
+    for k in range(int(lengths.max(initial=0))):
+        selected = np.flatnonzero(lengths > k)
+        groups = (values[selected] >> (7 * k)) & 0x7f
+        groups[lengths[selected] > k + 1] |= 0x80
+        data[positions[selected] + k] = groups
+    return data, lengths
+
+def _decode_varints(data):
+    """
+    Helper function to decode a uint8 array of variable-length integers (see
+    :func:`_encode_varints`) into an int64 array without a Python loop per
+    value.
+    """
+    ends = np.flatnonzero(data < 0x80)
+    if len(ends) == len(data):
+        return data.astype(np.int64)
+    lengths = np.diff(ends, prepend=-1)
+    starts = ends - lengths + 1
+    values = (data[starts] & 0x7f).astype(np.int64)
+    # only the few values with more than one byte are touched again
+    longer, k = np.flatnonzero(lengths > 1), 1
+    while len(longer):
+        values[longer] |= (data[starts[longer] + k] & 0x7f).astype(np.int64) << (7 * k)
+        k += 1
+        longer = longer[lengths[longer] > k]
+    return values
+
+CompressedGraph = namedtuple('CompressedGraph', ['nodes', 'out_degree', 'indptr', 'offsets',
+                                                 'data'])
+CompressedGraph.__doc__ = """
+Compressed representation of a link graph (see :func:`compress_graph`): the
+in-links of every node are sorted by position and stored as gaps (the first
+one relative to 0) encoded as variable-length integers in one byte buffer.
+Link graphs of Wikipedia have a strong locality of node IDs, hence most gaps
+fit into one or two bytes instead of four (int32) in a :class:`CSRGraph`.
+
+:param nodes: Sequence of node names (as in :class:`CSRGraph`).
+:param out_degree: int64 array with the number of outgoing links per node.
+:param indptr: int64 array with the in-link offsets (as in :class:`CSRGraph`).
+:param offsets: int64 array of length ``len(nodes) + 1`` with the offsets of
+                the encoded in-links of every node in ``data``.
+:param data: uint8 array with the encoded in-links of all nodes.
+"""
+
+def compress_graph(graph):
+    """
+    Compress the in-links of a :class:`CSRGraph` (requires numpy). The rows
+    are encoded in chunks, i.e., a memory-mapped graph (see
+    :func:`load_graph`) is read from the page cache once and only the
+    compressed graph is held in memory.
+
+    :param graph: :class:`CSRGraph`.
+    :returns: :class:`CompressedGraph` of the same graph.
+    """
+    _require_numpy()
+    size = len(graph.nodes)
+    indptr = np.asarray(graph.indptr, dtype=np.int64)
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    data, written = [], 0
+    for low, high in _row_chunks(indptr, _CHUNK_SIZE * 16):
+        rows = indptr[low:high + 1] - indptr[low]
+        indices = np.asarray(graph.indices[indptr[low]:indptr[high]], dtype=np.int64)
+        row_ids = np.repeat(np.arange(high - low), np.diff(rows))
+        indices = indices[np.lexsort((indices, row_ids))]
+        gaps = np.diff(indices, prepend=0)
+        first = rows[:-1][rows[:-1] < rows[1:]]
+        gaps[first] = indices[first]
+        chunk, lengths = _encode_varints(gaps)
+        position = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=position[1:])
+        offsets[low + 1:high + 1] = written + position[rows[1:]]
+        data.append(chunk)
+        written += len(chunk)
+    data = np.concatenate(data) if data else np.zeros(0, dtype=np.uint8)
+    return CompressedGraph(graph.nodes, np.asarray(graph.out_degree, dtype=np.int64), indptr,
+                           offsets, data)
+
+def _row_chunks(indptr, links):
+    """
+    Helper function to split the rows of a graph into contiguous ranges with
+    at most ``links`` in-links each (or a single row with more in-links).
+
+    :returns: List of (low, high) row ranges.
+    """
+    size, bounds = len(indptr) - 1, [0]
+    while bounds[-1] < size:
+        high = int(np.searchsorted(indptr, indptr[bounds[-1]] + links, side='right')) - 1
+        bounds.append(min(max(high, bounds[-1] + 1), size))
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def _decode_rows(graph, low, high, rows):
+    """
+    Helper function to decode the in-links of the rows low to high of a
+    :class:`CompressedGraph`.
+
+    :param rows: ``indptr[low:high + 1] - indptr[low]``.
+    :returns: int64 array with the positions of the linking nodes.
+    """
+    gaps = _decode_varints(graph.data[graph.offsets[low]:graph.offsets[high]])
+    indices = np.cumsum(gaps)
+    first = rows[:-1][rows[:-1] < rows[1:]]
+    counts = np.diff(np.append(first, len(indices)))
+    indices -= np.repeat(indices[first] - gaps[first], counts)
+    return indices
+
+#@profile
+def danker_compressed(graph, iterations, damping, start_value, tolerance=None, norm='l1',
+                      stats=None, checkpoint=None):
+    """
+    Compute PageRank on a :class:`CompressedGraph` (requires numpy). In
+    every iteration the in-links are decoded chunk by chunk with vectorized
+    operations and summed up like in :func:`danker_csr`. As the in-links are
+    summed up in ascending order of their positions (instead of the order of
+    the input file), the results agree with :func:`danker_csr` up to floating
+    point rounding.
+
+    :param graph: :class:`CompressedGraph`, see :func:`compress_graph`.
+    :param iterations: The number of PageRank iterations.
+    :param damping: The PageRank damping factor.
+    :param start_value: The PageRank starting value (a float or an array with
+                        one value per node).
+    :param tolerance: Optional convergence threshold (see
+                      :func:`danker_smallmem`).
+    :param norm: Norm of the change between two iterations ("l1" or "linf").
+    :param stats: Optional dictionary that is filled with run information
+                  (see :func:`danker_csr`).
+    :param checkpoint: Optional :class:`Checkpoint` (see
+                       :func:`danker_smallmem`).
+    :return: float64 array of shape ``(2, len(graph.nodes))`` with the two
+             alternating rank vectors (see :func:`danker_csr`).
+    """
+    _require_numpy()
+    size = len(graph.nodes)
+    ranks = np.empty((2, size), dtype=np.float64)
+    first, resumed, key = _resume(checkpoint, 'compressed', damping, size)
+    ranks[:] = start_value if resumed is None else np.asarray(resumed)
+
+    divisor = np.where(graph.out_degree > 0, graph.out_degree, 1).astype(np.float64)
+    chunks = []
+    for low, high in _row_chunks(graph.indptr, _CHUNK_SIZE):
+        rows = graph.indptr[low:high + 1] - graph.indptr[low]
+        chunks.append((low, high, rows, _buckets(rows)))
+    if stats is not None:
+        stats.update(iterations=first, location=first % 2, residual=float('nan'), norm=norm)
+    start, links = time.time(), int(graph.indptr[-1])
+    saved = start
+    for iteration in range(first, iterations):
+        began = time.time()
+        i_location = iteration % 2
+        i_plus_1_location = (iteration + 1) % 2
+
+        contrib = damping * ranks[i_location] / divisor
+        for low, high, rows, buckets in chunks:
+            _sum_in_links(rows, _decode_rows(graph, low, high, rows), buckets, contrib,
+                          1 - damping, ranks[i_plus_1_location][low:high])
+
+        saved = _save_checkpoint(checkpoint, key, iteration, saved,
+                                 lambda: ranks[i_plus_1_location])
+        residual = None
+        if tolerance is not None or stats is not None or _observed():
+            residual = _change(ranks[i_plus_1_location], ranks[i_location], norm)
+        if _converged(iteration, residual, tolerance, norm, stats, i_plus_1_location, began,
+                      links):
+            break
+    _emit('pagerank', start)
+    return ranks
+
+class StringTable(object):
+    """
+    Compact read-only sequence of strings (e.g., node names) stored as one
+    UTF-8 blob plus offsets, i.e., two arrays instead of one Python object
+    per string. Both arrays may be memory-mapped (see :func:`load_graph`).
+
+    :param offsets: int64 array with ``len + 1`` offsets into ``blob``.
+    :param blob: uint8 array with the concatenated UTF-8 encoded strings.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return self.blob[self.offsets[index]:self.offsets[index + 1]].tobytes().decode('utf-8')
+
+    def __iter__(self):
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            yield self.blob[start:end].tobytes().decode('utf-8')
+
+def string_table(names):
+    """
+    Create a :class:`StringTable` from a sequence of strings.
+
+    :param names: Sequence of strings (other objects are converted with str).
+    :returns: :class:`StringTable` in memory.
+    """
+    _require_numpy()
+    encoded = [str(k).encode('utf-8') for k in names]
+    offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+    np.cumsum(np.fromiter((len(k) for k in encoded), dtype=np.int64, count=len(encoded)),
+              out=offsets[1:])
+    return StringTable(offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8))
+
+def _pad(length):
+    """
+    Helper function to return the number of padding bytes for 8-byte alignment.
+    """
+    return -length % 8
+
+def _write_graph_header(graph_file, flags, size, links, blob_size):
+    """
+    Helper function to write the (padded) header of a binary graph file.
+    """
+    header = _GRAPH_HEADER.pack(_GRAPH_MAGIC, _GRAPH_VERSION, flags, size, links, blob_size)
+    graph_file.write(header + bytes(_GRAPH_HEADER_SIZE - len(header)))
+
+def _index_type(size):
+    """
+    Helper function to return the flags and the on-disk type of the
+    ``indices`` array for a graph with ``size`` nodes.
+    """
+    if size >= 2**31:
+        return _FLAG_WIDE_INDICES, '<i8'
+    return 0, '<i4'
+
+def write_graph(graph, file_name):
+    """
+    Write a :class:`CSRGraph` to a versioned binary file that can be loaded
+    with :func:`load_graph`. All arrays are stored with fixed width in little
+    endian byte order and are 8-byte aligned.
+
+    :param graph: The :class:`CSRGraph` to store.
+    :param file_name: Name of the output file.
+    """
+    _require_numpy()
+    size = len(graph.nodes)
+    flags, index_type = _index_type(size)
+    node_ids = None
+    if isinstance(graph.nodes, np.ndarray) and graph.nodes.dtype.kind in 'iu':
+        node_ids = graph.nodes.astype('<i8')
+    elif all(isinstance(k, int) and -2**63 <= k < 2**63 for k in graph.nodes):
+        node_ids = np.fromiter(graph.nodes, dtype='<i8', count=size)
+    if node_ids is None:
+        flags |= _FLAG_STRING_NODES
+        table = graph.nodes
+        if not isinstance(table, StringTable):
+            table = string_table(graph.nodes)
+        offsets = np.asarray(table.offsets, dtype='<i8')
+        blob = table.blob.tobytes()
+    else:
+        blob = b''
+    # write to a temporary file first, the graph may be mapped from file_name
+    # and a failed run must not leave a truncated graph file
+    try:
+        with open(file_name + '.tmp', 'wb') as graph_file:
+            _write_graph_header(graph_file, flags, size, len(graph.indices), len(blob))
+            if node_ids is None:
+                graph_file.write(offsets.tobytes())
+                graph_file.write(blob + bytes(_pad(len(blob))))
+            else:
+                graph_file.write(node_ids.tobytes())
+            graph_file.write(np.asarray(graph.out_degree, dtype='<i8').tobytes())
+            graph_file.write(np.asarray(graph.indptr, dtype='<i8').tobytes())
+            graph_file.write(np.asarray(graph.indices, dtype=index_type).tobytes())
+        os.replace(file_name + '.tmp', file_name)
+    finally:
+        if os.path.exists(file_name + '.tmp'):
+            os.remove(file_name + '.tmp')
+
+def _graph_sections(file_name):
+    """
+    Helper function to read the header of a binary graph file.
+
+    :returns: Tuple (flags, file size, sections) where sections maps the
+              names of the stored arrays to (offset, dtype, count).
+    :raises InvalidGraphFileException: If the file is no compatible graph.
+    """
+    with open(file_name, 'rb') as graph_file:
+        header = graph_file.read(_GRAPH_HEADER_SIZE)
+        file_size = os.fstat(graph_file.fileno()).st_size
+    if len(header) < _GRAPH_HEADER_SIZE or not header.startswith(_GRAPH_MAGIC):
+        raise InvalidGraphFileException(file_name, 'unknown file type')
+    _, version, flags, size, links, blob_size = _GRAPH_HEADER.unpack_from(header)
+    if version != _GRAPH_VERSION:
+        raise InvalidGraphFileException(file_name, 'unsupported version {0}'.format(version))
+    index_type = '<i8' if flags & _FLAG_WIDE_INDICES else '<i4'
+    arrays = [('out_degree', '<i8', size), ('indptr', '<i8', size + 1),
+              ('indices', index_type, links)]
+    if flags & _FLAG_STRING_NODES:
+        arrays = [('offsets', '<i8', size + 1), ('blob', '<u1', blob_size)] + arrays
+    else:
+        arrays = [('nodes', '<i8', size)] + arrays
+    sections = {}
+    offset = _GRAPH_HEADER_SIZE
+    for name, dtype, count in arrays:
+        sections[name] = (offset, dtype, count)
+        offset += np.dtype(dtype).itemsize * count
+        offset += _pad(offset)
+    if file_size < sections['indices'][0] + np.dtype(index_type).itemsize * links:
+        raise InvalidGraphFileException(file_name, 'file is truncated')
+    return flags, file_size, sections
+
+def load_graph(file_name):
+    """
+    Load a graph file written by :func:`write_graph` or :func:`compile_graph`.
+    The file is memory-mapped (read-only) and no array is copied, i.e., the
+    graph is paged in on demand and shared between processes through the
+    operating system's page cache.
+
+    :param file_name: Name of the compiled graph file.
+    :returns: :class:`CSRGraph` backed by the memory-mapped file.
+    :raises InvalidGraphFileException: If the file is no compatible graph.
+    """
+    _require_numpy()
+    flags, _, sections = _graph_sections(file_name)
+    with open(file_name, 'rb') as graph_file:
+        buffer = mmap.mmap(graph_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def array(name):
+        offset, dtype, count = sections[name]
+        return np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+
+    if flags & _FLAG_STRING_NODES:
+        nodes = StringTable(array('offsets'), array('blob'))
+    else:
+        nodes = array('nodes')
+    return CSRGraph(nodes, array('out_degree'), array('indptr'), array('indices'))
+
+def is_graph_file(file_name):
+    """
+    Check whether a file is a compiled danker graph.
+
+    :param file_name: Name of the file to check.
+    :returns: True if the file starts with the magic bytes of the format.
+    """
+    with open(file_name, 'rb') as in_file:
+        return in_file.read(len(_GRAPH_MAGIC)) == _GRAPH_MAGIC
+
+def compile_graph(left_sorted, file_name, unsorted=False):
+    """
+    Parse a link file once and store it as a binary graph file for fast
+    subsequent runs (see :func:`load_graph`).
+
+    :param left_sorted: A tab-separated link file that is sorted by the
+                        left column.
+    :param file_name: Name of the output file.
+    :param unsorted: The link file may be in any order (see :func:`init`).
+    :returns: The compiled :class:`CSRGraph` (in memory).
+    """
+    graph = init_csr(left_sorted, unsorted)
+    write_graph(graph, file_name)
+    return graph
+
+def intern_links(link_file, int_file, index_file):
+    """
+    Replace the node names of a link file by dense integer IDs (starting at
+    1) and write the mapping to an index file (ID and name, tab-separated).
+    The IDs follow the order of the names (see :func:`init`), i.e., a sorted
+    link file stays sorted (by both columns). Further columns are kept. The
+    integer link file can be used with all engines at the memory cost of an
+    integer graph; the option ``--index`` maps the IDs back to the names when
+    the ranks are written (see :func:`load_index`).
+
+    :param link_file: A tab-separated link file.
+    :param int_file: Name of the integer link file.
+    :param index_file: Name of the index file.
+    :returns: Tuple (number of nodes, number of links).
+    """
+    names = set()
+    for data in _line_chunks(link_file):
+        for line in data.decode('utf-8').split('\n')[:-1]:
+            columns = line.split("\t")
+            names.add(columns[0].strip())
+            names.add(columns[1].strip())
+    names = sorted(names, key=_name_key)
+    with open(index_file, 'w', encoding="utf-8") as out_file:
+        out_file.writelines("{0}\t{1}\n".format(i + 1, k) for i, k in enumerate(names))
+    ids = {k: str(i + 1) for i, k in enumerate(names)}
+    del names
+    links = 0
+    with open(int_file, 'w', encoding="utf-8") as out_file:
+        for data in _line_chunks(link_file):
+            lines = data.decode('utf-8').split('\n')[:-1]
+            for line in lines:
+                columns = line.split("\t")
+                columns[0] = ids[columns[0].strip()]
+                columns[1] = ids[columns[1].strip()] + columns[1][len(columns[1].rstrip()):]
+                out_file.write("\t".join(columns) + "\n")
+            links += len(lines)
+    return len(ids), links
+
+def load_index(index_file):
+    """
+    Read an index file (integer ID and name, tab-separated), e.g., written
+    by :func:`intern_links`, into a compact :class:`StringTable`.
+
+    :param index_file: Name of the index file.
+    :returns: Tuple (int64 array of sorted IDs, :class:`StringTable` with the
+              name of every ID).
+    """
+    _require_numpy()
+    ids, names = [], []
+    with open(index_file, encoding="utf-8") as in_file:
+        for line in in_file:
+            node_id, name = line.rstrip("\r\n").split("\t", 1)
+            ids.append(int(node_id))
+            names.append(name)
+    ids = np.array(ids, dtype=np.int64)
+    order = _stable_argsort(ids)
+    return ids[order], string_table([names[i] for i in order.tolist()])
+
+def _labels(nodes, index):
+    """
+    Helper function to return the output names of the nodes: the nodes
+    themselves or, with an index from :func:`load_index`, their names.
+    """
+    nodes = nodes.tolist() if isinstance(nodes, np.ndarray) else nodes
+    if index is None:
+        return nodes
+    ids, names = index
+    if not len(ids):
+        return nodes
+    keys = np.array([k if isinstance(k, int) else -1 for k in nodes], dtype=np.int64)
+    positions = np.minimum(np.searchsorted(ids, keys), len(ids) - 1)
+    found = ids[positions] == keys
+    return [names[p] if f else n for p, f, n in zip(positions.tolist(), found.tolist(), nodes)]
+
+def _sort_key(column):
+    """
+    Helper function to return the sort key of :func:`sort_links` (binary
+    lines, nodes are compared like in :func:`init`).
+    """
+    def key(line):
+        return _conv_int(line.split(b"\t")[column].strip().decode('utf-8'))
+    return key
+
+def _sort_chunk(data, column):
+    """
+    Helper function to sort complete lines (bytes) of a link file by a column
+    in memory (integer node names with :func:`_stable_argsort`).
+    """
+    lines = data.split(b'\n')[:-1]
+    columns = _parse_chunk(data) if np is not None else None
+    if columns is not None:
+        lines = [lines[i] for i in _stable_argsort(columns[column]).tolist()]
+    else:
+        lines.sort(key=_sort_key(column))
+    return b'\n'.join(lines) + b'\n'
+
+def sort_links(link_file, file_name, column=0, buffer_size=1 << 28):
+    """
+    Sort a tab-separated link file by the left (``column=0``) or right
+    (``column=1``) column, e.g., to create the right sorted file of
+    :func:`danker_smallmem` without GNU sort. Nodes are compared like in
+    :func:`init` (integers numerically) and links with the same node keep
+    their order. Chunks of ``buffer_size`` bytes are sorted in memory
+    (integer node names with a radix sort if numpy is available); larger
+    files are spilled as sorted runs next to ``file_name`` and merged.
+
+    :param link_file: A tab-separated link file in any order.
+    :param file_name: Name of the output file (may be the same as
+                      ``link_file``).
+    :param column: 0 to sort by the left column, 1 for the right column.
+    :param buffer_size: Size of the in-memory chunks in bytes (peak memory
+                        is about three times this value).
+    :returns: The number of sorted runs.
+    """
+    runs = []
+    try:
+        for data in _line_chunks(link_file, buffer_size):
+            runs.append('{0}.run{1}.tmp'.format(file_name, len(runs)))
+            with open(runs[-1], 'wb') as run_file:
+                run_file.write(_sort_chunk(data, column))
+        if len(runs) > 1:
+            run_files = [open(run, 'rb') for run in runs]
+            try:
+                with open(file_name + '.tmp', 'wb') as out_file:
+                    out_file.writelines(heapq.merge(*run_files, key=_sort_key(column)))
+            finally:
+                for run_file in run_files:
+                    run_file.close()
+            os.replace(file_name + '.tmp', file_name)
+        elif runs:
+            os.replace(runs[0], file_name)
+        else:
+            open(file_name, 'wb').close()
+    finally:
+        for run in runs:
+            if os.path.exists(run):
+                os.remove(run)
+    return len(runs)
+
+def _positions(nodes, names):
+    """
+    Helper function to look up the positions of node names (strings as read
+    from a file) in the node sequence of a :class:`CSRGraph`.
+
+    :returns: int64 array with the positions (-1 for unknown names).
+    """
+    if isinstance(nodes, np.ndarray):
+        ids = np.array([int(i) if i.isdigit() else -1 for i in names], dtype=np.int64)
+        positions = np.full(len(ids), -1, dtype=np.int64)
+        if len(nodes):
+            sorter = np.argsort(nodes, kind='stable')
+            found = np.searchsorted(nodes, ids, sorter=sorter)
+            found = sorter[np.minimum(found, len(nodes) - 1)]
+            match = (ids >= 0) & (nodes[found] == ids)
+            positions[match] = found[match]
+        return positions
+    index = {str(k): i for i, k in enumerate(nodes)}
+    return np.array([index.get(i, -1) for i in names], dtype=np.int64)
+
+def load_ranks(rank_file, nodes, start_value, prefix=''):
+    """
+    Read a rank file (the output of a previous run: node and score,
+    tab-separated, or a binary rank file, see :func:`write_ranks`) as
+    starting vector for the given nodes. Starting from the
+    scores of a previous run on a slightly different graph usually needs
+    much fewer iterations to reach a given tolerance.
+
+    :param rank_file: Name of the rank file.
+    :param nodes: Node sequence of the :class:`CSRGraph` (or the keys of the
+                  dictionary created with :func:`init`).
+    :param start_value: Starting value for nodes without previous score.
+    :param prefix: Prefix of the node names in the rank file (e.g., "Q" in
+                   the output of ``danker.sh``) that is removed.
+    :returns: float64 array with one starting value per node.
+    """
+    _require_numpy()
+    names, scores = [], []
+    if is_rank_file(rank_file):
+        rank_nodes, scores = load_rank_file(rank_file)
+        names = [str(k) for k in _labels(rank_nodes, None)]
+    else:
+        with open(rank_file, encoding="utf-8") as in_file:
+            for line in in_file:
+                name, score = line.split("\t")[:2]
+                names.append(name.strip())
+                scores.append(float(score))
+    if prefix:
+        names = [k[len(prefix):] if k.startswith(prefix) else k for k in names]
+    start = np.full(len(nodes), start_value, dtype=np.float64)
+    positions = _positions(nodes, names)
+    known = positions >= 0
+    start[positions[known]] = np.array(scores, dtype=np.float64)[known]
+    return start
+
+def teleport_matrix(nodes, seed_sets):
+    """
+    Create the teleport matrix of :func:`danker_personalized`: column ``k``
+    distributes the teleport probability evenly among the nodes of seed set
+    ``k``.
+
+    :param nodes: Node sequence of the :class:`CSRGraph`.
+    :param seed_sets: List of K seed sets (iterables of node names).
+    :returns: float64 array of shape ``(len(nodes), K)``.
+    """
+    _require_numpy()
+    teleport = np.zeros((len(nodes), len(seed_sets)), dtype=np.float64)
+    for k, seeds in enumerate(seed_sets):
+        positions = _positions(nodes, [str(i) for i in seeds])
+        positions = np.unique(positions[positions >= 0])
+        if not len(positions):
+            raise ValueError('Seed set {0} has no node in the graph.'.format(k))
+        teleport[positions, k] = 1 / len(positions)
+    return teleport
+
+def load_seeds(seed_files, nodes, prefix=''):
+    """
+    Read one seed set per file (node names in the first column, further
+    tab-separated columns are ignored) and create the teleport matrix of
+    :func:`danker_personalized` (see :func:`teleport_matrix`).
+
+    :param seed_files: List of file names.
+    :param nodes: Node sequence of the :class:`CSRGraph`.
+    :param prefix: Prefix of the node names in the seed files that is removed.
+    :returns: float64 array of shape ``(len(nodes), len(seed_files))``.
+    """
+    seed_sets = []
+    for seed_file in seed_files:
+        seeds = []
+        with open(seed_file, encoding="utf-8") as in_file:
+            for line in in_file:
+                name = line.split("\t")[0].strip()
+                if prefix and name.startswith(prefix):
+                    name = name[len(prefix):]
+                if name:
+                    seeds.append(name)
+        seed_sets.append(seeds)
+    return teleport_matrix(nodes, seed_sets)
+
+def apply_delta(graph, delta_file):
+    """
+    Apply a link delta to a :class:`CSRGraph` without re-parsing the link
+    file. Every line of the delta file is tab-separated and either adds
+    (``+``) or removes (``-``) a link::
+
+        +   A   B
+        -   C   D
+
+    Existing nodes keep their positions (such that the ranks of a previous
+    run can be reused), new nodes are appended. Removing a link removes all
+    its occurrences, new in-links are appended to the in-links of a node.
+
+    :param graph: :class:`CSRGraph`, e.g., loaded with :func:`load_graph`.
+    :param delta_file: Name of the delta file.
+    :returns: Tuple (updated :class:`CSRGraph` in memory, number of added
+              links, number of removed links).
+    """
+    _require_numpy()
+    changes = {'+': ([], []), '-': ([], [])}
+    with open(delta_file, encoding="utf-8") as in_file:
+        for line in in_file:
+            if not line.strip():
+                continue
+            sign, left, right = [i.strip() for i in line.split("\t")[:3]]
+            if sign not in changes:
+                raise ValueError('Invalid delta line "{0}" in "{1}".'.format(line.strip(),
+                                                                             delta_file))
+            changes[sign][0].append(left)
+            changes[sign][1].append(right)
+
+    # look up node positions, append new nodes (added links only)
+    size = len(graph.nodes)
+    names = changes['+'][0] + changes['+'][1]
+    positions = _positions(graph.nodes, names)
+    new_index = {}
+    for i in np.flatnonzero(positions < 0).tolist():
+        positions[i] = new_index.setdefault(names[i], size + len(new_index))
+    added = len(changes['+'][0])
+    add_sources, add_rows = positions[:added], positions[added:]
+    new_size = size + len(new_index)
+    removed = _positions(graph.nodes, changes['-'][0] + changes['-'][1]).reshape(2, -1)
+    removed = removed[:, (removed >= 0).all(axis=0)]
+
+    # remove links, then append new links row by row (stable sort keeps the order)
+    rows = np.repeat(np.arange(size, dtype=np.int64), np.diff(graph.indptr))
+    sources = np.asarray(graph.indices, dtype=np.int64)
+    keep = ~np.isin(rows * new_size + sources, removed[1] * new_size + removed[0])
+    rows = np.concatenate((rows[keep], add_rows))
+    sources = np.concatenate((sources[keep], add_sources))
+    order = np.argsort(rows, kind='stable')
+    indptr = np.zeros(new_size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=new_size), out=indptr[1:])
+    out_degree = np.bincount(sources, minlength=new_size).astype(np.int64)
+
+    if isinstance(graph.nodes, np.ndarray) and all(i.isdigit() for i in new_index):
+        nodes = np.concatenate((graph.nodes, np.array([int(i) for i in new_index],
+                                                      dtype=np.int64)))
+    else:
+        nodes = list(graph.nodes) + [_conv_int(i) for i in new_index]
+    updated = CSRGraph(nodes, out_degree, indptr,
+                       sources[order].astype(_index_dtype(new_size)))
+    return updated, added, int(len(graph.indices) + added - len(updated.indices))
+
+def _read_array(in_file, dtype, count):
+    """
+    Helper function to read ``count`` values from the current position of a
+    binary file with one sequential read.
+    """
+    result = np.empty(count, dtype=dtype)
+    view = memoryview(result).cast('B')
+    done = 0
+    while done < len(view):
+        read = in_file.readinto(view[done:])
+        if not read:
+            raise EOFError('Unexpected end of file "{0}".'.format(in_file.name))
+        done += read
+    return result
+
+def compile_right_sorted(right_sorted, file_name):
+    """
+    Convert a link file that is sorted by the right column into a binary
+    graph file with bounded memory: only the node table and per-node counts
+    are held in memory, the links are streamed to disk (via a temporary file
+    next to ``file_name``). Since the file is sorted by the right column, the
+    in-links of every node are written as one contiguous block. The result
+    can be used with :func:`danker_blocks` (or :func:`load_graph`).
+
+    Node names must be integers.
+
+    :param right_sorted: A tab-separated link file that is sorted
+                         (numerically) by the right column.
+    :param file_name: Name of the output file.
+    :returns: Tuple (number of nodes, number of links).
+    :raises InputNotSortedException: If the input is not sorted correctly.
+    :raises ValueError: If the input contains non-integer node names.
+    """
+    _require_numpy()
+    temp_name = file_name + '.pairs.tmp'
+    node_ids = np.empty(0, dtype=np.int64)
+    pending, pending_size, links, previous = [], 0, 0, None
+    try:
+        # 1st pass: parse, check order, collect node IDs and store binary pairs
+        with open(temp_name, 'wb') as temp_file:
+            for columns in _int_link_chunks(right_sorted):
+                if columns is None:
+                    raise ValueError('Binary blocks need integer node names ' +
+                                     '(file "{0}").'.format(right_sorted))
+                if not len(columns[1]):
+                    continue
+                _check_sorted(right_sorted, columns[1], previous)
+                chunk = np.stack(columns, axis=1).astype('<i8')
+                previous = columns[1][-1]
+                links += len(chunk)
+                temp_file.write(chunk.tobytes())
+                pending.append(np.unique(chunk))
+                pending_size += len(pending[-1])
+                if pending_size > max(len(node_ids), _CHUNK_SIZE):
+                    node_ids = np.unique(np.concatenate([node_ids] + pending))
+                    pending, pending_size = [], 0
+        node_ids = np.unique(np.concatenate([node_ids] + pending))
+        size = len(node_ids)
+
+        # 2nd pass: translate node IDs to positions and stream the in-links
+        flags, index_type = _index_type(size)
+        out_degree = np.zeros(size, dtype=np.int64)
+        in_degree = np.zeros(size, dtype=np.int64)
+        # the graph file appears only when it is complete
+        with open(temp_name, 'rb') as temp_file, open(file_name + '.tmp', 'wb') as graph_file:
+            _write_graph_header(graph_file, flags, size, links, 0)
+            graph_file.write(node_ids.astype('<i8').tobytes())
+            counts_offset = graph_file.tell()
+            graph_file.seek(8 * (2 * size + 1), os.SEEK_CUR)
+            for first in range(0, links, _CHUNK_SIZE):
+                chunk = _read_array(temp_file, '<i8', 2 * min(_CHUNK_SIZE, links - first))
+                positions = np.searchsorted(node_ids, chunk)
+                out_degree += np.bincount(positions[0::2], minlength=size)
+                in_degree += np.bincount(positions[1::2], minlength=size)
+                graph_file.write(positions[0::2].astype(index_type).tobytes())
+            graph_file.seek(counts_offset)
+            graph_file.write(out_degree.astype('<i8').tobytes())
+            indptr = np.zeros(size + 1, dtype='<i8')
+            np.cumsum(in_degree, out=indptr[1:])
+            graph_file.write(indptr.tobytes())
+        os.replace(file_name + '.tmp', file_name)
+    finally:
+        for name in [temp_name, file_name + '.tmp']:
+            if os.path.exists(name):
+                os.remove(name)
+    return size, links
+
+def _read_blocks(file_name, sections, block_size):
+    """
+    Helper function (generator) to read the in-links of a binary graph file
+    in blocks of consecutive nodes with large sequential reads. A background
+    thread reads the next block while the current one is processed.
+
+    :returns: Iterator over tuples (low, high, indptr, indices) with the
+              rows low to high, their (rebased) row offsets and in-links.
+    """
+    indptr_offset, _, indptr_count = sections['indptr']
+    indices_offset, index_type, _ = sections['indices']
+    blocks = queue.Queue(maxsize=1)
+
+    def reader():
+        try:
+            with open(file_name, 'rb') as indptr_file, open(file_name, 'rb') as indices_file:
+                indptr_file.seek(indptr_offset)
+                indices_file.seek(indices_offset)
+                row_offsets = np.empty(0, dtype='<i8')
+                low, loaded = 0, 0
+                while low < indptr_count - 1:
+                    # buffer enough row offsets for the next block
+                    while loaded < indptr_count and (len(row_offsets) < 2 or (
+                            row_offsets[-1] - row_offsets[0] < block_size and
+                            len(row_offsets) <= _CHUNK_SIZE)):
+                        more = _read_array(indptr_file, '<i8',
+                                           min(_CHUNK_SIZE, indptr_count - loaded))
+                        row_offsets = np.concatenate((row_offsets, more))
+                        loaded += len(more)
+
+                    # rows of the block: up to block_size in-links but at least one row
+                    high = np.searchsorted(row_offsets, row_offsets[0] + block_size,
+                                           side='right') - 1
+                    high = int(min(max(high, 1), _CHUNK_SIZE))
+                    block_indptr = row_offsets[:high + 1] - row_offsets[0]
+                    indices = _read_array(indices_file, index_type, int(block_indptr[-1]))
+                    blocks.put((low, low + high, block_indptr, indices))
+                    row_offsets = row_offsets[high:]
+                    low += high
+            blocks.put(None)
+        except BaseException as exception:
+            blocks.put(exception)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    while True:
+        block = blocks.get()
+        if block is None:
+            break
+        if isinstance(block, BaseException):
+            raise block
+        yield block
+    thread.join()
+
+#@profile
+def danker_blocks(file_name, iterations, damping, start_value, tolerance=None, norm='l1',
+                  stats=None, block_size=1 << 24, checkpoint=None):
+    """
+    Compute PageRank out of core on a binary graph file (see
+    :func:`compile_right_sorted` and :func:`compile_graph`). Every iteration
+    streams the in-links block by block with large sequential reads (the
+    next block is prefetched by a background thread). Memory is bounded by
+    four vectors with one value per node plus two blocks.
+
+    :param file_name: Name of the binary graph file.
+    :param iterations: The number of PageRank iterations.
+    :param damping: The PageRank damping factor.
+    :param start_value: The PageRank starting value (a float or an array with
+                        one value per node, see :func:`load_ranks`).
+    :param tolerance: Optional convergence threshold (see
+                      :func:`danker_smallmem`).
+    :param norm: Norm of the change between two iterations ("l1" or "linf").
+    :param stats: Optional dictionary that is filled with run information
+                  (see :func:`danker_csr`).
+    :param block_size: Maximum number of in-links per block (a block holds
+                       at least one node).
+    :param checkpoint: Optional :class:`Checkpoint` (see
+                       :func:`danker_smallmem`).
+    :return: float64 array of shape ``(2, number of nodes)`` with the two
+             alternating rank vectors. The output score is located at row
+             ``iterations % 2`` (with ``tolerance`` use ``stats['location']``).
+             The node names are available via :func:`load_graph`.
+    """
+    _require_numpy()
+    _, _, sections = _graph_sections(file_name)
+    with open(file_name, 'rb') as graph_file:
+        graph_file.seek(sections['out_degree'][0])
+        divisor = _read_array(graph_file, '<i8', sections['out_degree'][2]).astype(np.float64)
+    divisor[divisor == 0] = 1
+    ranks = np.empty((2, len(divisor)), dtype=np.float64)
+    # same results as danker_csr, hence the same checkpoints
+    first, resumed, key = _resume(checkpoint, 'csr', damping, len(divisor))
+    ranks[:] = start_value if resumed is None else np.asarray(resumed)
+    if stats is not None:
+        stats.update(iterations=first, location=first % 2, residual=float('nan'), norm=norm)
+    start, links = time.time(), sections['indices'][2]
+    saved = start
+    for iteration in range(first, iterations):
+        began = time.time()
+
+        # rows for i and i+1 result values (alternating with iterations).
+        i_location = iteration % 2
+        i_plus_1_location = (iteration + 1) % 2
+
+        contrib = damping * ranks[i_location] / divisor
+        for low, high, indptr, indices in _read_blocks(file_name, sections, block_size):
+            _sum_in_links(indptr, indices, _buckets(indptr), contrib, 1 - damping,
+                          ranks[i_plus_1_location][low:high])
+        del contrib
+
+        saved = _save_checkpoint(checkpoint, key, iteration, saved,
+                                 lambda: ranks[i_plus_1_location])
+        residual = None
+        if tolerance is not None or stats is not None or _observed():
+            residual = _change(ranks[i_plus_1_location], ranks[i_location], norm)
+        if _converged(iteration, residual, tolerance, norm, stats, i_plus_1_location, began,
+                      links):
+            break
+    _emit('pagerank', start)
+    return ranks
+
+def _rank_order(scores, top=None, ordered=False):
+    """
+    Helper function to select the nodes to write: the ``top`` nodes or, if
+    ``ordered``, all nodes by descending score (nodes with the same score
+    keep their order).
+
+    :returns: Positions of the selected nodes or None for all nodes.
+    """
+    if top is None and not ordered:
+        return None
+    if np is None:
+        if top is not None:
+            return heapq.nlargest(top, range(len(scores)), key=scores.__getitem__)
+        return sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+    scores = np.asarray(scores, dtype=np.float64)
+    candidates = np.arange(len(scores))
+    if top is not None and top < len(scores):
+        if top <= 0:
+            return candidates[:0]
+        # partial sort: only nodes with at least the k-th highest score
+        kth = np.partition(scores, len(scores) - top)[len(scores) - top]
+        candidates = np.flatnonzero(scores >= kth)
+    order = candidates[np.argsort(-scores[candidates], kind='stable')]
+    return order if top is None else order[:top]
+
+def _write_rank_file(out_file, nodes, scores, flags=0):
+    """
+    Helper function to write a binary rank file.
+    """
+    size = len(scores)
+    if isinstance(nodes, np.ndarray) and nodes.dtype.kind in 'iu':
+        table = None
+    elif all(isinstance(k, int) and -2**63 <= k < 2**63 for k in nodes):
+        table, nodes = None, np.fromiter(nodes, dtype='<i8', count=size)
+    else:
+        flags |= _FLAG_STRING_NODES
+        table = nodes if isinstance(nodes, StringTable) else string_table(nodes)
+    blob = table.blob.tobytes() if table is not None else b''
+    header = _GRAPH_HEADER.pack(_RANK_MAGIC, _RANK_VERSION, flags, size, 0, len(blob))
+    out_file.write(header + bytes(_GRAPH_HEADER_SIZE - len(header)))
+    if table is not None:
+        out_file.write(np.asarray(table.offsets, dtype='<i8').tobytes())
+        out_file.write(blob + bytes(_pad(len(blob))))
+    else:
+        out_file.write(np.asarray(nodes, dtype='<i8').tobytes())
+    out_file.write(np.asarray(scores, dtype='<f8').tobytes())
+
+def write_ranks(nodes, scores, out_file=None, top=None, ordered=False, prefix='',
+                index=None, binary=False, sources=None):
+    """
+    Write the result of a PageRank computation, i.e., one line with node and
+    score (tab-separated) per node, in large batches.
+
+    :param nodes: Sequence of nodes (e.g., ``graph.nodes``).
+    :param scores: Sequence (or float64 array) with one score per node.
+    :param out_file: File object (text or, with ``binary``, binary mode);
+                     default is the standard output.
+    :param top: Only write the ``top`` nodes with the highest scores in
+                descending order (partial sort).
+    :param ordered: Write all nodes in descending order of their scores.
+    :param prefix: Prefix of every node name (text only, e.g., "Q").
+    :param index: Optional index from :func:`load_index` to write node names
+                  instead of integer IDs.
+    :param binary: Write a binary rank file instead of text: a 64-byte
+                   header followed by the nodes (int64 array, or offsets and
+                   UTF-8 blob for strings) and the scores (float64 array),
+                   8-byte aligned. See :func:`load_rank_file`.
+    :param sources: Optional tuple (sources, names) of
+                    :func:`init_multi_source`: the nodes are written grouped
+                    by source with the source name as third column (none
+                    for the global ranks); ``top`` and ``ordered`` apply per
+                    source (text only).
+    :returns: The number of written nodes.
+    """
+    start = time.time()
+    suffixes = None
+    if sources is not None:
+        if binary:
+            raise ValueError('Binary rank files have no source column.')
+        order = _source_order(np.asarray(scores, dtype=np.float64), sources[0], top, ordered)
+        suffixes = ["\t" + k if k else "" for k in sources[1]]
+        suffixes = [suffixes[k] for k in np.asarray(sources[0])[order].tolist()]
+    else:
+        order = _rank_order(scores, top, ordered)
+    if order is not None:
+        if np is not None and isinstance(nodes, np.ndarray):
+            nodes = nodes[order]
+        else:
+            nodes = [nodes[p] for p in (order.tolist() if np is not None else order)]
+        scores = [scores[p] for p in (order.tolist() if np is not None else order)]
+    if index is not None:
+        nodes = _labels(nodes, index)
+    if binary:
+        _require_numpy()
+        _write_rank_file(out_file or sys.stdout.buffer, nodes, scores)
+        _emit('output', start, nodes=len(scores))
+        return len(scores)
+    out_file = out_file or sys.stdout
+    if np is not None and isinstance(nodes, np.ndarray):
+        nodes = nodes.tolist()
+    if np is not None and isinstance(scores, np.ndarray):
+        scores = scores.tolist()
+    names = iter(nodes)
+    if suffixes is not None:
+        for first in range(0, len(scores), _CHUNK_SIZE):
+            out_file.write("".join("{0}{1}\t{2:.17g}{3}\n".format(prefix, name, score, suffix)
+                                   for name, score, suffix in zip(
+                                       names, scores[first:first + _CHUNK_SIZE],
+                                       suffixes[first:first + _CHUNK_SIZE])))
+        _emit('output', start, nodes=len(scores))
+        return len(scores)
+    for first in range(0, len(scores), _CHUNK_SIZE):
+        out_file.write("".join("{0}{1}\t{2:.17g}\n".format(prefix, name, score) for name, score
+                               in zip(names, scores[first:first + _CHUNK_SIZE])))
+    _emit('output', start, nodes=len(scores))
+    return len(scores)
+
+def is_rank_file(file_name):
+    """
+    Check whether a file is a binary rank file (see :func:`write_ranks`).
+    """
+    with open(file_name, 'rb') as rank_file:
+        return rank_file.read(len(_RANK_MAGIC)) == _RANK_MAGIC
+
+def load_rank_file(file_name):
+    """
+    Load a binary rank file written by :func:`write_ranks` (memory-mapped,
+    without parsing).
+
+    :param file_name: Name of the binary rank file.
+    :returns: Tuple (nodes, scores): an int64 array or a :class:`StringTable`
+              with the nodes and a float64 array with their scores.
+    :raises ValueError: If the file is no compatible rank file.
+    """
+    return _map_rank_file(file_name)[1:3]
+
+def _map_rank_file(file_name):
+    """
+    Helper function to map a binary rank file (see :func:`load_rank_file`).
+
+    :returns: Tuple (flags, nodes, scores, buffer, offset after the scores).
+    """
+    _require_numpy()
+    with open(file_name, 'rb') as rank_file:
+        header = rank_file.read(_GRAPH_HEADER_SIZE)
+        file_size = os.fstat(rank_file.fileno()).st_size
+    if len(header) < _GRAPH_HEADER_SIZE or not header.startswith(_RANK_MAGIC):
+        raise ValueError('File "{0}" is not a danker rank file.'.format(file_name))
+    _, version, flags, size, _, blob_size = _GRAPH_HEADER.unpack_from(header)
+    if version != _RANK_VERSION:
+        raise ValueError('Unsupported version {0} of rank file "{1}".'.format(version,
+                                                                            file_name))
+    offset = _GRAPH_HEADER_SIZE
+    if flags & _FLAG_STRING_NODES:
+        offset += 8 * (size + 1) + blob_size + _pad(blob_size)
+    else:
+        offset += 8 * size
+    if file_size < offset + 8 * size:
+        raise ValueError('Rank file "{0}" is truncated.'.format(file_name))
+    with open(file_name, 'rb') as rank_file:
+        buffer = mmap.mmap(rank_file.fileno(), 0, access=mmap.ACCESS_READ)
+    if flags & _FLAG_STRING_NODES:
+        nodes = StringTable(np.frombuffer(buffer, '<i8', size + 1, _GRAPH_HEADER_SIZE),
+                            np.frombuffer(buffer, '<u1', blob_size,
+                                          _GRAPH_HEADER_SIZE + 8 * (size + 1)))
+    else:
+        nodes = np.frombuffer(buffer, '<i8', size, _GRAPH_HEADER_SIZE)
+    return flags, nodes, np.frombuffer(buffer, '<f8', size, offset), buffer, offset + 8 * size
+
+def read_rank_output(rank_file, prefix=''):
+    """
+    Read the output of a run: a text rank file (node and score,
+    tab-separated) or a binary rank file (see :func:`write_ranks`).
+
+    :param rank_file: Name of the rank file.
+    :param prefix: Prefix of the node names that is removed (e.g., "Q").
+    :returns: Tuple (nodes, scores): a list (or int64 array) with the nodes,
+              integers if all of them are integers, and a float64 array.
+    """
+    _require_numpy()
+    if is_rank_file(rank_file):
+        nodes, scores = load_rank_file(rank_file)
+        return (list(nodes) if isinstance(nodes, StringTable) else nodes), scores
+    names, scores = [], []
+    with open(rank_file, encoding="utf-8") as in_file:
+        for line in in_file:
+            name, score = line.split("\t")[:2]
+            name = name.strip()
+            names.append(name[len(prefix):] if prefix and name.startswith(prefix) else name)
+            scores.append(float(score))
+    nodes = [_conv_int(k) for k in names]
+    if not all(isinstance(k, int) and -2**63 <= k < 2**63 for k in nodes):
+        nodes = names
+    return nodes, np.array(scores, dtype=np.float64)
+
+def write_rank_index(rank_file, file_name, prefix=''):
+    """
+    Build a rank index for lookups (see :class:`RankIndex` and ``python -m
+    danker serve``): a binary rank file with the nodes sorted (for binary
+    search) followed by the nodes in descending order of their scores (for
+    top-k queries) and the position of every node in this order (for ranks
+    and percentiles). The file is replaced atomically, i.e., a running
+    server can switch to the new index.
+
+    :param rank_file: Name of a text or binary rank file.
+    :param file_name: Name of the index file.
+    :param prefix: Prefix of the node names that is removed (e.g., "Q").
+    :returns: The number of nodes.
+    """
+    nodes, scores = read_rank_output(rank_file, prefix)
+    if isinstance(nodes, np.ndarray) or all(isinstance(k, int) for k in nodes):
+        nodes = np.asarray(nodes, dtype='<i8')
+        by_node = np.argsort(nodes, kind='stable')
+        nodes = nodes[by_node]
+    else:
+        by_node = np.array(sorted(range(len(nodes)), key=nodes.__getitem__), dtype=np.int64)
+        nodes = [nodes[k] for k in by_node.tolist()]
+    scores = np.asarray(scores, dtype='<f8')[by_node]
+    order = np.argsort(-scores, kind='stable')
+    positions = np.empty(len(order), dtype='<i8')
+    positions[order] = np.arange(len(order))
+    with open(file_name + '.tmp', 'wb') as out_file:
+        _write_rank_file(out_file, nodes, scores, _FLAG_RANK_INDEX)
+        out_file.write(order.astype('<i8').tobytes())
+        out_file.write(positions.tobytes())
+    os.replace(file_name + '.tmp', file_name)
+    return len(scores)
+
+class RankIndex(object):
+    """
+    Memory-mapped rank index (see :func:`write_rank_index` and
+    :func:`load_rank_index`) for point, batch and top-k queries.
+
+    :param nodes: Sorted int64 array or :class:`StringTable` of the nodes.
+    :param scores: float64 array with the score of every node.
+    :param order: int64 array with the nodes by descending score.
+    :param positions: int64 array with the position of every node in
+                      ``order`` (0 is the node with the highest score).
+    """
+
+    def __init__(self, nodes, scores, order, positions):
+        self.nodes = nodes
+        self.scores = scores
+        self.order = order
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.scores)
+
+    def find(self, names):
+        """
+        Find nodes by name (binary search).
+
+        :param names: List of node names (strings or integers).
+        :returns: List with the position of every node or -1 if unknown.
+        """
+        if isinstance(self.nodes, StringTable):
+            found = []
+            for name in names:
+                name = str(name)
+                position = bisect.bisect_left(self.nodes, name)
+                found.append(position if position < len(self) and
+                             self.nodes[position] == name else -1)
+            return found
+        keys = [_conv_int(str(k)) for k in names]
+        valid = [isinstance(k, int) and -2**63 <= k < 2**63 for k in keys]
+        keys = np.array([k if v else 0 for k, v in zip(keys, valid)], dtype=np.int64)
+        found = np.minimum(np.searchsorted(self.nodes, keys), max(len(self) - 1, 0))
+        hits = (self.nodes[found] == keys) if len(self) else np.zeros(len(keys), dtype=bool)
+        return [p if v and h else -1 for p, v, h in zip(found.tolist(), valid, hits.tolist())]
+
+    def entry(self, position):
+        """
+        Return (node, score, rank, percentile) of a position; rank 1 is the
+        highest score, percentile is the share of nodes with a lower rank.
+        """
+        rank = int(self.positions[position])
+        node = self.nodes[position]
+        return (node if isinstance(node, str) else int(node), float(self.scores[position]),
+                rank + 1, self._percentile(rank))
+
+    def _percentile(self, rank):
+        return 100.0 * (len(self) - 1 - rank) / max(len(self) - 1, 1)
+
+    def top(self, count, offset=0):
+        """
+        Return the positions of the nodes with the ranks ``offset + 1`` to
+        ``offset + count``.
+        """
+        return self.order[offset:offset + count].tolist()
+
+    def percentile_ranks(self, low, high=None):
+        """
+        Return the ranks of the nodes with a percentile between ``low`` and
+        ``high`` (see :meth:`entry`), as range ``(first, last)`` of offsets
+        for :meth:`top`. Without ``high``, the range starts at the node at
+        percentile ``low`` (the first node with a percentile of at most
+        ``low``) and ends with the last node.
+        """
+        size, span = len(self), max(len(self) - 1, 1)
+        upper = low if high is None else high
+        # the estimates are corrected with the percentiles of entry()
+        first = min(max(int(math.ceil(size - 1 - upper * span / 100.0)), 0), size)
+        while first > 0 and self._percentile(first - 1) <= upper:
+            first -= 1
+        while first < size and self._percentile(first) > upper:
+            first += 1
+        if high is None:
+            return first, size
+        last = min(max(int(math.floor(size - 1 - low * span / 100.0)) + 1, first), size)
+        while last < size and self._percentile(last) >= low:
+            last += 1
+        while last > first and self._percentile(last - 1) < low:
+            last -= 1
+        return first, last
+
+def load_rank_index(file_name):
+    """
+    Load a rank index written by :func:`write_rank_index` (memory-mapped).
+
+    :param file_name: Name of the index file.
+    :returns: :class:`RankIndex`.
+    :raises ValueError: If the file is no rank index.
+    """
+    flags, nodes, scores, buffer, offset = _map_rank_file(file_name)
+    size = len(scores)
+    if not flags & _FLAG_RANK_INDEX or len(buffer) < offset + 16 * size:
+        raise ValueError('File "{0}" is not a danker rank index.'.format(file_name))
+    return RankIndex(nodes, scores, np.frombuffer(buffer, '<i8', size, offset),
+                     np.frombuffer(buffer, '<i8', size, offset + 8 * size))
+
+def _compile_main(argv):
+    """
+    Execute the compile sub-command.
+    """
+    parser = argparse.ArgumentParser(prog='python -m danker compile',
+                                     description='Compile a link file into a ' +
+                                     'binary graph file (needs numpy).')
+    parser.add_argument('link_file', type=str, help='A two-column, ' +
+                        'tab-separated file sorted by the left column (or by ' +
+                        'the right column, see --right-sorted).')
+    parser.add_argument('output', type=str, help='Name of the binary graph file.')
+    parser.add_argument('-r', '--right-sorted', action='store_true', help='The ' +
+                        'link file is sorted numerically by the right column and ' +
+                        'is converted with bounded memory (integer nodes only).')
+    parser.add_argument('-u', '--unsorted', action='store_true', help='The link ' +
+                        'file may be in any order (sorted in memory, or with ' +
+                        '--right-sorted by an external merge sort next to output).')
+    args = parser.parse_args(argv)
+    start = time.time()
+    if args.right_sorted and args.unsorted:
+        right_sorted = args.output + '.right.tmp'
+        try:
+            sort_links(args.link_file, right_sorted, 1)
+            size, links = compile_right_sorted(right_sorted, args.output)
+        finally:
+            if os.path.exists(right_sorted):
+                os.remove(right_sorted)
+    elif args.right_sorted:
+        size, links = compile_right_sorted(args.link_file, args.output)
+    else:
+        graph = compile_graph(args.link_file, args.output, args.unsorted)
+        size, links = len(graph.nodes), len(graph.indices)
+    print("Compilation of '{0}' ({1} nodes, {2} links) to '{3}' took {4:.2f} seconds.".format(
+        args.link_file, size, links, args.output, time.time() - start), file=sys.stderr)
+
+def _sort_main(argv):
+    """
+    Execute the sort sub-command.
+    """
+    parser = argparse.ArgumentParser(prog='python -m danker sort',
+                                     description='Sort a link file by the left or ' +
+                                     'right column (external merge sort).')
+    parser.add_argument('link_file', type=str, help='A tab-separated link file.')
+    parser.add_argument('output', type=str, help='Name of the sorted file (may be ' +
+                        'the same as link_file).')
+    parser.add_argument('-c', '--column', type=str, choices=['left', 'right'],
+                        default='left', help='Sort column. Default is "left".')
+    parser.add_argument('-m', '--sort-buffer', type=int, default=1 << 28,
+                        help='Bytes sorted in memory at once. Default is 268435456.')
+    args = parser.parse_args(argv)
+    start = time.time()
+    runs = sort_links(args.link_file, args.output, ['left', 'right'].index(args.column),
+                      args.sort_buffer)
+    print("Sorting '{0}' ({1} runs) to '{2}' took {3:.2f} seconds.".format(
+        args.link_file, runs, args.output, time.time() - start), file=sys.stderr)
+
+def _intern_main(argv):
+    """
+    Execute the intern sub-command.
+    """
+    parser = argparse.ArgumentParser(prog='python -m danker intern',
+                                     description='Replace string node names by ' +
+                                     'integer IDs and write an index file.')
+    parser.add_argument('link_file', type=str, help='A tab-separated link file.')
+    parser.add_argument('int_file', type=str, help='Name of the integer link file.')
+    parser.add_argument('index_file', type=str, help='Name of the index file (use ' +
+                        'with --index to map the IDs back to names).')
+    args = parser.parse_args(argv)
+    start = time.time()
+    size, links = intern_links(args.link_file, args.int_file, args.index_file)
+    print("Interning of '{0}' ({1} nodes, {2} links) took {3:.2f} seconds.".format(
+        args.link_file, size, links, time.time() - start), file=sys.stderr)
+
+def _update_main(argv):
+    """
+    Execute the update sub-command.
+    """
+    parser = argparse.ArgumentParser(prog='python -m danker update',
+                                     description='Apply a link delta to a binary ' +
+                                     'graph file (needs numpy).')
+    parser.add_argument('graph', type=str, help='A binary graph file.')
+    parser.add_argument('delta', type=str, help='A tab-separated delta file; each ' +
+                        'line is "+" (add) or "-" (remove), left node, right node.')
+    parser.add_argument('output', type=str, help='Name of the updated binary ' +
+                        'graph file (may be the same as graph).')
+    args = parser.parse_args(argv)
+    start = time.time()
+    graph, added, removed = apply_delta(load_graph(args.graph), args.delta)
+    write_graph(graph, args.output)
+    print("Update of '{0}' (+{1}/-{2} links) to '{3}' took {4:.2f} seconds.".format(
+        args.graph, added, removed, args.output, time.time() - start), file=sys.stderr)
+
+def _print_stats(file_name, start, stats):
+    """
+    Helper function to report the run time and the convergence of a run.
+    """
+    print("Computation of PageRank on '{0}' with {1} took {2:.2f} seconds.".format(
+        file_name, 'danker', time.time() - start), file=sys.stderr)
+    if 'updates' in stats:
+        print("Ran {0} iterations ({1} node updates), the ranks are within {2:.3g} ({3}) "
+              "of the exact ones.".format(stats['iterations'], stats['updates'],
+                                          stats['residual'], stats['norm']), file=sys.stderr)
+        return
+    print("Ran {0} iterations, the last one changed the ranks by {1:.3g} ({2}).".format(
+        stats['iterations'], stats['residual'], stats['norm']), file=sys.stderr)
+
+@contextlib.contextmanager
+def _output(file_name, binary):
+    """
+    Helper function to open the output file (or to yield the standard
+    output without closing it).
+    """
+    if not file_name:
+        yield sys.stdout.buffer if binary else sys.stdout
+        return
+    with open(file_name, 'wb' if binary else 'w',
+              encoding=None if binary else "utf-8") as out_file:
+        yield out_file
+
+def _write_main(args, nodes, scores, index, sources=None):
+    """
+    Helper function to write the result of the main program.
+    """
+    binary = args.format == 'binary'
+    with _output(args.output, binary) as out_file:
+        write_ranks(nodes, scores, out_file, args.top, args.sorted, args.prefix, index, binary,
+                    sources)
+
+@contextlib.contextmanager
+def _telemetry(file_name, quiet):
+    """
+    Helper function to register the hooks of the main program while it runs:
+    a JSON lines stream to a file (or to a file descriptor if the name is a
+    number) and the progress dots unless ``quiet``.
+    """
+    saved = list(_HOOKS)
+    out_file = None
+    if quiet and print_progress in _HOOKS:
+        remove_hook(print_progress)
+    if file_name:
+        out_file = open(int(file_name) if file_name.isdigit() else file_name, 'w',
+                        encoding="utf-8", closefd=not file_name.isdigit())
+        add_hook(json_lines_hook(out_file))
+    try:
+        yield
+    finally:
+        _HOOKS[:] = saved
+        if out_file is not None:
+            out_file.close()
+
+def _serve_main(argv):
+    """
+    Execute the serve sub-command (see :mod:`danker.server`).
+    """
+    from danker.server import main
+    main(argv)
+
+#@profile
+def _main():
+    """
+    Execute main program.
+    """
+    commands = {'compile': _compile_main, 'intern': _intern_main, 'sort': _sort_main,
+                'update': _update_main, 'serve': _serve_main}
+    if len(sys.argv) > 1 and sys.argv[1] in commands:
+        commands[sys.argv[1]](sys.argv[2:])
+        return
+    parser = argparse.ArgumentParser(prog='python -m danker', description='danker' +
+                                     ' - Compute PageRank on large graphs with ' +
+                                     'off-the-shelf hardware.')
+    parser.add_argument('left_sorted', type=str, help='A two-column, ' +
+                        'tab-separated file sorted by the left column (see ' +
+                        '--unsorted) or a binary graph file (see "python -m ' +
+                        'danker compile -h").')
+    parser.add_argument('right_sorted', nargs='?', type=str, help='The same ' +
+                        'file as left_sorted but sorted by the right column ' +
+                        '(with --unsorted it may be the same file).')
+    parser.add_argument('damping', type=float, help='PageRank damping factor' +
+                        '(between 0 and 1).')
+    parser.add_argument('iterations', type=int, help='Number of PageRank ' +
+                        'iterations (>0).')
+    parser.add_argument('start_value', type=float, help='PageRank starting value'
+                        '(>0).')
+    parser.add_argument('-u', '--unsorted', action='store_true', help='The link ' +
+                        'files may be in any order: left_sorted is sorted in ' +
+                        'memory (big memory option) or only counted, right_sorted ' +
+                        'is sorted next to itself with an external merge sort.')
+    parser.add_argument('-m', '--sort-buffer', type=int, default=1 << 28,
+                        help='Bytes sorted in memory at once by the external merge ' +
+                        'sort of --unsorted. Default is 268435456.')
+    parser.add_argument('-x', '--index', type=str, help='Index file (integer ID ' +
+                        'and name, tab-separated, see "python -m danker intern -h") ' +
+                        'to write node names instead of IDs (needs numpy).')
+    parser.add_argument('-e', '--engine', type=str,
+                        choices=['dict', 'csr', 'compressed', 'blocks'],
+                        default='dict', help='Engine for the big memory option: ' +
+                        'Python dictionaries, vectorized CSR or CSR with ' +
+                        'delta and varint compressed in-links (needs numpy). ' +
+                        'Binary graph files use CSR, either memory-mapped, ' +
+                        'compressed in memory or streamed in blocks ("blocks", ' +
+                        'bounded memory). Default is "dict".')
+    parser.add_argument('-b', '--block-size', type=int, default=1 << 24,
+                        help='Maximum number of links per block of the "blocks" ' +
+                        'engine. Default is 16777216.')
+    parser.add_argument('-t', '--tolerance', type=float, help='Stop as soon as ' +
+                        'the change between two iterations is below this value ' +
+                        '(iterations is then the maximum number of iterations).')
+    parser.add_argument('-n', '--norm', type=str, choices=['l1', 'linf'], default='l1',
+                        help='Norm of the change between two iterations. ' +
+                        'Default is "l1".')
+    parser.add_argument('-s', '--solver', type=str,
+                        choices=['jacobi', 'gauss-seidel', 'adaptive'], default='jacobi',
+                        help='Iteration scheme of the csr engine and of binary graph ' +
+                        'files; "adaptive" (dict engine, big memory option, needs ' +
+                        '--tolerance) only updates nodes that have not converged ' +
+                        'and stops within --tolerance of the exact scores. ' +
+                        'Default is "jacobi".')
+    parser.add_argument('-o', '--order', type=str, default='natural',
+                        choices=['natural', 'reverse', 'in-degree', 'out-degree'],
+                        help='Node update order of the gauss-seidel solver. ' +
+                        'Default is "natural".')
+    parser.add_argument('-p', '--previous', type=str, help='Rank file of a ' +
+                        'previous run (e.g., on an older dump) used as starting ' +
+                        'vector instead of start_value (needs numpy); best ' +
+                        'combined with --tolerance.')
+    parser.add_argument('-P', '--prefix', type=str, default='', help='Prefix of ' +
+                        'the node names in the output, the previous rank file and ' +
+                        'the seed files (e.g., "Q"), not part of the link files.')
+    parser.add_argument('-k', '--top', type=int, help='Only write the K nodes ' +
+                        'with the highest scores in descending order.')
+    parser.add_argument('-r', '--sorted', action='store_true', help='Write all ' +
+                        'nodes in descending order of their scores.')
+    parser.add_argument('-f', '--format', type=str, choices=['text', 'binary'],
+                        default='text', help='Output format: tab-separated text or ' +
+                        'a binary rank file (needs numpy, see danker.load_rank_file). ' +
+                        'Default is "text".')
+    parser.add_argument('-O', '--output', type=str, help='Name of the output file. ' +
+                        'Default is the standard output.')
+    parser.add_argument('-S', '--seeds', type=str, nargs='+', help='Compute one ' +
+                        'personalized PageRank per seed file (one node per line) ' +
+                        'in a single pass; the output has one score column per ' +
+                        'seed file (needs numpy).')
+    parser.add_argument('-M', '--multi-source', action='store_true', help='Compute ' +
+                        'the global ranks and the ranks of every source (third ' +
+                        'column of the link file, e.g., the wiki) in one pass; the ' +
+                        'output has the source as third column (needs numpy and ' +
+                        'integer node names).')
+    parser.add_argument('--source-groups', type=str, help='Tab-separated file with ' +
+                        'source and group name per line: --multi-source computes one ' +
+                        'ranking per group.')
+    parser.add_argument('-C', '--checkpoint', type=str, help='Write the ranks ' +
+                        'periodically to this checkpoint file (see --resume).')
+    parser.add_argument('--checkpoint-every', type=int, help='Write a checkpoint ' +
+                        'every N iterations.')
+    parser.add_argument('--checkpoint-interval', type=float, default=600, help='Write ' +
+                        'a checkpoint if the last one is older than this number of ' +
+                        'seconds. Default is 600.')
+    parser.add_argument('-R', '--resume', action='store_true', help='Continue from ' +
+                        'the checkpoint file if it belongs to the same input, engine ' +
+                        'and damping factor (the result is the same as the one of an ' +
+                        'uninterrupted run).')
+    parser.add_argument('-T', '--telemetry', type=str, help='Write one JSON object ' +
+                        'per finished phase (parse, init, every iteration, pagerank, ' +
+                        'output) with elapsed time, edges per second, peak memory and ' +
+                        'residual to this file (or file descriptor, e.g., "3").')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Do not print ' +
+                        'the progress dots.')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='Number of ' +
+                        'worker processes for the csr engine and binary graph ' +
+                        'files. Default is 1.')
+    args = parser.parse_args()
+    if args.iterations <= 0 or args.damping > 1 or args.damping < 0 or args.start_value <= 0:
+        print("ERROR: Provided PageRank parameters\n\t[iterations ({0}), damping ({1}), "
+              "start value({2})]\n\tout of allowed range.\n\n".
+              format(args.iterations, args.damping, args.start_value), file=sys.stderr)
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+    if args.workers < 1 or (args.workers > 1 and (args.engine == 'compressed' or (
+            args.engine != 'csr' and not is_graph_file(args.left_sorted)))):
+        print("ERROR: Provided number of workers ({0}) must be >0 and more than one "
+              "worker needs the csr engine.\n\n".format(args.workers), file=sys.stderr)
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+    if args.engine == 'blocks' and not is_graph_file(args.left_sorted):
+        print("ERROR: The blocks engine needs a binary graph file (see " +
+              "\"python -m danker compile -h\").\n\n", file=sys.stderr)
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+    if args.solver == 'gauss-seidel' and (
+            args.engine in ('blocks', 'compressed') or args.workers > 1 or (
+                args.engine != 'csr' and not is_graph_file(args.left_sorted))):
+        print("ERROR: The gauss-seidel solver needs the csr engine (or a binary " +
+              "graph file) and one worker.\n\n", file=sys.stderr)
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+    if args.solver == 'adaptive' and (
+            args.engine != 'dict' or args.right_sorted or args.tolerance is None or
+            args.workers > 1 or args.checkpoint or is_graph_file(args.left_sorted)):
+        print("ERROR: The adaptive solver needs the dict engine, the big memory " +
+              "option, --tolerance and one worker (no checkpoints).\n\n", file=sys.stderr)
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+    if args.engine in ('csr', 'compressed') and args.right_sorted:
+        print("ERROR: The csr engines are only available for the big memory option " +
+              "(omit right_sorted).\n\n", file=sys.stderr)
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+    if args.tolerance is not None and args.tolerance <= 0:
+        print("ERROR: Provided tolerance ({0}) must be >0.\n\n".format(args.tolerance),
+              file=sys.stderr)
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+    if args.seeds and (args.right_sorted or args.engine in ('blocks', 'compressed') or
+                       args.workers > 1 or args.solver != 'jacobi' or args.previous):
+        print("ERROR: Personalized PageRank (--seeds) needs the big memory option " +
+              "(or a binary graph file), the jacobi solver and one worker; it can " +
+              "not start from a previous run.\n\n", file=sys.stderr)
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+    if (args.multi_source or args.source_groups) and (
+            not args.multi_source or args.right_sorted or args.seeds or args.previous or
+            args.solver == 'adaptive' or
+            args.engine == 'blocks' or args.format != 'text' or
+            is_graph_file(args.left_sorted)):
+        print("ERROR: --multi-source needs a link file with a source column, the big " +
+              "memory option and text output; it can not be combined with --seeds or " +
+              "--previous (--source-groups needs --multi-source).\n\n", file=sys.stderr)
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+    if (args.resume and not args.checkpoint) or (args.checkpoint and args.seeds) or (
+            args.checkpoint_every is not None and args.checkpoint_every <= 0):
+        print("ERROR: --resume needs --checkpoint, checkpoints are not available for " +
+              "--seeds and --checkpoint-every must be >0.\n\n", file=sys.stderr)
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+    if args.top is not None and args.top < 0:
+        print("ERROR: Provided number of top nodes ({0}) must be >=0.\n\n".format(args.top),
+              file=sys.stderr)
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+    if args.seeds and (args.top is not None or args.sorted or args.format != 'text'):
+        print("ERROR: Personalized PageRank (--seeds) writes all nodes as text " +
+              "(no --top, --sorted or --format binary).\n\n", file=sys.stderr)
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+    with _telemetry(args.telemetry, args.quiet):
+        _run_main(args, parser)
+
+def _run_smallmem(args, dictionary, checkpoint, stats):
+    """
+    Helper function to run :func:`danker_smallmem` for the main program
+    (sorting the right file first with --unsorted).
+    """
+    if not args.unsorted:
+        danker_smallmem(dictionary, args.right_sorted, args.iterations, args.damping,
+                        args.start_value, args.tolerance, args.norm, stats, checkpoint)
+        return
+    right_sorted = args.right_sorted + '.right.tmp'
+    try:
+        sort_links(args.right_sorted, right_sorted, 1, args.sort_buffer)
+        danker_smallmem(dictionary, right_sorted, args.iterations, args.damping,
+                        args.start_value, args.tolerance, args.norm, stats, checkpoint)
+    finally:
+        if os.path.exists(right_sorted):
+            os.remove(right_sorted)
+
+def _run_main(args, parser):
+    """
+    Helper function to compute and write PageRank for the main program.
+    """
+    start = time.time()
+    stats = {}
+    index = load_index(args.index) if args.index else None
+    checkpoint = None
+    if args.checkpoint:
+        inputs = [args.left_sorted]
+        if args.right_sorted and args.right_sorted != args.left_sorted:
+            inputs.append(args.right_sorted)
+        if args.source_groups:
+            inputs.append(args.source_groups)
+        checkpoint = Checkpoint(args.checkpoint, graph_hash(inputs), args.checkpoint_every,
+                                args.checkpoint_interval, args.resume)
+    if args.seeds:
+        if is_graph_file(args.left_sorted):
+            graph = load_graph(args.left_sorted)
+        else:
+            graph = init_csr(args.left_sorted, args.unsorted)
+        teleport = load_seeds(args.seeds, graph.nodes, args.prefix)
+        ranks = danker_personalized(graph, teleport, args.iterations, args.damping,
+                                    args.start_value, args.tolerance, args.norm, stats)
+        _print_stats(args.left_sorted, start, stats)
+        with _output(args.output, False) as out_file:
+            for i, rank in zip(_labels(graph.nodes, index),
+                               ranks[stats['location']].tolist()):
+                out_file.write("{0}{1}\t{2}\n".format(args.prefix, i, "\t".join(
+                    "{0:.17g}".format(j) for j in rank)))
+        return
+    if args.multi_source:
+        groups = load_source_groups(args.source_groups) if args.source_groups else None
+        graph, sources, names = init_multi_source(args.left_sorted, groups)
+        if args.engine == 'compressed':
+            ranks = danker_compressed(compress_graph(graph), args.iterations, args.damping,
+                                      args.start_value, args.tolerance, args.norm, stats,
+                                      checkpoint)
+        elif args.solver == 'gauss-seidel':
+            ranks = danker_gauss_seidel(graph, args.iterations, args.damping,
+                                        args.start_value, args.tolerance, args.norm, stats,
+                                        args.order, checkpoint=checkpoint)
+        else:
+            ranks = danker_csr(graph, args.iterations, args.damping, args.start_value,
+                               args.tolerance, args.norm, stats, args.workers, checkpoint)
+        _print_stats(args.left_sorted, start, stats)
+        _write_main(args, graph.nodes, ranks[stats['location']], index, (sources, names))
+        return
+    if is_graph_file(args.left_sorted) or args.engine in ('csr', 'compressed'):
+        if args.right_sorted:
+            print("ERROR: A binary graph file does not need right_sorted.\n\n",
+                  file=sys.stderr)
+            parser.print_help(sys.stderr)
+            sys.exit(1)
+        if is_graph_file(args.left_sorted):
+            graph = load_graph(args.left_sorted)
+        else:
+            graph = init_csr(args.left_sorted, args.unsorted)
+        if args.engine == 'compressed':
+            graph = compress_graph(graph)
+        start_value = args.start_value
+        if args.previous:
+            start_value = load_ranks(args.previous, graph.nodes, start_value, args.prefix)
+        if args.engine == 'blocks':
+            ranks = danker_blocks(args.left_sorted, args.iterations, args.damping,
+                                  start_value, args.tolerance, args.norm, stats,
+                                  args.block_size, checkpoint)
+        elif args.engine == 'compressed':
+            ranks = danker_compressed(graph, args.iterations, args.damping, start_value,
+                                      args.tolerance, args.norm, stats, checkpoint)
+        elif args.solver == 'gauss-seidel':
+            ranks = danker_gauss_seidel(graph, args.iterations, args.damping,
+                                        start_value, args.tolerance, args.norm, stats,
+                                        args.order, checkpoint=checkpoint)
+        else:
+            ranks = danker_csr(graph, args.iterations, args.damping, start_value,
+                               args.tolerance, args.norm, stats, args.workers, checkpoint)
+        _print_stats(args.left_sorted, start, stats)
+        _write_main(args, graph.nodes, ranks[stats['location']], index)
+        return
+
+    if args.right_sorted and np is not None:
+        # typed arrays instead of a dictionary for integer node names
+        table = init_table(args.left_sorted, args.start_value, args.unsorted)
+        if table is not None:
+            if args.previous:
+                table.ranks[:] = load_ranks(args.previous, table.nodes, args.start_value,
+                                            args.prefix)
+            _run_smallmem(args, table, checkpoint, stats)
+            _print_stats(args.left_sorted, start, stats)
+            _write_main(args, table.nodes, table.scores(stats['location']), index)
+            return
+
+    dictionary = init(args.left_sorted, args.start_value, args.right_sorted, args.unsorted)
+    if args.previous:
+        start_value = load_ranks(args.previous, list(dictionary), args.start_value,
+                                 args.prefix)
+        for k, value in zip(dictionary, start_value.tolist()):
+            dictionary[k][1] = dictionary[k][2] = value
+    if args.right_sorted:
+        _run_smallmem(args, dictionary, checkpoint, stats)
+    elif args.solver == 'adaptive':
+        danker_adaptive(dictionary, args.iterations, args.damping, args.tolerance,
+                        args.norm, stats)
+    else:
+        danker_bigmem(dictionary, args.iterations, args.damping, args.tolerance,
+                      args.norm, stats, checkpoint)
 
-    for i in dictionary:
-        print("{0}\t{1:.17g}".format(i, dictionary[i][result_position]))
+    _print_stats(args.left_sorted, start, stats)
+    result_position = stats['location']
+    _write_main(args, list(dictionary), [k[result_position] for k in dictionary.values()],
+                index)
 
 
 if __name__ == '__main__':
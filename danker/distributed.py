@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+
+#    danker - PageRank on Wikipedia/Wikidata
+#    Copyright (C) 2020  Andreas Thalhammer
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+PageRank on several machines: a coordinator splits the nodes of a graph
+into contiguous shards and sends every worker the in-links of its shard.
+Every worker keeps only the ranks and in-links of its shard; in every
+iteration it sends the contributions of its nodes that link into other
+shards and receives the contributions of the nodes of other shards that
+link into its own (packed float64 arrays, routed by the coordinator). The
+rows are computed exactly as in :func:`danker.danker_csr`, hence the results
+are the same::
+
+    # on the coordinator (waits for two workers)
+    export DANKER_AUTHKEY=secret
+    python -m danker.distributed output-graph 0.85 40 0.1 -w 2 -a 0.0.0.0:6000 -O out.rank
+
+    # on every worker host
+    export DANKER_AUTHKEY=secret
+    python -m danker.distributed worker coordinator-host:6000
+
+Without ``--address`` the workers are started as local processes that are
+connected through a Unix socket (e.g., for testing). The connections are
+authenticated with the shared key, but not encrypted.
+
+The coordinator only reads a memory-mapped binary graph file and sends the
+shards from it; it never holds the whole graph. A link file has to be
+compiled first, with bounded memory by ``python -m danker compile -r -u``.
+The coordinator still holds the ranks of all nodes (16 bytes per node).
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import contextlib
+import multiprocessing
+from multiprocessing.connection import Listener, Client, Connection, wait
+from multiprocessing.connection import answer_challenge, deliver_challenge
+
+from danker.danker import np, _require_numpy, _shards, _buckets, _sum_in_links, _change
+from danker.danker import _converged, _emit, _index_dtype, _CHUNK_SIZE, _telemetry
+from danker.danker import _write_main, _print_stats, is_graph_file, load_graph
+from danker.danker import load_index
+
+def parse_address(address):
+    """
+    Convert ``host:port`` to a TCP address; anything else is the path of a
+    Unix socket.
+    """
+    host, _, port = address.rpartition(':')
+    if host and port.isdigit():
+        return host, int(port)
+    return address
+
+def _receive_array(conn, dtype, count):
+    """
+    Helper function to receive an array that was sent in chunks of bytes.
+    """
+    values = np.empty(count, dtype=dtype)
+    received = 0
+    while received < count:
+        chunk = np.frombuffer(conn.recv_bytes(), dtype=dtype)
+        values[received:received + len(chunk)] = chunk
+        received += len(chunk)
+    return values
+
+def _send_array(conn, values, dtype=None):
+    """
+    Helper function to send a (possibly memory-mapped) array in chunks of
+    bytes (converted chunk by chunk to ``dtype`` if given).
+    """
+    step = _CHUNK_SIZE * 16
+    for low in range(0, len(values), step):
+        conn.send_bytes(np.ascontiguousarray(values[low:low + step], dtype=dtype).tobytes())
+
+def _work(conn):
+    """
+    Helper function to compute the ranks of one shard as told by the
+    coordinator (see :func:`danker_distributed`).
+    """
+    low, high, links, damping, norm = conn.recv()
+    size = high - low
+    indptr = _receive_array(conn, '<i8', size + 1)
+    indices = _receive_array(conn, '<i8', links)
+    divisor = _receive_array(conn, '<f8', size)
+    ranks = np.empty((2, size), dtype=np.float64)
+    ranks[:] = _receive_array(conn, '<f8', 2 * size).reshape(2, size)
+
+    # in-links from other shards point behind the own nodes
+    outside = (indices < low) | (indices >= high)
+    needed = np.unique(indices[outside])
+    conn.send_bytes(needed.astype('<i8').tobytes())
+    local = indices - low
+    local[outside] = size + np.searchsorted(needed, indices[outside])
+    indices = local.astype(_index_dtype(size + len(needed)))
+    del local, outside
+    boundary = np.frombuffer(conn.recv_bytes(), dtype='<i8') - low
+    buckets = _buckets(indptr)
+    contrib = np.empty(size + len(needed), dtype=np.float64)
+
+    while True:
+        iteration = conn.recv()
+        if iteration < 0:
+            break
+        i_location = iteration % 2
+        i_plus_1_location = (iteration + 1) % 2
+        contrib[:size] = damping * ranks[i_location] / divisor
+        conn.send_bytes(contrib[boundary].tobytes())
+        contrib[size:] = np.frombuffer(conn.recv_bytes(), dtype='<f8')
+        _sum_in_links(indptr, indices, buckets, contrib, 1 - damping, ranks[i_plus_1_location])
+        conn.send(_change(ranks[i_plus_1_location], ranks[i_location], norm))
+    _send_array(conn, ranks.reshape(-1))
+
+def serve(address, authkey):
+    """
+    Run a worker: connect to the coordinator at ``address`` and compute one
+    shard.
+
+    :param address: Address of the coordinator (see :func:`parse_address`).
+    :param authkey: Shared key (bytes) of the coordinator and the workers.
+    """
+    _require_numpy()
+    with contextlib.closing(Client(address, authkey=authkey)) as conn:
+        _work(conn)
+
+def _setup(graph, connections, start_value, damping, norm):
+    """
+    Helper function to send every worker its shard and to exchange which
+    contributions every worker needs.
+
+    :returns: Tuple (shards, list of the positions of the nodes needed by
+              every worker, list of the positions of the nodes of every
+              worker that are needed by others).
+    """
+    size = len(graph.nodes)
+    start = np.empty(size, dtype=np.float64)
+    start[:] = start_value
+    divisor = np.where(graph.out_degree > 0, graph.out_degree, 1).astype(np.float64)
+    shards = _shards(graph.indptr, len(connections))
+    for conn, (low, high) in zip(connections, shards):
+        first, last = int(graph.indptr[low]), int(graph.indptr[high])
+        conn.send((low, high, last - first, damping, norm))
+        _send_array(conn, np.asarray(graph.indptr[low:high + 1], dtype='<i8') - first)
+        # the in-links of a shard are read from the graph file chunk by chunk
+        _send_array(conn, graph.indices[first:last], '<i8')
+        _send_array(conn, divisor[low:high])
+        _send_array(conn, np.concatenate((start[low:high], start[low:high])))
+    needed = [np.frombuffer(conn.recv_bytes(), dtype='<i8') for conn in connections]
+    # every node that is needed by another shard is sent by its own shard
+    boundary = np.unique(np.concatenate(needed)) if needed else np.zeros(0, dtype='<i8')
+    boundary = [boundary[(boundary >= low) & (boundary < high)] for low, high in shards]
+    for conn, nodes in zip(connections, boundary):
+        conn.send_bytes(nodes.tobytes())
+    return shards, needed, boundary
+
+#@profile
+def danker_distributed(graph, connections, iterations, damping, start_value, tolerance=None,
+                       norm='l1', stats=None):
+    """
+    Compute PageRank on a :class:`danker.CSRGraph` with workers connected
+    through sockets (see :func:`serve` and :func:`local_workers`). The
+    coordinator itself only holds the contributions of nodes with links into
+    other shards (and finally the ranks); the graph may be memory-mapped.
+
+    :param graph: :class:`danker.CSRGraph`, e.g., from :func:`danker.load_graph`.
+    :param connections: List of connections (one per worker and shard).
+    :param iterations: The number of PageRank iterations.
+    :param damping: The PageRank damping factor.
+    :param start_value: The PageRank starting value (a float or an array with
+                        one value per node).
+    :param tolerance: Optional convergence threshold (see
+                      :func:`danker.danker_smallmem`).
+    :param norm: Norm of the change between two iterations ("l1" or "linf").
+    :param stats: Optional dictionary that is filled with run information
+                  (see :func:`danker.danker_csr`).
+    :return: float64 array of shape ``(2, len(graph.nodes))`` like
+             :func:`danker.danker_csr` (with the same values).
+    """
+    _require_numpy()
+    start = time.time()
+    shards, needed, boundary = _setup(graph, connections, start_value, damping, norm)
+    _emit('init', start, len(graph.indices), nodes=len(graph.nodes), workers=len(shards),
+          boundary=sum(len(k) for k in boundary))
+    contrib = np.zeros(len(graph.nodes), dtype=np.float64)
+    if stats is not None:
+        stats.update(iterations=0, location=0, residual=float('nan'), norm=norm)
+    start, links = time.time(), len(graph.indices)
+    for iteration in range(0, iterations):
+        began = time.time()
+        for conn in connections:
+            conn.send(iteration)
+        for conn, nodes in zip(connections, boundary):
+            contrib[nodes] = np.frombuffer(conn.recv_bytes(), dtype='<f8')
+        for conn, nodes in zip(connections, needed):
+            conn.send_bytes(contrib[nodes].tobytes())
+        partial = [conn.recv() for conn in connections]
+        residual = max(partial) if norm == 'linf' else sum(partial)
+        if _converged(iteration, residual, tolerance, norm, stats, (iteration + 1) % 2,
+                      began, links):
+            break
+    for conn in connections:
+        conn.send(-1)
+    ranks = np.empty((2, len(graph.nodes)), dtype=np.float64)
+    for conn, (low, high) in zip(connections, shards):
+        ranks[:, low:high] = _receive_array(conn, '<f8', 2 * (high - low)).reshape(2, -1)
+    _emit('pagerank', start)
+    return ranks
+
+@contextlib.contextmanager
+def accept_workers(address, count, authkey):
+    """
+    Listen at ``address`` until ``count`` workers are connected.
+
+    :returns: Context manager of the list of connections.
+    """
+    connections = []
+    with contextlib.closing(Listener(address, authkey=authkey)) as listener:
+        try:
+            while len(connections) < count:
+                connections.append(listener.accept())
+            yield connections
+        finally:
+            for conn in connections:
+                conn.close()
+
+def _accept(server, authkey, processes):
+    """
+    Helper function to accept the connection of a local worker on the
+    listening socket ``server`` (authenticated like a :class:`Listener`).
+
+    :raises RuntimeError: If a worker process ended before it connected.
+    """
+    sentinels = dict((process.sentinel, process) for process in processes)
+    ready = wait([server] + list(sentinels))
+    for sentinel in ready:
+        if sentinel in sentinels:
+            process = sentinels[sentinel]
+            raise RuntimeError('Worker process {0} ended with exit code {1} before it '
+                               'connected.'.format(process.pid, process.exitcode))
+    conn = Connection(server.accept()[0].detach())
+    deliver_challenge(conn, authkey)
+    answer_challenge(conn, authkey)
+    return conn
+
+@contextlib.contextmanager
+def local_workers(count):
+    """
+    Start ``count`` local worker processes connected through a Unix socket.
+
+    :returns: Context manager of the list of connections.
+    """
+    context = multiprocessing.get_context('spawn')
+    authkey = os.urandom(32)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        address = os.path.join(tmp_dir, 'coordinator')
+        # an own socket to wait for workers and worker processes at once
+        with socket.socket(socket.AF_UNIX) as server:
+            server.bind(address)
+            server.listen(count)
+            processes = [context.Process(target=serve, args=(address, authkey))
+                         for _ in range(count)]
+            for process in processes:
+                process.start()
+            connections = []
+            try:
+                try:
+                    for _ in processes:
+                        connections.append(_accept(server, authkey, processes))
+                except BaseException:
+                    # the other workers wait for the coordinator forever
+                    for process in processes:
+                        process.terminate()
+                    raise
+                yield connections
+            finally:
+                for conn in connections:
+                    conn.close()
+                for process in processes:
+                    process.join()
+
+def _authkey(args, parser):
+    """
+    Helper function to return the shared key (option or environment).
+    """
+    authkey = args.authkey or os.environ.get('DANKER_AUTHKEY')
+    if not authkey:
+        parser.error('remote workers need a shared key (--authkey or DANKER_AUTHKEY)')
+    return authkey.encode('utf-8')
+
+def _worker_main(argv):
+    """
+    Run a worker.
+    """
+    parser = argparse.ArgumentParser(prog='python -m danker.distributed worker',
+                                     description='Compute one shard for a coordinator.')
+    parser.add_argument('address', type=str, help='Address of the coordinator ' +
+                        '(host:port or path of a Unix socket).')
+    parser.add_argument('-K', '--authkey', type=str, help='Shared key (default: ' +
+                        'environment variable DANKER_AUTHKEY).')
+    args = parser.parse_args(argv)
+    serve(parse_address(args.address), _authkey(args, parser))
+
+def main(argv=None):
+    """
+    Execute the coordinator (or a worker with ``worker`` as first argument).
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'worker':
+        _worker_main(argv[1:])
+        return
+    parser = argparse.ArgumentParser(prog='python -m danker.distributed', description='Compute ' +
+                                     'PageRank with workers on several machines.')
+    parser.add_argument('graph_file', type=str, help='A binary graph file (memory-mapped, ' +
+                        'see "python -m danker compile -h").')
+    parser.add_argument('damping', type=float, help='PageRank damping factor.')
+    parser.add_argument('iterations', type=int, help='Number of PageRank iterations.')
+    parser.add_argument('start_value', type=float, help='PageRank starting value.')
+    parser.add_argument('-w', '--workers', type=int, default=2, help='Number of workers ' +
+                        '(shards). Default is 2.')
+    parser.add_argument('-a', '--address', type=str, help='Listen at this address ' +
+                        '(host:port or path of a Unix socket) for remote workers; ' +
+                        'default: start local worker processes.')
+    parser.add_argument('-K', '--authkey', type=str, help='Shared key of remote workers ' +
+                        '(default: environment variable DANKER_AUTHKEY).')
+    parser.add_argument('-t', '--tolerance', type=float, help='Stop as soon as the change ' +
+                        'between two iterations is below this value.')
+    parser.add_argument('-n', '--norm', type=str, choices=['l1', 'linf'], default='l1',
+                        help='Norm of the change between two iterations. Default is "l1".')
+    parser.add_argument('-x', '--index', type=str, help='Index file to write node names ' +
+                        'instead of IDs.')
+    parser.add_argument('-P', '--prefix', type=str, default='', help='Prefix of the node ' +
+                        'names in the output.')
+    parser.add_argument('-k', '--top', type=int, help='Only write the K nodes with the ' +
+                        'highest scores in descending order.')
+    parser.add_argument('-r', '--sorted', action='store_true', help='Write all nodes in ' +
+                        'descending order of their scores.')
+    parser.add_argument('-f', '--format', type=str, choices=['text', 'binary'],
+                        default='text', help='Output format. Default is "text".')
+    parser.add_argument('-O', '--output', type=str, help='Name of the output file. ' +
+                        'Default is the standard output.')
+    parser.add_argument('-T', '--telemetry', type=str, help='Write one JSON object per ' +
+                        'finished phase to this file (or file descriptor).')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Do not print the ' +
+                        'progress dots.')
+    args = parser.parse_args(argv)
+    if args.iterations <= 0 or not 0 <= args.damping <= 1 or args.start_value <= 0 or \
+            args.workers < 1:
+        parser.error('iterations, start value and workers must be >0, damping between 0 and 1')
+    _require_numpy()
+    if not is_graph_file(args.graph_file):
+        parser.error('"{0}" is not a binary graph file; compile it first with bounded '
+                     'memory: python -m danker compile -r -u {0} {0}.graph'.format(
+                         args.graph_file))
+    authkey = _authkey(args, parser) if args.address else None
+
+    with _telemetry(args.telemetry, args.quiet):
+        start, stats = time.time(), {}
+        index = load_index(args.index) if args.index else None
+        graph = load_graph(args.graph_file)
+        if args.address:
+            workers = accept_workers(parse_address(args.address), args.workers, authkey)
+        else:
+            workers = local_workers(args.workers)
+        with workers as connections:
+            ranks = danker_distributed(graph, connections, args.iterations, args.damping,
+                                       args.start_value, args.tolerance, args.norm, stats)
+        _print_stats(args.graph_file, start, stats)
+        _write_main(args, graph.nodes, ranks[stats['location']], index)
+
+
+if __name__ == '__main__':
+    main()
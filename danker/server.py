@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+
+#    danker - PageRank on Wikipedia/Wikidata
+#    Copyright (C) 2020  Andreas Thalhammer
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Rank lookups over HTTP: the output of a run (text or binary rank file) is
+turned into a memory-mapped rank index (see :func:`danker.write_rank_index`)
+that answers point, batch and top-k queries with JSON::
+
+    python -m danker serve output.rank -P Q -a 127.0.0.1:8080
+
+    GET  /rank?id=Q42&id=Q1          score, rank and percentile per node
+    POST /rank                       the same for a JSON list of nodes
+    GET  /top?n=10&offset=0          the nodes with the highest scores
+    GET  /percentile?p=99&n=10       the nodes from the one at percentile p on
+    GET  /percentile?p=99&to=100     the nodes with a percentile in [p, to]
+    GET  /stats                      number of nodes and index file
+
+An address that is not ``host:port`` is the path of a Unix socket. The
+server checks the index file at most once per second; if it was replaced
+(e.g., ``python -m danker serve new.rank --build-only -i output.rank.idx``
+after a new dump), new requests use the new index while running requests
+finish on the old one.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+from socketserver import ThreadingMixIn, UnixStreamServer
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+from danker.danker import write_rank_index, load_rank_index, _require_numpy
+
+MAX_BODY = 1 << 24
+MAX_TOP = 10000
+
+
+class IndexHolder(object):
+    """
+    The current rank index of a server; it is reloaded if the index file
+    was replaced.
+
+    :param file_name: Name of the index file.
+    :param interval: Minimum number of seconds between two checks.
+    """
+
+    def __init__(self, file_name, interval=1.0):
+        self.file_name = file_name
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._checked = time.time()
+        self._stat = self._identity()
+        self._index = load_rank_index(file_name)
+
+    def _identity(self):
+        stat = os.stat(self.file_name)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def get(self):
+        """
+        Return the current index (reloaded if the file was replaced).
+        """
+        now = time.time()
+        if now - self._checked < self.interval:
+            return self._index
+        with self._lock:
+            if now - self._checked >= self.interval:
+                self._checked = now
+                try:
+                    identity = self._identity()
+                    if identity != self._stat:
+                        self._index = load_rank_index(self.file_name)
+                        self._stat = identity
+                except (OSError, ValueError) as error:
+                    # keep the old index until the new one is complete
+                    print("Reloading '{0}' failed: {1}".format(self.file_name, error),
+                          file=sys.stderr)
+        return self._index
+
+
+def _describe(index, positions, names, prefix):
+    """
+    Helper function to convert positions of an index to JSON objects.
+    """
+    result = []
+    for name, position in zip(names, positions):
+        if position < 0:
+            result.append({'id': name, 'found': False})
+            continue
+        node, score, rank, percentile = index.entry(position)
+        result.append({'id': '{0}{1}'.format(prefix, node), 'found': True, 'score': score,
+                       'rank': rank, 'percentile': percentile})
+    return result
+
+
+def query_ranks(index, names, prefix=''):
+    """
+    Look up nodes in a rank index.
+
+    :param index: :class:`danker.RankIndex`.
+    :param names: List of node names (with or without prefix).
+    :param prefix: Prefix of the node names (e.g., "Q").
+    :returns: List of dictionaries (id, found, score, rank, percentile).
+    """
+    keys = [k[len(prefix):] if prefix and isinstance(k, str) and k.startswith(prefix)
+            else k for k in names]
+    return _describe(index, index.find(keys), names, prefix)
+
+
+def query_top(index, count, offset=0, prefix=''):
+    """
+    Return the nodes with the ranks ``offset + 1`` to ``offset + count``
+    (see :func:`query_ranks`).
+    """
+    positions = index.top(count, offset)
+    return _describe(index, positions, [None] * len(positions), prefix)
+
+
+def query_percentile(index, low, high=None, count=MAX_TOP, prefix=''):
+    """
+    Return at most ``count`` nodes with a percentile between ``low`` and
+    ``high``, or from the node at percentile ``low`` on without ``high``
+    (see :meth:`danker.RankIndex.percentile_ranks` and :func:`query_ranks`).
+    """
+    first, last = index.percentile_ranks(low, high)
+    return query_top(index, min(count, last - first), first, prefix)
+
+
+class RankHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler of the rank server (see module documentation).
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self, status, value):
+        body = json.dumps(value).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _query(self, path, parameters, body=None):
+        index = self.server.holder.get()
+        prefix = self.server.prefix
+        if path == '/rank':
+            names = body if body is not None else parameters.get('id', [])
+            if not isinstance(names, list):
+                raise ValueError('expected a list of nodes')
+            return {'results': query_ranks(index, names, prefix)}
+        if path == '/top':
+            count = int(parameters.get('n', ['10'])[0])
+            offset = int(parameters.get('offset', ['0'])[0])
+            if not 0 <= count <= MAX_TOP or offset < 0:
+                raise ValueError('n must be between 0 and {0}, offset >=0'.format(MAX_TOP))
+            return {'results': query_top(index, count, offset, prefix)}
+        if path == '/percentile':
+            if 'p' not in parameters:
+                raise ValueError('missing percentile p')
+            low = float(parameters['p'][0])
+            high = float(parameters['to'][0]) if 'to' in parameters else None
+            count = int(parameters.get('n', [str(MAX_TOP if high is not None else 10)])[0])
+            if not 0 <= low <= (100 if high is None else high) <= 100 or \
+                    not 0 <= count <= MAX_TOP:
+                raise ValueError('p and to must be between 0 and 100 (p <= to), n between '
+                                 '0 and {0}'.format(MAX_TOP))
+            return {'results': query_percentile(index, low, high, count, prefix)}
+        if path == '/stats':
+            return {'nodes': len(index), 'index': self.server.holder.file_name}
+        return None
+
+    def _handle(self, body=None):
+        url = urlsplit(self.path)
+        try:
+            result = self._query(url.path, parse_qs(url.query), body)
+        except ValueError as error:
+            self._reply(400, {'error': str(error)})
+            return
+        if result is None:
+            self._reply(404, {'error': 'unknown path'})
+        else:
+            self._reply(200, result)
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # the body cannot be read (it would wait for the end of the connection)
+            self._reply(400, {'error': 'invalid Content-Length'})
+            self.close_connection = True
+            return
+        if length > MAX_BODY:
+            self._reply(413, {'error': 'request too large'})
+            self.close_connection = True
+            return
+        try:
+            body = json.loads(self.rfile.read(length).decode('utf-8'))
+        except ValueError:
+            self._reply(400, {'error': 'invalid JSON'})
+            return
+        self._handle(body)
+
+    def address_string(self):
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class RankServer(ThreadingMixIn, HTTPServer):
+    """
+    Threaded HTTP server on a TCP address.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, holder, prefix='', verbose=False):
+        self.holder = holder
+        self.prefix = prefix
+        self.verbose = verbose
+        super().__init__(address, RankHandler)
+
+    def server_bind(self):
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().server_bind()
+
+
+class UnixRankServer(ThreadingMixIn, UnixStreamServer):
+    """
+    Threaded HTTP server on a Unix socket.
+    """
+    daemon_threads = True
+
+    def __init__(self, path, holder, prefix='', verbose=False):
+        self.holder = holder
+        self.prefix = prefix
+        self.verbose = verbose
+        if os.path.exists(path):
+            os.remove(path)
+        super().__init__(path, RankHandler)
+
+
+def create_server(address, holder, prefix='', verbose=False):
+    """
+    Create a rank server.
+
+    :param address: ``host:port`` or the path of a Unix socket.
+    :param holder: :class:`IndexHolder`.
+    :param prefix: Prefix of the node names (e.g., "Q").
+    :param verbose: Log every request to the standard error.
+    """
+    host, _, port = address.rpartition(':')
+    if host and port.isdigit():
+        return RankServer((host, int(port)), holder, prefix, verbose)
+    return UnixRankServer(address, holder, prefix, verbose)
+
+
+def build_index(rank_file, index_file, prefix='', force=False):
+    """
+    Build the index of a rank file unless an up-to-date index exists.
+
+    :returns: True if the index was built.
+    """
+    if rank_file == index_file or (
+            not force and os.path.exists(index_file) and
+            os.path.getmtime(index_file) >= os.path.getmtime(rank_file)):
+        return False
+    start = time.time()
+    size = write_rank_index(rank_file, index_file, prefix)
+    print("Indexing of '{0}' ({1} nodes) took {2:.2f} seconds.".format(
+        rank_file, size, time.time() - start), file=sys.stderr)
+    return True
+
+
+def main(argv=None):
+    """
+    Execute the serve sub-command.
+    """
+    parser = argparse.ArgumentParser(prog='python -m danker serve',
+                                     description='Answer rank queries over HTTP ' +
+                                     '(needs numpy).')
+    parser.add_argument('rank_file', type=str, help='Output of a run (text or ' +
+                        'binary rank file) or a rank index.')
+    parser.add_argument('-i', '--index-file', type=str, help='Name of the rank ' +
+                        'index. Default is rank_file with the suffix ".idx".')
+    parser.add_argument('-P', '--prefix', type=str, default='', help='Prefix of ' +
+                        'the node names (e.g., "Q").')
+    parser.add_argument('-a', '--address', type=str, default='127.0.0.1:8080',
+                        help='host:port or the path of a Unix socket. Default is ' +
+                        '"127.0.0.1:8080".')
+    parser.add_argument('-b', '--build-only', action='store_true', help='Only ' +
+                        '(re)build the index, e.g., to switch a running server to ' +
+                        'the results of a new dump.')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log every ' +
+                        'request.')
+    args = parser.parse_args(argv)
+    _require_numpy()
+
+    index_file = args.index_file
+    if index_file is None:
+        index_file = args.rank_file
+        try:
+            load_rank_index(args.rank_file)
+        except ValueError:
+            index_file = args.rank_file + '.idx'
+    if args.build_only:
+        if index_file == args.rank_file:
+            parser.error('rank_file is already an index.')
+        build_index(args.rank_file, index_file, args.prefix, force=True)
+        return
+    build_index(args.rank_file, index_file, args.prefix)
+
+    server = create_server(args.address, IndexHolder(index_file), args.prefix, args.verbose)
+    print("Serving '{0}' on {1}.".format(index_file, args.address), file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+#    danker - PageRank on Wikipedia/Wikidata
+#    Copyright (C) 2017  Andreas Thalhammer
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Extract the links of all languages of a project (``dank.sh ALL``):
+create_links.sh runs for several languages at once (every language in its
+own working directory), then the sorted link files are merged into one
+sorted link file in a single k-way merge pass (``sort -m``). The number of
+links of every language is counted by its worker right after the
+extraction and written to ``<output>.stats.txt`` (like ``wc -l``).
+"""
+
+import os
+import sys
+import time
+import shutil
+import signal
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Fix broken pipe error.
+# More details: https://bugs.python.org/issue1652
+signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+GIGABYTE = 1 << 30
+
+
+def languages(project):
+    """
+    Return the languages of a project (see get_languages.sh).
+    """
+    output = subprocess.check_output([os.path.join(DIR, 'get_languages.sh'), project],
+                                     universal_newlines=True)
+    return output.split()
+
+
+def workers(jobs, disk, directory):
+    """
+    Return the number of concurrent extractions: at most ``jobs`` and as many
+    as ``disk`` gigabytes of free disk space each in ``directory`` allow (at
+    least one).
+    """
+    free = shutil.disk_usage(directory).free
+    return max(1, min(jobs, int(free // (disk * GIGABYTE)) if disk else jobs))
+
+
+def extract(language, project, directory):
+    """
+    Run create_links.sh for one language in a new working directory.
+
+    :returns: Tuple (language, path of the link file or None if the
+              extraction failed, number of links, seconds). The links are
+              counted right after the extraction (while the file is cached).
+    """
+    start = time.time()
+    work = tempfile.mkdtemp(prefix=language + '.', dir=directory)
+    process = subprocess.run([os.path.join(DIR, 'create_links.sh'), language, project],
+                             cwd=work, stdout=subprocess.PIPE, universal_newlines=True)
+    name = process.stdout.strip()
+    if process.returncode or not name or not os.path.isfile(os.path.join(work, name)):
+        shutil.rmtree(work, ignore_errors=True)
+        return language, None, 0, time.time() - start
+    link_file = os.path.join(work, name)
+    with open(link_file, 'rb') as in_file:
+        links = sum(k.count(b'\n') for k in iter(lambda: in_file.read(1 << 20), b''))
+    return language, link_file, links, time.time() - start
+
+
+def merge(file_names, output):
+    """
+    Merge sorted link files (numerically by the left and then by the right
+    column) with GNU sort in a single k-way merge pass.
+
+    :param file_names: Names of the sorted link files.
+    :param output: Name of the merged link file.
+    """
+    if not file_names:
+        open(output, 'wb').close()
+        return
+    subprocess.run(['sort', '-m', '-k', '1,1n', '-k', '2,2n', '-T', os.path.dirname(output),
+                    '--batch-size', str(max(2, len(file_names))), '-o', output] + file_names,
+                   env=dict(os.environ, LC_ALL='C'), check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract and merge the links of all " +
+                                     "languages of a project.",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('output', type=str, help='Name of the merged link file.')
+    parser.add_argument('-p', '--project', type=str, default='',
+                        help='Wiki project suffix (e.g., "books"; empty for Wikipedia).')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Maximum number of concurrent extractions.')
+    parser.add_argument('-D', '--disk', type=float, default=10,
+                        help='Gigabytes of free disk space needed per extraction (0: ' +
+                        'only --jobs limits the extractions).')
+    args = parser.parse_args()
+
+    directory = os.path.dirname(os.path.abspath(args.output))
+    names = languages(args.project)
+    pool_size = workers(args.jobs, args.disk, directory)
+    print("Extracting {0} languages with {1} workers.".format(len(names), pool_size),
+          file=sys.stderr)
+    with ThreadPoolExecutor(pool_size) as pool:
+        futures = [pool.submit(extract, k, args.project, directory) for k in names]
+        for future in as_completed(futures):
+            language, link_file, links, seconds = future.result()
+            print("{0}\t{1}\t{2}\t{3:.0f}s".format(language, 'ok' if link_file else 'failed',
+                                                  links, seconds), file=sys.stderr)
+
+    extracted = [k.result() for k in futures if k.result()[1]]
+    link_files = [k[1] for k in extracted]
+    try:
+        merge(link_files, args.output)
+        with open(args.output + '.stats.txt', 'w', encoding="utf-8") as stats_file:
+            for _, link_file, links, _ in extracted:
+                stats_file.write('{0} {1}\n'.format(links, os.path.basename(link_file)))
+            stats_file.write('{0} {1}\n'.format(sum(k[2] for k in extracted), args.output))
+    finally:
+        for link_file in link_files:
+            shutil.rmtree(os.path.dirname(link_file), ignore_errors=True)
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(1)
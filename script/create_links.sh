@@ -17,6 +17,8 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+set -o pipefail
+
 dir=$(dirname "$0")
 
 if [ ! "$1" ]; then
@@ -63,7 +65,7 @@ pagelinks="$wiki""wiki$project-""$dump_date""-pagelinks.sql"
 redirect="$wiki""wiki$project-""$dump_date""-redirect.sql"
 pageprops="$wiki""wiki$project-""$dump_date""-page_props.sql"
 
-# Download and unzip
+# Download
 
 if ! wget -q --waitretry=1m --retry-connrefused "$download$dump_date/$page.gz" \
     "$download$dump_date/$pagelinks.gz" \
@@ -73,150 +75,76 @@ if ! wget -q --waitretry=1m --retry-connrefused "$download$dump_date/$page.gz" \
         exit 1
 fi
 
-gunzip "$page.gz" "$pagelinks.gz" "$redirect.gz" "$pageprops.gz"
-
-# Pre-process
-"$dir"/maria2csv.py "$page" \
-    | csvformat -q "'" -b -p "\\" \
-    | csvcut -c page_id,page_namespace,page_title \
-    | csvgrep -c page_namespace -r "^0$|^14$" \
-    | csvformat -D $'\t' \
-    | tail -n+2 \
+# Pre-process (maria2csv.py decompresses the dumps while reading and writes
+# the selected columns tab-separated). The four tables are independent and
+# are processed concurrently.
+"$dir"/maria2csv.py --no-header \
+    --columns page_id,page_namespace,page_title \
+    --filter "page_namespace=^(0|14)$" \
+    "$page.gz" \
     | sed "s/\([0-9]\+\)\t\([0-9]\+\)\t\(.*\)/\1\t\2\3/" \
-> "$wiki"page.lines
-
-"$dir"/maria2csv.py "$pagelinks" \
-    | csvformat -q "'" -b -p "\\" \
-    | csvgrep -c pl_from_namespace -r "^0$|^14$" \
-    | csvgrep -c pl_namespace -r "^0$|^14$" \
-    | csvcut -C pl_from_namespace \
-    | csvformat -D $'\t' \
-    | tail -n+2 \
+> "$wiki"page.lines &
+page_pid=$!
+
+"$dir"/maria2csv.py --no-header \
+    --columns pl_from,pl_namespace,pl_title \
+    --filter "pl_from_namespace=^(0|14)$" \
+    --filter "pl_namespace=^(0|14)$" \
+    "$pagelinks.gz" \
     | sed "s/\([0-9]\+\)\t\([0-9]\+\)\t\(.*\)/\1\t\2\3/" \
-> "$wiki"pagelinks.lines
-
-"$dir"/maria2csv.py "$redirect" \
-    | csvformat -q "'" -b -p "\\" \
-    | csvcut -c rd_from,rd_namespace,rd_title \
-    | csvgrep -c rd_namespace -r "^0$|^14$" \
-    | csvformat -D $'\t' \
-    | tail -n+2 \
-    | sed "s/\([0-9]\+\)\t\([0-9]\+\)\t\(.*\)/\1\t\2\3/" \
-> "$wiki"redirect.lines
-
-"$dir"/maria2csv.py "$pageprops" \
-    | csvformat -q "'" -b -p "\\" \
-    | csvcut -c pp_page,pp_propname,pp_value \
-    | csvgrep -c pp_propname -r "^wikibase_item$" \
-    | csvcut -c pp_value,pp_page \
-    | csvformat -D $'\t' \
-    | tail -n+2 \
-> "$wiki"pageprops.lines
+> "$wiki"pagelinks.lines &
+pagelinks_pid=$!
 
-# Delete sql files.
-rm "$page" "$pagelinks" "$redirect" "$pageprops"
+"$dir"/maria2csv.py --no-header \
+    --columns rd_from,rd_namespace,rd_title \
+    --filter "rd_namespace=^(0|14)$" \
+    "$redirect.gz" \
+    | sed "s/\([0-9]\+\)\t\([0-9]\+\)\t\(.*\)/\1\t\2\3/" \
+> "$wiki"redirect.lines &
+redirect_pid=$!
+
+"$dir"/maria2csv.py --no-header \
+    --columns pp_value,pp_page \
+    --filter "pp_propname=^wikibase_item$" \
+    "$pageprops.gz" \
+> "$wiki"pageprops.lines &
+pageprops_pid=$!
+
+# Wait for all tables; the status of a pipeline is the status of its last
+# command (sed), hence maria2csv.py failures are caught with pipefail.
+failed=0
+for pid in "$page_pid" "$pagelinks_pid" "$redirect_pid" "$pageprops_pid"; do
+    wait "$pid" || failed=1
+done
+
+# Delete dumps.
+rm "$page.gz" "$pagelinks.gz" "$redirect.gz" "$pageprops.gz"
+
+if [ "$failed" -ne 0 ]; then
+    (>&2 printf "[Error]\tCouldn't pre-process dumps of '%s'.\n" "$wiki")
+    exit 1
+fi
 
 # To avoid any locale-related issues, it
 # is recommended to use the ‘C’ locale [...].
 # http://www.gnu.org/software/coreutils/manual/html_node/Sorting-files-for-join.html#Sorting-files-for-join
 export LC_ALL=C
 
-# Prepare page table - needed to normalize pagelinks and redirects
-sort -k 2,2 \
-     -S 50% -T . \
-     -o "$wiki""page.lines" \
-     "$wiki""page.lines"
-
-# Prepare pagelinks
-sort -k 2,2 \
-     -S 50% -T . \
-     -o "$wiki""pagelinks.lines" \
-     "$wiki""pagelinks.lines"
-
-# Normalize pagelinks
-join -j 2 \
-     "$wiki""pagelinks.lines" \
-     "$wiki""page.lines" \
-     -o 1.1,2.1 -t $'\t' \
-> "$wiki""pagelinks_norm.lines"
-
-# Prepare redirects
-sort -k 2,2 \
-     -S 50% -T . \
-     -o "$wiki""redirect.lines" \
-     "$wiki""redirect.lines"
-
-# Normalize redirects
-join -j 2 \
-     "$wiki""redirect.lines" \
-     "$wiki""page.lines" \
-     -o 2.1,1.1 -t $'\t' \
-> "$wiki""redirect_norm.lines"
-
-
-# Take care of redirects. Note: 'double redirects' are fixed by bots
-# (https://en.wikipedia.org/wiki/Wikipedia:Double_redirects).
-sort -k 2,2 \
-     -S 50% -T . \
-     -o "$wiki""pagelinks_norm.lines" \
-     "$wiki""pagelinks_norm.lines"
-
-sort -k 2,2 \
-     -S 50% -T . \
-     -o "$wiki""redirect_norm.lines" \
-     "$wiki""redirect_norm.lines"
-
-join -j 2 \
-     "$wiki""pagelinks_norm.lines" \
-     "$wiki""redirect_norm.lines" \
-     -o 1.1,2.1 -t $'\t' \
-> "$wiki""pagelinks_redirected.lines"
-
-
-# We can write this back to our page links set (potentially duplicating links)
-# because in the following step redirect pages have no Q-id (redirect pages are filtered out).
-cat "$wiki""pagelinks_redirected.lines" >> "$wiki""pagelinks_norm.lines"
-
-
-# Resolve internal IDs to Wikidata Q-Is
-sort -k 2,2 \
-     -S 50% -T . \
-     -o "$wiki""pagelinks_norm.lines" \
-     "$wiki""pagelinks_norm.lines"
-sort -k 2,2 \
-     -S 50% -T . \
-     -o "$wiki""pageprops.lines" \
-     "$wiki""pageprops.lines"
-join -j 2 \
-     "$wiki""pagelinks_norm.lines" \
-     "$wiki""pageprops.lines" \
-     -o 2.1,1.1 -t $'\t' \
-> "$wiki""pagelinks.lines"
-
-sort -k 2,2 \
-     -S 50% -T . \
-     -o "$wiki""pagelinks.lines" \
-     "$wiki""pagelinks.lines"
-join -j 2 \
-     "$wiki""pagelinks.lines" \
-     "$wiki""pageprops.lines" \
-     -o 2.1,1.1 -t $'\t' \
-     | sed "s/\(Q\|q\)\(.*\)\t\(Q\|q\)\(.*\)/\2\t\4\t""$wiki""wiki$project-$dump_date/" \
-> "$wiki""wiki""$project"-"$dump_date"".links"
-
-# Sort final output, cleanup, and print filename
-sort -k 1,1n -k 2,2n -u \
-     -S 50% -T . \
-     -o "$wiki""wiki""$project"-"$dump_date"".links" \
-     "$wiki""wiki""$project"-"$dump_date"".links"
+# Resolve page titles, redirects and page ids to Wikidata Q-ids with in-memory
+# hash indexes (see resolve_links.py) and sort the final output.
+"$dir"/resolve_links.py --name "$wiki""wiki$project-$dump_date" \
+    "$wiki""page.lines" \
+    "$wiki""redirect.lines" \
+    "$wiki""pageprops.lines" \
+    "$wiki""pagelinks.lines" \
+    | sort -k 1,1n -k 2,2n -u \
+           -S 50% -T . \
+           -o "$wiki""wiki""$project"-"$dump_date"".links"
 
 # Delete temporary files
 rm "$wiki""page.lines" \
    "$wiki""pagelinks.lines" \
-   "$wiki""pagelinks_norm.lines" \
    "$wiki""redirect.lines" \
-   "$wiki""redirect_norm.lines" \
-   "$wiki""pagelinks_redirected.lines" \
    "$wiki""pageprops.lines"
 
 echo "$wiki""wiki""$project"-"$dump_date"".links"
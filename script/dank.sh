@@ -51,32 +51,9 @@ fi
 
 if [ "$1" == "ALL" ]; then
     filename=$(date +"%Y-%m-%d").allwiki"$project".links
-    if languages=$(./script/get_languages.sh "$project"); then
-        for i in $languages; do
-            ./script/create_links.sh "$i" "$project" >> "$filename.files.txt"
-        done
-
-	while IFS= read -r i
-	do
-            cat "$i" >> "$filename"
-	done < <(cat "$filename.files.txt")
-
-	sort -k 1,1n -T . -S 50% -o "$filename" "$filename"
-
-        # collect stats
-	while IFS= read -r i
-	do
-            wc -l "$i" >> "$filename.stats.txt"
-	done < <(cat "$filename.files.txt")
-        wc -l "$filename" >> "$filename.stats.txt"
-
-        # clean up
-	while IFS= read -r i
-	do
-            rm "$i"
-	done < <(cat "$filename.files.txt")
-    else
-	(>&2 printf "[Error]\tCouldn't retrieve languages...\n")
+    # concurrent extraction, k-way merge and stats (see all_links.py)
+    if ! ./script/all_links.py -p "$project" "$filename"; then
+	(>&2 printf "[Error]\tCouldn't extract links of all languages...\n")
         exit 1
     fi
 else
@@ -89,17 +66,14 @@ if [ $links ]; then
     exit 0
 fi
 
+# danker adds the Q prefix and sorts by descending score (-P Q -r)
 if [ $bigmem ]; then
-    python3 -m danker  "$filename" "$damping" "$iterations" "$start_value" \
-        | sed "s/\(.*\)/Q\1/" \
-    > "$filename".rank
+    python3 -m danker -u -P Q -r -O "$filename".rank \
+        "$filename" "$damping" "$iterations" "$start_value"
 else
-    sort -k 2,2n -T . -S 50% -o "$filename"".right" "$filename"
-    python3 -m danker  "$filename" "$filename"".right" "$damping" "$iterations" "$start_value" \
-        | sed "s/\(.*\)/Q\1/" \
-    > "$filename".rank
-    rm "$filename"".right"
+    # the right sorted view is created (and removed) by danker
+    python3 -m danker -u -P Q -r -O "$filename".rank \
+        "$filename" "$filename" "$damping" "$iterations" "$start_value"
 fi
-sort -k 2,2nr -T . -S 50% -o "$filename"".rank" "$filename"".rank"
 bzip2 "$filename"
 wc -l "$filename"".rank"
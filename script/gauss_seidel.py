@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+#    danker - PageRank on Wikipedia/Wikidata
+#    Copyright (C) 2020  Andreas Thalhammer
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark: iterations needed to reach a tolerance with the Jacobi solver
+(danker_csr) vs. the Gauss-Seidel solver (danker_gauss_seidel) in all
+node orders.
+"""
+import os
+import io
+import sys
+import time
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import danker  # pylint: disable=wrong-import-position
+
+ORDERS = ['natural', 'reverse', 'in-degree', 'out-degree']
+
+
+def _run(solver, graph, args, **kwargs):
+    """
+    Run one solver quietly and return (iterations, seconds).
+    """
+    stats = {}
+    start = time.time()
+    with contextlib.redirect_stderr(io.StringIO()):
+        solver(graph, args.iterations, args.damping, args.start, args.tolerance,
+               args.norm, stats, **kwargs)
+    return stats['iterations'], time.time() - start
+
+
+def main():
+    """
+    Print a table with iterations-to-tolerance per link file and solver.
+    """
+    parser = argparse.ArgumentParser(description='Compare iterations-to-tolerance ' +
+                                     'of the Jacobi and Gauss-Seidel solvers.',
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('link_files', nargs='*', default=['./test/graphs/test.links'],
+                        help='Link files sorted by the left column or binary graph files.')
+    parser.add_argument('-t', '--tolerance', type=float, default=1e-9,
+                        help='Convergence threshold.')
+    parser.add_argument('-n', '--norm', type=str, default='l1', choices=['l1', 'linf'],
+                        help='Norm of the change between two iterations.')
+    parser.add_argument('-d', '--damping', type=float, default=0.85,
+                        help='PageRank damping factor.')
+    parser.add_argument('-s', '--start', type=float, default=0.1,
+                        help='PageRank starting value.')
+    parser.add_argument('-i', '--iterations', type=int, default=1000,
+                        help='Maximum number of iterations.')
+    parser.add_argument('-b', '--block-size', type=int,
+                        help='Block size of the Gauss-Seidel solver (default: automatic).')
+    args = parser.parse_args()
+
+    print('file\tsolver\torder\titerations\tseconds')
+    for link_file in args.link_files:
+        if danker.is_graph_file(link_file):
+            graph = danker.load_graph(link_file)
+        else:
+            graph = danker.to_csr(danker.init(link_file, args.start, False))
+        name = os.path.basename(link_file)
+        iterations, seconds = _run(danker.danker_csr, graph, args)
+        print('{0}\tjacobi\t-\t{1}\t{2:.2f}'.format(name, iterations, seconds))
+        for order in ORDERS:
+            iterations, seconds = _run(danker.danker_gauss_seidel, graph, args, order=order,
+                                       block_size=args.block_size)
+            print('{0}\tgauss-seidel\t{1}\t{2}\t{3:.2f}'.format(name, order, iterations,
+                                                                seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -15,12 +15,22 @@
 #
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Stream the rows of a MariaDB dump as tab-separated values, optionally only
+some columns (--columns) of the rows that match regular expressions
+(--filter). Dumps compressed with gzip (.sql.gz) are decompressed while they
+are read. The INSERT statements are read in blocks of fixed size and
+tokenized once, one tuple at a time; quoted values are unescaped and
+written in the usual TSV convention: tab, newline, carriage return and
+backslash as \\t, \\n, \\r and \\\\, NULL as \\N. The output is bytes, i.e.,
+it is not decoded.
+"""
 
 import re
+import gzip
 import argparse
 import sys
 import signal
-from collections import OrderedDict
 
 # Fix broken pipe error.
 # More details: https://bugs.python.org/issue1652
@@ -28,66 +38,250 @@ signal.signal(signal.SIGPIPE, signal.SIG_DFL)
 
 # \w matches most unicode characters including _. $ is needed in addition.
 # https://mariadb.com/kb/en/library/identifier-names/
-COLUMN_DEF_REGEX = r'^\s*`([\w$]+)` (\w+)(\(\d+\))?'
+COLUMN_DEF_REGEX = re.compile(rb'^\s*`([\w$]+)` (\w+)(\(\d+\))?')
 
-PLAIN_MARIADB_DATATYPE = "([^,^a-z^A-Z^']*)"
-QUOTED_MARIADB_DATATYPE = r"('([^']|\\\')*')"
-SQL_NULL = 'NULL'
+# number of bytes of the dump read at once
+BLOCK_SIZE = 1 << 20
+# bytes that change the state of the tokenizer in an INSERT statement outside
+# of tuples, in a tuple outside of quotes (besides the commas) and in a quoted
+# value
+STATEMENT_BYTES = re.compile(rb"[(;]")
+TUPLE_BYTES = re.compile(rb"['()]")
+QUOTED_BYTES = re.compile(rb"['\\]")
+SQL_NULL = b'NULL'
+TSV_NULL = b'\\N'
+GZIP_MAGIC = b'\x1f\x8b'
 
 # TODO extend
 QUOTED_DATATYPES = ['varchar', 'varbinary', 'tinyblob', 'blob', 'char', 'binary', 'text']
 
+# SQL escape sequences and raw control characters to TSV
+ESCAPE_REGEX = re.compile(rb"\\(.)|[\t\n\r]", re.DOTALL)
+ESCAPES = {b"'": b"'", b'"': b'"', b'\\': b'\\\\', b'n': b'\\n', b't': b'\\t',
+           b'r': b'\\r', b'0': b'\\0', b'b': b'\x08', b'Z': b'\x1a'}
+RAW = {b'\t': b'\\t', b'\n': b'\\n', b'\r': b'\\r'}
+
+
+def _escape(match):
+    """
+    Replace one SQL escape sequence (or a raw control character).
+    """
+    if match.group(1) is None:
+        return RAW[match.group()]
+    return ESCAPES.get(match.group(1), match.group(1))
+
+
+def value(raw):
+    """
+    Convert one SQL value of a tuple to its TSV representation.
+    """
+    if raw.startswith(b"'"):
+        raw = raw[1:-1]
+        if b'\\' in raw or b'\t' in raw or b'\n' in raw or b'\r' in raw:
+            return ESCAPE_REGEX.sub(_escape, raw)
+        return raw
+    if raw == SQL_NULL:
+        return TSV_NULL
+    return raw
+
+
+def open_dump(dump_file):
+    """
+    Open a dump file (or file descriptor) for reading bytes; gzip compressed
+    dumps (recognized by their magic number) are decompressed on the fly.
+    """
+    in_file = open(dump_file, mode='rb')
+    if in_file.peek(2)[:2] == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=in_file, mode='rb')
+    return in_file
+
+
+def read_columns(in_file):
+    """
+    Read the column names of the table definition.
+
+    :returns: Tuple (list of column names, list with the converter of every
+              column - None for numbers that are never NULL -).
+    """
+    columns, converters = [], []
+    line = in_file.readline()
+    # the table definition ends with a line ") ENGINE=..."; the INSERT
+    # statements are left to :func:`tuples`
+    while not (line.startswith(b')') and columns) and line != b'':
+        # Assumption: each column definition has its own line (typical for dumps)
+        match = COLUMN_DEF_REGEX.search(line)
+        if match:
+            columns.append(match.group(1).decode('utf-8'))
+            plain = match.group(2).decode('utf-8').lower() not in QUOTED_DATATYPES and \
+                b'NOT NULL' in line
+            converters.append(None if plain else value)
+        line = in_file.readline()
+    return columns, converters
+
+
+def tuples(in_file, block_size=BLOCK_SIZE):
+    """
+    Generate the tuples of the INSERT statements that follow the table
+    definition, one tuple at a time.
+
+    The dump is read in blocks of ``block_size`` bytes by a state machine
+    that tracks the kind of the current line, the quotes, backslash escapes
+    and parentheses; it jumps from one byte that changes the state to the
+    next, so a whole INSERT line is never held or matched. The first line
+    that is not an INSERT statement after the INSERT statements ends the
+    table.
+
+    :param in_file: Binary dump file positioned after the table definition.
+    :returns: Generator of lists of raw SQL values (bytes; quoted values with
+              their quotes and escapes, see :func:`value`).
+    """
+    line_start, skip, statement, in_tuple = range(4)
+    state, head, inserts = line_start, b'', False
+    quoted, escaped, depth = False, False, 0
+    values, pieces = [], []
+    search_quoted, search_tuple = QUOTED_BYTES.search, TUPLE_BYTES.search
+    block = in_file.read(block_size)
+    while block:
+        # an escaped byte at the start of the block belongs to the value
+        pos, end, start, escaped = int(escaped), len(block), 0, False
+        while pos < end:
+            if state == in_tuple:
+                if quoted:
+                    match = search_quoted(block, pos)
+                    if match is None:
+                        break
+                    pos = match.end()
+                    if match.group() == b'\\':
+                        # skip the escaped byte (possibly the first of the next block)
+                        pos += 1
+                        escaped = pos > end
+                        continue
+                    quoted = False
+                    pieces.append(block[start:pos])
+                match = search_tuple(block, pos)
+                stop = end if match is None else match.start()
+                if depth == 1:
+                    # values without quotes end with a comma
+                    parts = block[pos:stop].split(b',')
+                    pieces.append(parts[0])
+                    if len(parts) > 1:
+                        values.append(b''.join(pieces))
+                        values.extend(parts[1:-1])
+                        pieces = [parts[-1]]
+                else:
+                    pieces.append(block[pos:stop])
+                if match is None:
+                    break
+                char, pos = match.group(), stop + 1
+                if char == b"'":
+                    quoted, start = True, stop
+                elif char == b'(' or depth > 1:
+                    pieces.append(char)
+                    depth += 1 if char == b'(' else -1
+                else:
+                    values.append(b''.join(pieces))
+                    yield values
+                    values, pieces = [], []
+                    if block[pos:pos + 2] == b',(':
+                        pos += 2
+                    else:
+                        state = statement
+            elif state == statement:
+                match = STATEMENT_BYTES.search(block, pos)
+                if match is None:
+                    break
+                elif match.group() == b'(':
+                    state, depth, pos = in_tuple, 1, match.end()
+                else:
+                    # the rest of the line after the end of the statement
+                    state, pos = skip, match.end()
+            elif state == skip:
+                newline = block.find(b'\n', pos)
+                if newline < 0:
+                    break
+                state, pos = line_start, newline + 1
+            else:
+                # the first bytes of a line tell whether it is an INSERT statement
+                chunk = block[pos:pos + 6 - len(head)]
+                newline = chunk.find(b'\n')
+                if newline >= 0:
+                    chunk = chunk[:newline + 1]
+                head, pos = head + chunk, pos + len(chunk)
+                if newline < 0 and len(head) < 6:
+                    continue
+                if head == b'INSERT':
+                    state, inserts = statement, True
+                elif inserts:
+                    return
+                else:
+                    state = line_start if newline >= 0 else skip
+                head = b''
+        if state == in_tuple and quoted:
+            pieces.append(block[start:])
+        block = in_file.read(block_size)
+
+
+def rows(in_file, size, columns, filters):
+    """
+    Generate the selected rows of the INSERT statements, one at a time.
+
+    :param in_file: Binary dump file positioned after the table definition.
+    :param size: Number of columns of the table.
+    :param columns: List of (position, converter) of the output columns (see
+                    :func:`read_columns`).
+    :param filters: List of (position, compiled bytes regex, converter); the
+                    regular expressions have to match (search) the values.
+    :returns: Generator of TSV lines (bytes without newline).
+    """
+    for values in tuples(in_file):
+        if len(values) != size:
+            continue
+        for k, regex, convert in filters:
+            if not regex.search(convert(values[k]) if convert else values[k]):
+                break
+        else:
+            yield b'\t'.join([convert(values[k]) if convert else values[k]
+                              for k, convert in columns])
+
+
 def main():
-    parser = argparse.ArgumentParser(description="Parse MariaDB dumps.")
+    parser = argparse.ArgumentParser(description="Parse MariaDB dumps into tab-separated " +
+                                     "values.")
     parser.add_argument('dump_file', nargs='?', type=str, default=sys.stdin.fileno(),
-                        help='Path of MariaDB dump file.')
+                        help='Path of MariaDB dump file (optionally gzip ' +
+                        'compressed).')
+    parser.add_argument('-c', '--columns', type=str, help='Comma-separated names of ' +
+                        'the output columns, in this order (default: all columns).')
+    parser.add_argument('-f', '--filter', type=str, action='append', default=[],
+                        metavar='COLUMN=REGEX', help='Only rows whose value of COLUMN ' +
+                        'matches the regular expression (may be repeated; the column ' +
+                        'does not need to be an output column).')
+    parser.add_argument('-H', '--no-header', action='store_true',
+                        help='Do not write the column names as first line.')
     args = parser.parse_args()
     if args.dump_file == sys.stdin.fileno() and sys.stdin.isatty():
         print("[Error] maria2csv has no interactive mode. Type --help for options.",
               file=sys.stderr)
         sys.exit(1)
 
-    # Note: Lines with non-unicode characters will be ignored
-    with open(args.dump_file, mode='r', encoding='utf-8', errors='surrogateescape') as in_file:
-        data_dict = OrderedDict()
-        line = in_file.readline()
-
-        while not line.startswith('INSERT') and line != '':
+    with open_dump(args.dump_file) as in_file:
+        names, converters = read_columns(in_file)
+        selected = args.columns.split(',') if args.columns else names
+        conditions = [k.split('=', 1) for k in args.filter]
+        unknown = [k for k in selected + [k[0] for k in conditions] if k not in names]
+        if unknown or any(len(k) != 2 for k in conditions):
+            print("[Error] Unknown columns {0} or filters without '=' (columns: {1}).".format(
+                ', '.join(unknown), ', '.join(names)), file=sys.stderr)
+            sys.exit(1)
+        columns = [(names.index(k), converters[names.index(k)]) for k in selected]
+        filters = [(names.index(k), re.compile(regex.encode('utf-8')),
+                    converters[names.index(k)]) for k, regex in conditions]
 
-            # Check for column definition lines
-            # Assumption: each column definition has its own line (typical for dumps)
-            match = re.search(COLUMN_DEF_REGEX, line)
-            if match:
-                name = match.group(1)
-                datatype = match.group(2)
-                if datatype.lower() in QUOTED_DATATYPES:
-                    expr = QUOTED_MARIADB_DATATYPE[:-1]
-                else:
-                    expr = PLAIN_MARIADB_DATATYPE[:-1]
-                if 'NOT NULL' not in line:
-                    expr += '|' + SQL_NULL
-                expr += ')'
-                data_dict[name] = expr
-            line = in_file.readline()
-
-        # build regex with a bit of lookahead
-        regex = r'\(' + ','.join([data_dict[i] for i in data_dict]) + r'\)(?=((,\()|;))'
-
-        # header of CSV
-        print(",".join(data_dict))
-
-        # Parse rest of file
-        pattern = re.compile(regex)
-        while line.startswith('INSERT'):
-            for match in pattern.finditer(line):
-
-                # Handle errors when surrogate escapes can not be printed
-                try:
-                    print(match.group()[1:-1])
-                except UnicodeEncodeError:
-                    # ignore lines with non-unicode characters
-                    pass
-            line = in_file.readline()
+        out = sys.stdout.buffer
+        if not args.no_header:
+            out.write('\t'.join(selected).encode('utf-8') + b'\n')
+        for row in rows(in_file, len(names), columns, filters):
+            out.write(row + b'\n')
 
 if __name__ == '__main__':
     try:
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+#    danker - PageRank on Wikipedia/Wikidata
+#    Copyright (C) 2017  Andreas Thalhammer
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Resolve the page links of a Wikipedia language edition to links between
+Wikidata items. The inputs are the tab-separated outputs of maria2csv.py
+(see create_links.sh):
+
+- page: page id, namespace and title (concatenated),
+- redirect: page id of the redirect, namespace and title of its target,
+- page_props: Q-id, page id,
+- pagelinks: page id of the source, namespace and title of the target.
+
+The first three tables are loaded into hash indexes (page id -> Q-id and
+title -> Q-id; links to a redirect page count as links to its target),
+then the page links are streamed once. Links are written as
+``source Q-id, target Q-id[, name]`` without the Q prefix, unsorted but
+without duplicates if the page links are grouped by source (as in the
+dumps).
+"""
+
+import sys
+import signal
+import argparse
+
+# Fix broken pipe error.
+# More details: https://bugs.python.org/issue1652
+signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+
+BATCH = 1 << 16
+
+
+def columns(file_name):
+    """
+    Generate the first two tab-separated columns of every line of a file.
+    """
+    with open(file_name, mode='rb') as in_file:
+        for line in in_file:
+            first, _, second = line.rstrip(b'\n').partition(b'\t')
+            yield first, second
+
+
+def item(value):
+    """
+    Strip the prefix of a Q-id.
+    """
+    return value[1:] if value[:1] in (b'Q', b'q') else value
+
+
+def load(page, redirect, pageprops):
+    """
+    Load the hash indexes.
+
+    :param page: Name of the page file.
+    :param redirect: Name of the redirect file.
+    :param pageprops: Name of the page_props file.
+    :returns: Tuple (dictionary page id -> Q-id, dictionary title -> Q-id or
+              tuple of Q-ids of a redirect page that has a Q-id itself).
+    """
+    ids = {page_id: item(value) for value, page_id in columns(pageprops)}
+    targets = dict(columns(redirect))
+    titles, redirects = {}, []
+    for page_id, title in columns(page):
+        if page_id in ids:
+            titles[title] = ids[page_id]
+        if page_id in targets:
+            redirects.append((title, targets.pop(page_id)))
+    del targets
+
+    # Redirects are resolved once (double redirects are fixed by bots), hence
+    # the targets are looked up before any redirect is added.
+    resolved = [(title, titles.get(target)) for title, target in redirects]
+    del redirects
+    for title, value in resolved:
+        if value is not None:
+            own = titles.get(title)
+            titles[title] = value if own is None or own == value else (own, value)
+    return ids, titles
+
+
+def resolve(pagelinks, ids, titles, suffix, out):
+    """
+    Stream the page links and write the resolved links.
+
+    :param pagelinks: Name of the pagelinks file.
+    :param ids: Dictionary page id -> Q-id (see :func:`load`).
+    :param titles: Dictionary title -> Q-id(s) (see :func:`load`).
+    :param suffix: Bytes appended to every link (e.g., tab and name).
+    :param out: Binary output file.
+    :returns: The number of written links.
+    """
+    batch, written = [], 0
+    previous, source, seen = None, None, set()
+    for page_id, title in columns(pagelinks):
+        if page_id != previous:
+            previous, source, seen = page_id, ids.get(page_id), set()
+        if source is None:
+            continue
+        target = titles.get(title)
+        if target is None:
+            continue
+        for value in (target if isinstance(target, tuple) else (target,)):
+            if value not in seen:
+                seen.add(value)
+                batch.append(source + b'\t' + value + suffix)
+        if len(batch) >= BATCH:
+            out.write(b''.join(batch))
+            written += len(batch)
+            batch = []
+    out.write(b''.join(batch))
+    return written + len(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve page links to links between " +
+                                     "Wikidata items.")
+    parser.add_argument('page', type=str, help='Page file (id, namespace and title).')
+    parser.add_argument('redirect', type=str, help='Redirect file (id, namespace and ' +
+                        'title of the target).')
+    parser.add_argument('pageprops', type=str, help='Page props file (Q-id, page id).')
+    parser.add_argument('pagelinks', type=str, help='Page links file (source id, ' +
+                        'namespace and title of the target).')
+    parser.add_argument('-n', '--name', type=str,
+                        help='Value of a third column of every link (e.g., the dump).')
+    args = parser.parse_args()
+
+    ids, titles = load(args.page, args.redirect, args.pageprops)
+    suffix = ('\t' + args.name if args.name else '').encode('utf-8') + b'\n'
+    resolve(args.pagelinks, ids, titles, suffix, sys.stdout.buffer)
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -24,5 +24,6 @@ setup(
         'Topic :: Scientific/Engineering :: Information Analysis',
     ],
     python_requires='>=3.5',
-    install_requires=[]
+    install_requires=[],
+    extras_require={'numpy': ['numpy>=1.16.3']}
 )
@@ -5,11 +5,20 @@ danker test cases
 """
 import unittest
 import pathlib
+import tempfile
 import os
 import sys
+import json
+import threading
+import socket
+import multiprocessing
+import urllib.request
 import networkx as nx
 import numpy as np
 import danker
+import danker.bench
+import danker.distributed
+import danker.server
 
 class DankerTest(unittest.TestCase):
     """
@@ -39,6 +48,802 @@ class DankerTest(unittest.TestCase):
         sys.argv = [sys.argv[0], './test/graphs/test.links', '0.85', '10', '1']
         danker.danker._main()
 
+    def test_main_csr(self):
+        """
+        Test main method with the CSR engine
+        """
+        sys.argv = [sys.argv[0], './test/graphs/test.links', '0.85', '10', '1', '-e', 'csr']
+        danker.danker._main()
+
+    def test_csr(self):
+        """
+        Test that the CSR engine yields exactly the same results as the dictionary engine.
+        """
+        link_file = "./test/graphs/test.links"
+        for iterations in [0, 1, 10, 51]:
+            danker_pr_big = danker.danker_bigmem(danker.init(link_file, 0.1, False),
+                                                 iterations, 0.85)
+            danker_pr_csr = danker.danker_bigmem_csr(danker.init(link_file, 0.1, False),
+                                                     iterations, 0.85)
+            self.assertEqual(danker_pr_big, danker_pr_csr)
+        graph = danker.to_csr(danker.init(link_file, 0.1, False))
+        self.assertEqual(len(graph.nodes), 11)
+        self.assertEqual(graph.indptr[-1], 17)
+        self.assertEqual(graph.out_degree.sum(), 17)
+
+    def test_compile(self):
+        """
+        Test that a compiled and memory-mapped graph yields the same results as the
+        dictionary engine.
+        """
+        link_file = "./test/graphs/test.links"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            graph_file = os.path.join(tmp_dir, "test.graph")
+            sys.argv = [sys.argv[0], 'compile', link_file, graph_file]
+            danker.danker._main()
+            self.assertTrue(danker.is_graph_file(graph_file))
+            self.assertFalse(danker.is_graph_file(link_file))
+            graph = danker.load_graph(graph_file)
+            ranks = danker.danker_csr(graph, 40, 0.85, 0.1)
+            danker_pr_big = danker.danker_bigmem(danker.init(link_file, 0.1, False), 40, 0.85)
+            self.assertEqual(list(graph.nodes), list(danker_pr_big))
+            self.assertEqual(ranks[0].tolist(), [danker_pr_big[i][1] for i in graph.nodes])
+            sys.argv = [sys.argv[0], graph_file, '0.85', '10', '1']
+            danker.danker._main()
+        with self.assertRaises(danker.InvalidGraphFileException):
+            danker.load_graph(link_file)
+
+    def test_workers(self):
+        """
+        Test that the parallel CSR engine yields exactly the same results as the serial one.
+        """
+        link_file = "./test/graphs/test.links"
+        graph = danker.to_csr(danker.init(link_file, 0.1, False))
+        serial = danker.danker_csr(graph, 30, 0.85, 0.1)
+        for workers in [2, 3, 20]:
+            stats = {}
+            parallel = danker.danker_csr(graph, 30, 0.85, 0.1, stats=stats, workers=workers)
+            self.assertEqual(serial.tolist(), parallel.tolist())
+            self.assertEqual(stats['iterations'], 30)
+        sys.argv = [sys.argv[0], link_file, '0.85', '10', '1', '-e', 'csr', '-w', '2']
+        danker.danker._main()
+
+    def test_gauss_seidel(self):
+        """
+        Test that the Gauss-Seidel solver converges to the same ranks in fewer iterations.
+        """
+        link_file = "./test/graphs/test.links"
+        graph = danker.to_csr(danker.init(link_file, 0.1, False))
+        stats_jacobi = {}
+        jacobi = danker.danker_csr(graph, 500, 0.85, 0.1, 1e-10, stats=stats_jacobi)
+        jacobi = jacobi[stats_jacobi['location']]
+        for order in ['natural', 'reverse', 'in-degree', 'out-degree', list(range(10, -1, -1))]:
+            for block_size in [None, 1, 4, 100]:
+                stats = {}
+                ranks = danker.danker_gauss_seidel(graph, 500, 0.85, 0.1, 1e-10, 'l1', stats,
+                                                   order, block_size)
+                self.assertEqual(ranks.shape, (1, 11))
+                self.assertLess(stats['iterations'], stats_jacobi['iterations'])
+                for i, j in zip(ranks[0], jacobi):
+                    self.assertAlmostEqual(i, j, places=8)
+        with self.assertRaises(ValueError):
+            danker.danker_gauss_seidel(graph, 5, 0.85, 0.1, order='random')
+        sys.argv = [sys.argv[0], link_file, '0.85', '10', '1', '-e', 'csr', '-s',
+                    'gauss-seidel', '-o', 'in-degree']
+        danker.danker._main()
+
+    def test_compressed(self):
+        """
+        Test the delta and varint compressed in-links against the CSR engine.
+        """
+        link_file = "./test/graphs/test.links"
+        graph = danker.to_csr(danker.init(link_file, 0.1, False))
+        compressed = danker.compress_graph(graph)
+        self.assertEqual(compressed.offsets[-1], len(compressed.data))
+        values = np.array([0, 1, 127, 128, 16383, 16384, 2**31, 2**62], dtype=np.int64)
+        encoded, lengths = danker.danker._encode_varints(values)
+        self.assertEqual(lengths.tolist(), [1, 1, 1, 2, 2, 3, 5, 9])
+        self.assertEqual(danker.danker._decode_varints(encoded).tolist(), values.tolist())
+        rows = compressed.indptr - compressed.indptr[0]
+        self.assertEqual(danker.danker._decode_rows(compressed, 0, 11, rows).tolist(),
+                         [k for i in range(11) for k in sorted(
+                             graph.indices[graph.indptr[i]:graph.indptr[i + 1]].tolist())])
+        csr = danker.danker_csr(graph, 40, 0.85, 0.1)
+        ranks = danker.danker_compressed(compressed, 40, 0.85, 0.1)
+        for i, j in zip(ranks[0], csr[0]):
+            self.assertAlmostEqual(i, j, places=12)
+        sys.argv = [sys.argv[0], link_file, '0.85', '10', '1', '-e', 'compressed']
+        danker.danker._main()
+
+    def test_distributed(self):
+        """
+        Test that local workers compute the same ranks as the CSR engine.
+        """
+        graph = danker.init_csr("./test/graphs/test.links")
+        csr = danker.danker_csr(graph, 40, 0.85, 0.1)
+        for workers in [1, 3, 12]:
+            stats = {}
+            with danker.distributed.local_workers(workers) as connections:
+                ranks = danker.distributed.danker_distributed(graph, connections, 40, 0.85,
+                                                              0.1, stats=stats)
+            self.assertEqual(ranks[stats['location']].tolist(), csr[0].tolist())
+        # the coordinator only reads binary graph files
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            graph_file, output = os.path.join(tmp_dir, "graph"), os.path.join(tmp_dir, "rank")
+            danker.compile_graph("./test/graphs/test.links", graph_file)
+            danker.distributed.main([graph_file, '0.85', '40', '0.1', '-w', '2', '-O', output])
+            with open(output) as in_file:
+                self.assertEqual(len(in_file.readlines()), 11)
+            with self.assertRaises(SystemExit):
+                danker.distributed.main(["./test/graphs/test.links", '0.85', '40', '0.1'])
+        # a worker that ends before it connects does not block the coordinator
+        with tempfile.TemporaryDirectory() as tmp_dir, socket.socket(socket.AF_UNIX) as server:
+            server.bind(os.path.join(tmp_dir, "socket"))
+            server.listen(1)
+            process = multiprocessing.Process(target=os._exit, args=(3,))
+            process.start()
+            with self.assertRaises(RuntimeError):
+                danker.distributed._accept(server, b"key", [process])
+            process.join()
+        self.assertEqual(danker.distributed.parse_address("host:6000"), ("host", 6000))
+        self.assertEqual(danker.distributed.parse_address("/tmp/socket"), "/tmp/socket")
+
+    def test_multi_source(self):
+        """
+        Test that multi-source ranks are the same as separate runs per source.
+        """
+        with open("./test/graphs/test.links") as in_file:
+            links = [[ord(i.strip()) for i in line.split("\t")] for line in in_file]
+        wikis = ["enwiki-20200501", "dewiki-20200501", "enwiki-20200601"]
+        lines = [(i, j, wikis[k % 3]) for k, (i, j) in enumerate(links)]
+        lines += [(i, j, wikis[1]) for i, j in links[::4]] + [(links[0][1], links[0][0], "")]
+        groups = {wikis[0]: "enwiki", wikis[2]: "enwiki"}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            link_file = os.path.join(tmp_dir, "multi.links")
+            with open(link_file, "w") as out_file:
+                out_file.writelines("{0}\t{1}\t{2}\r\n".format(*i) for i in lines[::-1])
+            for group in [None, groups]:
+                graph, sources, names = danker.init_multi_source(link_file, group)
+                stats = {}
+                ranks = danker.danker_csr(graph, 20, 0.85, 0.1, stats=stats)[stats["location"]]
+                self.assertEqual(names[0], "")
+                self.assertEqual(sorted(names[1:]), sorted(set(
+                    (group or {}).get(k, k) for k in wikis)))
+                for code, name in enumerate(names):
+                    single = os.path.join(tmp_dir, "single.links")
+                    with open(single, "w") as out_file:
+                        out_file.writelines(
+                            "{0}\t{1}\n".format(i, j) for i, j, k in lines[::-1]
+                            if not code or (group or {}).get(k, k) == name)
+                    reference = danker.init_csr(single, True)
+                    expected = danker.danker_csr(reference, 20, 0.85, 0.1)[0]
+                    rows = sources == code
+                    self.assertEqual(graph.nodes[rows].tolist(), reference.nodes.tolist())
+                    self.assertEqual(ranks[rows].tolist(), expected.tolist())
+            groups_file = os.path.join(tmp_dir, "groups.tsv")
+            with open(groups_file, "w") as out_file:
+                out_file.writelines("{0}\t{1}\n".format(*i) for i in groups.items())
+            self.assertEqual(danker.load_source_groups(groups_file), groups)
+            output = os.path.join(tmp_dir, "multi.rank")
+            sys.argv = [sys.argv[0], link_file, '0.85', '20', '0.1', '-M', '-P', 'Q', '-k', '2',
+                        '--source-groups', groups_file, '-O', output]
+            danker.danker._main()
+            with open(output) as in_file:
+                result = [line.rstrip("\n").split("\t") for line in in_file]
+            self.assertEqual([k[2:] for k in result], [[], [], ["dewiki-20200501"],
+                                                       ["dewiki-20200501"], ["enwiki"],
+                                                       ["enwiki"]])
+            self.assertEqual(result[0][1], "{0:.17g}".format(max(
+                danker.danker_csr(danker.init_csr(link_file, True), 20, 0.85, 0.1)[0])))
+            with self.assertRaises(ValueError):
+                danker.init_multi_source("./test/graphs/test.links")
+
+    def test_update(self):
+        """
+        Test that a delta on a compiled graph plus the previous ranks as starting vector
+        converge to the ranks of the full graph in fewer iterations.
+        """
+        with open("./test/graphs/test.links") as link_file:
+            links = [line for line in link_file if line.strip()]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            old_links = os.path.join(tmp_dir, "old.links")
+            new_links = os.path.join(tmp_dir, "new.links")
+            graph_file = os.path.join(tmp_dir, "old.graph")
+            rank_file = os.path.join(tmp_dir, "old.rank")
+            delta_file = os.path.join(tmp_dir, "delta")
+            with open(old_links, "w") as out_file:
+                out_file.writelines(sorted(links[1:] + ["K\tZ\n"]))
+            with open(new_links, "w") as out_file:
+                out_file.writelines(sorted(links + ["K\tZ\n", "Z\tY\n"]))
+            with open(delta_file, "w") as out_file:
+                out_file.write("+\t" + links[0] + "+\tZ\tY\n-\tA\tB\n-\tX\tY\n")
+            danker.compile_graph(old_links, graph_file)
+            graph = danker.load_graph(graph_file)
+            stats = {}
+            ranks = danker.danker_csr(graph, 500, 0.85, 0.1, 1e-10, stats=stats)[stats['location']]
+            with open(rank_file, "w") as out_file:
+                for i, rank in zip(graph.nodes, ranks.tolist()):
+                    out_file.write("Q{0}\t{1:.17g}\n".format(i, rank))
+            updated, added, removed = danker.apply_delta(graph, delta_file)
+            self.assertEqual((added, removed), (2, 0))
+            self.assertEqual(list(updated.nodes)[:len(graph.nodes)], list(graph.nodes))
+            self.assertEqual(list(updated.nodes)[len(graph.nodes):], ["Y"])
+
+            expected = danker.to_csr(danker.init(new_links, 0.1, False))
+            stats_full, stats_update = {}, {}
+            full = danker.danker_csr(expected, 500, 0.85, 0.1, 1e-10, stats=stats_full)
+            start = danker.load_ranks(rank_file, updated.nodes, 0.1, "Q")
+            self.assertEqual(start[0], ranks[0])
+            self.assertEqual(start[-1], 0.1)
+            ranks = danker.danker_csr(updated, 500, 0.85, start, 1e-10, stats=stats_update)
+            self.assertLess(stats_update['iterations'], stats_full['iterations'])
+            full = dict(zip(expected.nodes, full[stats_full['location']].tolist()))
+            for i, rank in zip(updated.nodes, ranks[stats_update['location']].tolist()):
+                self.assertAlmostEqual(rank, full[i], places=8)
+
+            sys.argv = [sys.argv[0], "update", graph_file, delta_file, graph_file]
+            danker.danker._main()
+            self.assertEqual(list(danker.load_graph(graph_file).nodes), list(updated.nodes))
+            sys.argv = [sys.argv[0], graph_file, '0.85', '100', '0.1', '-t', '1e-10',
+                        '-p', rank_file, '-P', 'Q']
+            danker.danker._main()
+            sys.argv = [sys.argv[0], new_links, '0.85', '100', '0.1', '-t', '1e-10',
+                        '-p', rank_file, '-P', 'Q']
+            danker.danker._main()
+
+    def test_personalized(self):
+        """
+        Test that several personalized rankings in one pass equal separate runs.
+        """
+        link_file = "./test/graphs/test.links"
+        graph = danker.to_csr(danker.init(link_file, 0.1, False))
+        uniform = danker.teleport_matrix(graph.nodes, [graph.nodes])
+        ranks = danker.danker_personalized(graph, uniform, 50, 0.85, 0.1)
+        reference = danker.danker_csr(graph, 50, 0.85, 0.1)
+        for i, j in zip(ranks[0][:, 0], reference[0]):
+            self.assertAlmostEqual(i, j, places=12)
+
+        seed_sets = [["A"], ["B", "E", "B"], graph.nodes, ["X", "K"]]
+        teleport = danker.teleport_matrix(graph.nodes, seed_sets)
+        self.assertEqual(teleport.shape, (11, 4))
+        self.assertEqual((teleport > 0).sum(axis=0).tolist(), [1, 2, 11, 1])
+        for i in teleport.sum(axis=0):
+            self.assertAlmostEqual(i, 1)
+        stats = {}
+        ranks = danker.danker_personalized(graph, teleport, 300, 0.85, 0.1, 1e-10, 'l1', stats)
+        self.assertLess(stats['iterations'], 300)
+        for k in range(4):
+            single = danker.danker_personalized(graph, teleport[:, k:k + 1],
+                                                stats['iterations'], 0.85, 0.1)
+            self.assertEqual(ranks[stats['location']][:, k].tolist(),
+                             single[stats['location']][:, 0].tolist())
+        with self.assertRaises(ValueError):
+            danker.teleport_matrix(graph.nodes, [["X"]])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            seed_file = os.path.join(tmp_dir, "seeds")
+            with open(seed_file, "w") as out_file:
+                out_file.write("QB\t1\nQE\n")
+            sys.argv = [sys.argv[0], link_file, '0.85', '10', '0.1', '-S', seed_file,
+                        seed_file, '-P', 'Q']
+            danker.danker._main()
+
+    def test_tolerance(self):
+        """
+        Test early termination once the change between two iterations is below the tolerance.
+        """
+        link_file = "./test/graphs/test.links"
+        link_file_right = "./test/graphs/test.links.right"
+        reference = danker.danker_bigmem(danker.init(link_file, 0.1, False), 300, 0.85)
+        for norm in ['l1', 'linf']:
+            stats_big, stats_csr, stats_small = {}, {}, {}
+            danker_pr_big = danker.danker_bigmem(danker.init(link_file, 0.1, False), 300, 0.85,
+                                                 1e-8, norm, stats_big)
+            danker_pr_csr = danker.danker_bigmem_csr(danker.init(link_file, 0.1, False), 300,
+                                                     0.85, 1e-8, norm, stats_csr)
+            danker_pr_small = danker.danker_smallmem(danker.init(link_file, 0.1, True),
+                                                     link_file_right, 300, 0.85, 0.1, 1e-8,
+                                                     norm, stats_small)
+            self.assertEqual(stats_big, stats_csr)
+            self.assertLess(stats_big['iterations'], 300)
+            self.assertLess(stats_big['residual'], 1e-8)
+            self.assertEqual(stats_big['location'], (stats_big['iterations'] % 2) + 1)
+            self.assertLess(stats_small['iterations'], 300)
+            for i in reference:
+                self.assertAlmostEqual(danker_pr_big[i][stats_big['location']],
+                                       reference[i][1], places=7)
+                self.assertAlmostEqual(danker_pr_small[i][stats_small['location']],
+                                       reference[i][1], places=7)
+
+    def test_adaptive(self):
+        """
+        Test that the adaptive solver stays within the tolerance of the exact ranks.
+        """
+        link_file = "./test/graphs/test.links"
+        reference = danker.danker_bigmem(danker.init(link_file, 0.1, False), 300, 0.85)
+        for tolerance in [1e-2, 1e-9]:
+            stats = {}
+            ranks = danker.danker_adaptive(danker.init(link_file, 0.1, False), 300, 0.85,
+                                           tolerance, stats=stats)
+            self.assertLess(stats['residual'], tolerance)
+            self.assertLess(stats['updates'], stats['iterations'] * len(reference))
+            self.assertLess(sum(abs(ranks[i][1] - reference[i][1]) for i in reference),
+                            tolerance)
+            self.assertEqual([ranks[i][1] for i in reference], [ranks[i][2] for i in reference])
+        stats = {}
+        danker.danker_adaptive(danker.init(link_file, 0.1, False), 3, 0.85, 1e-9, stats=stats)
+        self.assertEqual(stats['iterations'], 3)
+        sys.argv = [sys.argv[0], link_file, '0.85', '300', '0.1', '-s', 'adaptive', '-t', '1e-9']
+        danker.danker._main()
+
+    def test_blocks(self):
+        """
+        Test the out-of-core engine on a right sorted integer version of the test graph.
+        """
+        with open("./test/graphs/test.links") as link_file:
+            links = [[ord(i.strip()) for i in line.split("\t")] for line in link_file]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            left_sorted = os.path.join(tmp_dir, "int.links")
+            right_sorted = os.path.join(tmp_dir, "int.links.right")
+            graph_file = os.path.join(tmp_dir, "int.graph")
+            with open(left_sorted, "w") as out:
+                out.writelines("{0}\t{1}\n".format(*i) for i in sorted(links))
+            with open(right_sorted, "w") as out:
+                out.writelines("{0}\t{1}\n".format(*i) for i in
+                               sorted(links, key=lambda x: (x[1], x[0])))
+            sys.argv = [sys.argv[0], 'compile', '-r', right_sorted, graph_file]
+            danker.danker._main()
+            danker_pr_big = danker.danker_bigmem(danker.init(left_sorted, 0.1, False), 30, 0.85)
+            nodes = danker.load_graph(graph_file).nodes.tolist()
+            self.assertEqual(nodes, sorted(danker_pr_big))
+            for block_size in [1, 3, 100]:
+                ranks = danker.danker_blocks(graph_file, 30, 0.85, 0.1, block_size=block_size)
+                self.assertEqual(ranks[0].tolist(), [danker_pr_big[i][1] for i in nodes])
+            sys.argv = [sys.argv[0], graph_file, '0.85', '10', '1', '-e', 'blocks']
+            danker.danker._main()
+            with self.assertRaises(danker.InputNotSortedException):
+                danker.compile_right_sorted(left_sorted, graph_file)
+            with self.assertRaises(ValueError):
+                danker.compile_right_sorted("./test/graphs/test.links.right", graph_file)
+            # failed runs keep the previous graph file and leave no temporary files
+            self.assertEqual(danker.load_graph(graph_file).nodes.tolist(), nodes)
+            self.assertEqual(sorted(os.listdir(tmp_dir)), ["int.graph", "int.links",
+                                                           "int.links.right"])
+
+    def test_bulk_parser(self):
+        """
+        Test that integer link files (bulk parser) give the same results as the line parser.
+        """
+        link_file = "./test/graphs/test.links"
+        with open(link_file) as in_file:
+            links = [[ord(i.strip()) for i in line.split("\t")] for line in in_file]
+        expected = {True: danker.init(link_file, 0.1, True),
+                    False: danker.init(link_file, 0.1, False)}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            int_file = os.path.join(tmp_dir, "int.links")
+            variants = ["{0}\t{1}\n", "{0}\t{1}\tenwiki\n", "{0}\t{1}\r\n", "{0}\t{1}\t7\n"]
+            for line in variants:
+                with open(int_file, "w", newline="") as out_file:
+                    out_file.writelines(line.format(*i) for i in links)
+                for smallmem in [True, False]:
+                    dictionary = danker.init(int_file, 0.1, smallmem)
+                    self.assertEqual(list(dictionary), [ord(i) for i in expected[smallmem]])
+                    for i, value in expected[smallmem].items():
+                        if not smallmem:
+                            value = value[:3] + [[ord(k) for k in value[3]]]
+                        self.assertEqual(dictionary[ord(i)], value)
+                graph = danker.init_csr(int_file)
+                reference = danker.to_csr(danker.init(int_file, 0, False))
+                self.assertEqual(graph.nodes.tolist(), reference.nodes)
+                for i, j in zip(graph[1:], reference[1:]):
+                    self.assertEqual(i.tolist(), j.tolist())
+            with open(int_file, "w") as out_file:
+                out_file.writelines("{0}\t{1}\n".format(*i) for i in links[::-1])
+            for smallmem in [True, False]:
+                with self.assertRaises(danker.InputNotSortedException):
+                    danker.init(int_file, 0.1, smallmem)
+            with self.assertRaises(danker.InputNotSortedException):
+                danker.init_csr(int_file)
+        self.assertEqual(list(danker.init_csr(link_file).nodes), list(expected[False]))
+
+    def test_node_table(self):
+        """
+        Test that the node table of danker_smallmem gives the same results as the dictionary.
+        """
+        link_file = "./test/graphs/test.links"
+        with open(link_file) as in_file:
+            links = [[ord(i.strip()) for i in line.split("\t")] for line in in_file]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            left, right = os.path.join(tmp_dir, "int.links"), os.path.join(tmp_dir, "right")
+            # contiguous and sparse node IDs
+            for scale in [1, 1000]:
+                with open(left, "w") as out_file:
+                    out_file.writelines("{0}\t{1}\n".format(i * scale, j * scale)
+                                        for i, j in links)
+                danker.sort_links(left, right, 1)
+                for iterations in [1, 2, 11]:
+                    stats = {}
+                    expected = danker.danker_smallmem(danker.init(left, 0.1, True), right,
+                                                      iterations, 0.85, 0.1)
+                    table = danker.danker_smallmem(danker.init_table(left, 0.1), right,
+                                                   iterations, 0.85, 0.1, stats=stats)
+                    self.assertEqual(table.nodes.tolist(), sorted(expected))
+                    for node, score in zip(table.nodes.tolist(),
+                                           table.scores(stats['location']).tolist()):
+                        self.assertAlmostEqual(score, expected[node][stats['location']],
+                                               places=12)
+                key = danker.graph_hash([left, right])
+                checkpoint = os.path.join(tmp_dir, "table.checkpoint")
+                danker.danker_smallmem(danker.init_table(left, 0.1), right, 6, 0.85, 0.1,
+                                       checkpoint=danker.Checkpoint(checkpoint, key, every=3))
+                resumed = danker.danker_smallmem(danker.init_table(left, 0.1), right, 11, 0.85,
+                                                 0.1, checkpoint=danker.Checkpoint(
+                                                     checkpoint, key, resume=True))
+                self.assertEqual(resumed.scores(2).tolist(), table.scores(2).tolist())
+            # the command line output equals that of the dictionary, also if the
+            # in-links of a node span several chunks of the right sorted file
+            rng = np.random.RandomState(7)
+            with open(left, "w") as out_file:
+                out_file.writelines("{0}\t{1}\n".format(i, j) for i, j in sorted(zip(
+                    rng.randint(0, 300, 3000), rng.zipf(1.5, 3000) % 400)))
+            danker.sort_links(left, right, 1)
+            expected, output = os.path.join(tmp_dir, "dict.tsv"), os.path.join(tmp_dir, "tsv")
+            chunk_size = danker.danker._LINE_CHUNK_SIZE
+            try:
+                danker.danker._LINE_CHUNK_SIZE = 100
+                dictionary = danker.danker_smallmem(danker.init(left, 0.1, True), right, 10,
+                                                    0.85, 0.1)
+                with open(expected, "w") as out_file:
+                    nodes = sorted(dictionary)
+                    danker.write_ranks(nodes, [dictionary[i][1] for i in nodes], out_file)
+                sys.argv = [sys.argv[0], left, right, '0.85', '10', '0.1', '-O', output]
+                danker.danker._main()
+            finally:
+                danker.danker._LINE_CHUNK_SIZE = chunk_size
+            self.assertEqual(pathlib.Path(output).read_bytes(),
+                             pathlib.Path(expected).read_bytes())
+            with open(left, "w") as out_file:
+                out_file.writelines("{0}\t{1}\n".format(*i) for i in links[::-1])
+            with self.assertRaises(danker.InputNotSortedException):
+                danker.init_table(left, 0.1)
+            self.assertEqual(len(danker.init_table(left, 0.1, True)), len(table) - 1)
+            self.assertIsNone(danker.init_table(link_file, 0.1))
+
+    def test_unsorted(self):
+        """
+        Test unsorted link files with the in-memory sort and the external merge sort.
+        """
+        link_file = "./test/graphs/test.links"
+        with open(link_file) as in_file:
+            links = [line for line in in_file if line.strip()]
+        shuffled = links[1::2] + links[::-2]
+        reference = danker.danker_bigmem(danker.init(link_file, 0.1, False), 50, 0.85)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, lines in [("str", shuffled), ("int", ["{0}\t{1}\n".format(
+                    *[ord(i.strip()) for i in line.split("\t")]) for line in shuffled])]:
+                unsorted = os.path.join(tmp_dir, name + ".links")
+                with open(unsorted, "w") as out_file:
+                    out_file.writelines(lines)
+                node = chr if name == "int" else str
+                with self.assertRaises(danker.InputNotSortedException):
+                    danker.init(unsorted, 0.1, False)
+                left_sorted = os.path.join(tmp_dir, name + ".left")
+                with open(left_sorted, "w") as out_file:
+                    out_file.writelines(sorted(lines, key=danker.danker._left_key))
+                for smallmem in [True, False]:
+                    dictionary = danker.init(unsorted, 0.1, smallmem, True)
+                    expected = danker.init(left_sorted, 0.1, smallmem)
+                    self.assertEqual(list(dictionary.items()), list(expected.items()))
+                ranks = danker.danker_bigmem(danker.init(unsorted, 0.1, False, True), 50, 0.85)
+                graph = danker.init_csr(unsorted, True)
+                self.assertEqual(list(graph.nodes), list(ranks))
+                for i in ranks:
+                    self.assertAlmostEqual(ranks[i][1], reference[node(i)][1], places=12)
+
+                right_sorted = os.path.join(tmp_dir, name + ".right")
+                for buffer_size in [1, 30, 1 << 20]:
+                    runs = danker.sort_links(unsorted, right_sorted, 1, buffer_size)
+                    self.assertEqual(runs == 1, buffer_size > 1000)
+                    with open(right_sorted) as in_file:
+                        self.assertEqual(in_file.readlines(), sorted(
+                            lines, key=lambda x: danker.danker._conv_int(x.split("\t")[1].strip())))
+                small = danker.danker_smallmem(danker.init(unsorted, 0.1, True, True),
+                                               right_sorted, 50, 0.85, 0.1)
+                for i in small:
+                    self.assertAlmostEqual(small[i][1], reference[node(i)][1], places=12)
+                sys.argv = [sys.argv[0], unsorted, unsorted, '0.85', '10', '0.1', '-u', '-m', '10']
+                danker.danker._main()
+                sys.argv = [sys.argv[0], 'sort', unsorted, unsorted]
+                danker.danker._main()
+                danker.init(unsorted, 0.1, False)
+                self.assertEqual(os.listdir(tmp_dir).count(name + ".links"), 1)
+                self.assertFalse([i for i in os.listdir(tmp_dir) if i.endswith(".tmp")])
+
+    def test_intern(self):
+        """
+        Test interned string nodes and the round-trip via an integer link file and an index.
+        """
+        link_file = "./test/graphs/test.links"
+        reference = danker.to_csr(danker.init(link_file, 0.1, False))
+        graph = danker.init_csr(link_file)
+        self.assertIsInstance(graph.nodes, danker.StringTable)
+        self.assertEqual(list(graph.nodes), reference.nodes)
+        self.assertEqual(graph.nodes[3], reference.nodes[3])
+        for i, j in zip(graph[1:], reference[1:]):
+            self.assertEqual(i.tolist(), j.tolist())
+        ranks = danker.danker_bigmem(danker.init(link_file, 0.1, False), 50, 0.85)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            int_file = os.path.join(tmp_dir, "int.links")
+            index_file = os.path.join(tmp_dir, "index")
+            self.assertEqual(danker.intern_links(link_file, int_file, index_file), (11, 17))
+            ids, names = danker.load_index(index_file)
+            self.assertEqual(ids.tolist(), list(range(1, 12)))
+            self.assertEqual(list(names), sorted(reference.nodes))
+            int_ranks = danker.danker_bigmem(danker.init(int_file, 0.1, False), 50, 0.85)
+            self.assertEqual({names[i - 1]: int_ranks[i][1] for i in int_ranks},
+                             {i: ranks[i][1] for i in ranks})
+            sys.argv = [sys.argv[0], 'intern', link_file, int_file, index_file]
+            danker.danker._main()
+            for engine in ['dict', 'csr']:
+                sys.argv = [sys.argv[0], int_file, '0.85', '10', '0.1', '-x', index_file,
+                            '-e', engine]
+                danker.danker._main()
+
+    def test_output(self):
+        """
+        Test the rank writer: top-k, sorted and binary output.
+        """
+        graph = danker.init_csr("./test/graphs/test.links")
+        scores = danker.danker_csr(graph, 10, 0.85, 0.1)[0]
+        scores[[1, 4]] = scores[2]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            full_file = os.path.join(tmp_dir, "full.rank")
+            with open(full_file, "w") as out_file:
+                self.assertEqual(danker.write_ranks(graph.nodes, scores, out_file,
+                                                    ordered=True, prefix="Q"), len(scores))
+            with open(full_file) as in_file:
+                full = in_file.read().splitlines()
+            expected = sorted(range(len(scores)), key=lambda i: -scores[i])
+            self.assertEqual(full, ["Q{0}\t{1:.17g}".format(graph.nodes[i], scores[i])
+                                    for i in expected])
+            for top in range(len(scores) + 2):
+                top_file = os.path.join(tmp_dir, "top.rank")
+                with open(top_file, "w") as out_file:
+                    danker.write_ranks(graph.nodes, scores, out_file, top=top, prefix="Q")
+                with open(top_file) as in_file:
+                    self.assertEqual(in_file.read().splitlines(), full[:top])
+            for nodes in [graph.nodes, list(range(len(scores)))]:
+                binary_file = os.path.join(tmp_dir, "binary.rank")
+                with open(binary_file, "wb") as out_file:
+                    danker.write_ranks(nodes, scores, out_file, binary=True)
+                self.assertTrue(danker.is_rank_file(binary_file))
+                rank_nodes, rank_scores = danker.load_rank_file(binary_file)
+                self.assertEqual(list(rank_nodes), list(nodes))
+                self.assertEqual(rank_scores.tolist(), scores.tolist())
+                self.assertEqual(danker.load_ranks(binary_file, nodes, 0.1).tolist(),
+                                 scores.tolist())
+            with self.assertRaises(ValueError):
+                danker.load_rank_file(full_file)
+            self.assertEqual(danker.load_ranks(full_file, graph.nodes, 0.1, "Q").tolist(),
+                             scores.tolist())
+            for options in [['-r'], ['-k', '3'], ['-f', 'binary']]:
+                sys.argv = [sys.argv[0], './test/graphs/test.links', '0.85', '10', '0.1',
+                            '-P', 'Q', '-O', full_file] + options
+                danker.danker._main()
+
+    def test_serve(self):
+        """
+        Test the rank index and the rank server.
+        """
+        graph = danker.init_csr("./test/graphs/test.links")
+        scores = danker.danker_csr(graph, 10, 0.85, 0.1)[0]
+        expected = sorted(range(len(scores)), key=lambda i: -scores[i])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            rank_file = os.path.join(tmp_dir, "test.rank")
+            index_file = rank_file + ".idx"
+            with open(rank_file, "w") as out_file:
+                danker.write_ranks(graph.nodes, scores, out_file, prefix="Q")
+            self.assertEqual(danker.write_rank_index(rank_file, index_file, "Q"), len(scores))
+            index = danker.load_rank_index(index_file)
+            self.assertEqual(len(index), len(scores))
+            found = index.find([graph.nodes[i] for i in expected] + ["Q1", "x", 10 ** 30])
+            self.assertEqual(found[-3:], [-1, -1, -1])
+            for rank, position in enumerate(found[:-3]):
+                self.assertEqual(index.entry(position)[:3],
+                                 (graph.nodes[expected[rank]], scores[expected[rank]],
+                                  rank + 1))
+            self.assertEqual([index.entry(k)[0] for k in index.top(3, 1)],
+                             [graph.nodes[i] for i in expected[1:4]])
+            self.assertEqual(index.entry(index.top(1)[0])[3], 100)
+            percentiles = [index.entry(k)[3] for k in index.top(len(index))]
+            for low in [0, 1, 33.3, 50, 90, 99.5, 100]:
+                first, last = index.percentile_ranks(low)
+                self.assertEqual(last, len(index))
+                self.assertEqual(first, min([i for i, k in enumerate(percentiles)
+                                             if k <= low] or [len(index)]))
+                for high in [low, 50, 95, 100]:
+                    ranks = [i for i, k in enumerate(percentiles) if low <= k <= high]
+                    first, last = index.percentile_ranks(low, high)
+                    self.assertEqual(list(range(first, last)), ranks)
+            with self.assertRaises(ValueError):
+                danker.load_rank_index(rank_file)
+
+            names = ["n{0}".format(i) for i in range(len(scores))]
+            binary_file = os.path.join(tmp_dir, "names.rank")
+            with open(binary_file, "wb") as out_file:
+                danker.write_ranks(names, scores, out_file, binary=True)
+            danker.write_rank_index(binary_file, index_file)
+            holder = danker.server.IndexHolder(index_file, 0)
+            results = danker.server.query_ranks(holder.get(), ["n0", "n1", "m"])
+            self.assertEqual([k["found"] for k in results], [True, True, False])
+            self.assertEqual(results[1]["score"], scores[1])
+            top = danker.server.query_top(holder.get(), len(scores) + 1)
+            self.assertEqual([k["score"] for k in top], [scores[i] for i in expected])
+            self.assertEqual([k["rank"] for k in top], list(range(1, len(scores) + 1)))
+
+            server = danker.server.create_server("127.0.0.1:0", holder)
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                url = "http://127.0.0.1:{0}".format(server.server_address[1])
+                with urllib.request.urlopen(url + "/rank?id=n1&id=m") as response:
+                    self.assertEqual(json.loads(response.read().decode())["results"],
+                                     results[1:])
+                danker.write_rank_index(rank_file, index_file, "Q")
+                request = urllib.request.Request(url + "/rank", json.dumps(
+                    [graph.nodes[1]]).encode())
+                with urllib.request.urlopen(request) as response:
+                    result = json.loads(response.read().decode())["results"][0]
+                self.assertEqual(result["score"], scores[1])
+                with urllib.request.urlopen(url + "/top?n=2") as response:
+                    self.assertEqual(json.loads(response.read().decode())["results"],
+                                     danker.server.query_top(holder.get(), 2))
+                with urllib.request.urlopen(url + "/percentile?p=50&to=100") as response:
+                    self.assertEqual([k["percentile"] for k in json.loads(
+                        response.read().decode())["results"]], [100, 90, 80, 70, 60, 50])
+                with urllib.request.urlopen(url + "/percentile?p=55&n=2") as response:
+                    self.assertEqual([k["rank"] for k in json.loads(
+                        response.read().decode())["results"]], [6, 7])
+                with self.assertRaises(urllib.error.HTTPError):
+                    urllib.request.urlopen(url + "/percentile?p=101")
+                # invalid lengths of the body are rejected without waiting for it
+                for length in [b"abc", b"-1"]:
+                    with socket.create_connection(server.server_address, 10) as client:
+                        client.sendall(b"POST /rank HTTP/1.1\r\nHost: test\r\n" +
+                                       b"Content-Length: " + length + b"\r\n\r\n")
+                        self.assertTrue(client.recv(1024).startswith(b"HTTP/1.1 400 "))
+            finally:
+                server.shutdown()
+                server.server_close()
+                thread.join()
+
+    def test_bench(self):
+        """
+        Test the graph generator and the benchmark.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            link_file = os.path.join(tmp_dir, "bench.links")
+            links = danker.bench.generate_links(link_file, 5000, seed=1)
+            self.assertTrue(0 < links <= 5000)
+            dictionary = danker.init(link_file, 0.1, False)
+            self.assertTrue(len(dictionary) <= 500)
+            self.assertEqual(sum(k[0] for k in dictionary.values()), links)
+            # the chunks of the generator do not change the graph (no node is skipped)
+            chunk_links = danker.bench.CHUNK_LINKS
+            chunked_file = os.path.join(tmp_dir, "chunked.links")
+            try:
+                danker.bench.CHUNK_LINKS = 700
+                self.assertEqual(danker.bench.generate_links(chunked_file, 5000, seed=1), links)
+            finally:
+                danker.bench.CHUNK_LINKS = chunk_links
+            with open(link_file) as in_file, open(chunked_file) as chunked:
+                self.assertEqual(in_file.read(), chunked.read())
+            result_file = os.path.join(tmp_dir, "bench.json")
+            danker.bench.main(['-E', '2000', '-e', 'bigmem', 'smallmem', 'smallmem-dict', 'csr',
+                               '-i', '2', '-D', tmp_dir, '-o', result_file])
+            with open(result_file) as in_file:
+                report = json.load(in_file)
+            self.assertEqual([k['engine'] for k in report['results']],
+                             ['bigmem', 'smallmem', 'smallmem-dict', 'csr'])
+            for result in report['results']:
+                self.assertEqual(result['nodes'], report['results'][0]['nodes'])
+                self.assertTrue(all(result[k] >= 0 for k in danker.bench.METRICS))
+            self.assertEqual(danker.bench.compare(report, report, 1.0), 0)
+        # an engine process that ends without a result does not block the benchmark
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        process = context.Process(target=os._exit, args=(3,))
+        process.start()
+        self.assertIsNone(danker.bench._result(process, results, 0.1))
+        process.join()
+        self.assertEqual(process.exitcode, 3)
+
+    def test_telemetry(self):
+        """
+        Test the hooks and the JSON lines stream.
+        """
+        events = []
+        danker.add_hook(events.append)
+        try:
+            graph = danker.init_csr("./test/graphs/test.links")
+            danker.danker_csr(graph, 3, 0.85, 0.1)
+            danker.danker_bigmem(danker.init("./test/graphs/test.links", 0.1, False), 2, 0.85)
+        finally:
+            danker.remove_hook(events.append)
+        self.assertEqual([k['phase'] for k in events],
+                         ['parse', 'init'] + ['iteration'] * 3 + ['pagerank', 'init'] +
+                         ['iteration'] * 2 + ['pagerank'])
+        self.assertEqual([k['iteration'] for k in events if k['phase'] == 'iteration'],
+                         [1, 2, 3, 1, 2])
+        for event in events:
+            self.assertTrue(event['elapsed'] >= 0)
+            if event['phase'] in ['parse', 'init', 'iteration']:
+                self.assertEqual(event['edges'], 17)
+        ranks = danker.danker_csr(graph, 3, 0.85, 0.1)
+        self.assertAlmostEqual(events[4]['residual'], abs(ranks[1] - ranks[0]).sum())
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            telemetry = os.path.join(tmp_dir, "telemetry.jsonl")
+            sys.argv = [sys.argv[0], './test/graphs/test.links', '0.85', '10', '0.1', '-q',
+                        '-T', telemetry]
+            danker.danker._main()
+            with open(telemetry) as in_file:
+                phases = [json.loads(k)['phase'] for k in in_file]
+            self.assertEqual(phases, ['init'] + ['iteration'] * 10 + ['pagerank', 'output'])
+        self.assertEqual(danker.danker._HOOKS, [danker.print_progress])
+
+    def test_checkpoint(self):
+        """
+        Test that a resumed run computes the same ranks as an uninterrupted one.
+        """
+        left, right = "./test/graphs/test.links", "./test/graphs/test.links.right"
+        key = danker.graph_hash([left, right])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            graph_file = os.path.join(tmp_dir, "graph")
+            danker.compile_graph(left, graph_file)
+            engines = {
+                'smallmem': lambda n, c: [k[(n % 2) + 1] for k in danker.danker_smallmem(
+                    danker.init(left, 0.1, True), right, n, 0.85, 0.1, checkpoint=c).values()],
+                'bigmem': lambda n, c: [k[(n % 2) + 1] for k in danker.danker_bigmem(
+                    danker.init(left, 0.1, False), n, 0.85, checkpoint=c).values()],
+                'csr': lambda n, c: danker.danker_csr(danker.init_csr(left), n, 0.85, 0.1,
+                                                      checkpoint=c)[n % 2].tolist(),
+                'gauss-seidel': lambda n, c: danker.danker_gauss_seidel(
+                    danker.init_csr(left), n, 0.85, 0.1, checkpoint=c)[0].tolist(),
+                'blocks': lambda n, c: danker.danker_blocks(graph_file, n, 0.85, 0.1,
+                                                            checkpoint=c)[n % 2].tolist()}
+            for engine, run in engines.items():
+                file_name = os.path.join(tmp_dir, engine + ".checkpoint")
+                expected = run(12, None)
+                run(8, danker.Checkpoint(file_name, key, every=3))
+                events = []
+                danker.add_hook(events.append)
+                try:
+                    self.assertEqual(run(12, danker.Checkpoint(file_name, key, resume=True)),
+                                     expected)
+                finally:
+                    danker.remove_hook(events.append)
+                self.assertEqual([k['iteration'] for k in events if k['phase'] == 'iteration'],
+                                 list(range(7, 13)))
+                with open(file_name, 'rb') as in_file:
+                    data = in_file.read()
+                # a later checkpoint of the resumed run
+                run(12, danker.Checkpoint(file_name, key, every=5, resume=True))
+                with open(file_name, 'rb') as in_file:
+                    self.assertNotEqual(in_file.read(), data)
+                # corrupt or foreign checkpoints are ignored
+                with open(file_name, 'r+b') as out_file:
+                    out_file.seek(-1, os.SEEK_END)
+                    out_file.write(b'x')
+                self.assertEqual(run(12, danker.Checkpoint(file_name, key, resume=True)),
+                                 expected)
+                self.assertEqual(run(12, danker.Checkpoint(file_name, b'other', every=3)),
+                                 expected)
+                self.assertEqual(run(12, danker.Checkpoint(file_name, key, resume=True)),
+                                 expected)
+            sys.argv = [sys.argv[0], left, right, '0.85', '10', '0.1', '-C',
+                        os.path.join(tmp_dir, "main.checkpoint"), '--checkpoint-every', '2',
+                        '-R']
+            danker.danker._main()
+
     def test_left_sort(self):
         """
         Test if assert for left sort works (test with right sorted file)